@@ -1,13 +1,21 @@
-from flask import Flask, jsonify, current_app
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
 from datetime import timedelta
-from pathlib import Path
-import sqlite3
 
 from .database import db
 from .config import Config
+from .core.identity import resolve_principal
+from .core.principal_cache import principal_cache
+from .core.user_denylist import user_denylist
+from .core.password_hashing import password_hasher, HashingPoolSaturated
+from .core.last_login_buffer import last_login_buffer
+from .core.token_revocation import token_revocation_store
+from .core.token_cache import CachingJWTManager, decoded_token_cache
+from .core.response_cache import response_cache
+from .core.compression import response_compressor
+from .core.product_suggest import product_suggest_index
+from .core.schema_upgrades import ensure_schema
 
 
 def create_app():
@@ -39,88 +47,74 @@ def create_app():
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
     app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=7)
 
-    jwt = JWTManager(app)
+    # JWTManager con cache de claims verificados (firma una vez por token y worker)
+    jwt = CachingJWTManager(app)
+    decoded_token_cache.configure(max_size=app.config["DECODED_TOKEN_CACHE_SIZE"])
+
+    # Cache de principales compartido por todas las requests del proceso
+    principal_cache.configure(
+        max_size=app.config["PRINCIPAL_CACHE_SIZE"],
+        ttl=app.config["PRINCIPAL_CACHE_TTL"],
+        sync_interval=app.config["PRINCIPAL_CACHE_SYNC_INTERVAL"],
+    )
+    user_denylist.configure(refresh_interval=app.config["AUTH_DENYLIST_REFRESH_INTERVAL"])
+
+    # Pool acotado para hashing de contraseñas (login y alta de usuarios)
+    password_hasher.configure(
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_queue=app.config["PASSWORD_HASH_QUEUE"],
+        method=app.config["PASSWORD_HASH_METHOD"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+    )
+
+    # Tokens revocados (logout) en memoria, sincronizados entre workers
+    token_revocation_store.configure(
+        sync_interval=app.config["TOKEN_REVOCATION_SYNC_INTERVAL"],
+        bloom_bits=app.config["TOKEN_REVOCATION_BLOOM_BITS"],
+    )
+
+    # last_login en lote (write-behind) para no tomar el lock de escritura en cada login
+    last_login_buffer.configure(
+        app,
+        flush_interval=app.config["LAST_LOGIN_FLUSH_INTERVAL"],
+        flush_size=app.config["LAST_LOGIN_FLUSH_SIZE"],
+    )
+
+    # Cache de respuestas del catálogo (se invalida al confirmar escrituras)
+    response_cache.configure(
+        backend=app.config["RESPONSE_CACHE_BACKEND"],
+        max_entries=app.config["RESPONSE_CACHE_SIZE"],
+        ttl=app.config["RESPONSE_CACHE_TTL"],
+        redis_url=app.config["RESPONSE_CACHE_REDIS_URL"],
+    )
+
+    # Índice de trigramas para sugerencias (se construye en el primer uso)
+    product_suggest_index.configure(
+        max_products=app.config["SUGGEST_INDEX_MAX_PRODUCTS"],
+        max_name_length=app.config["SUGGEST_INDEX_MAX_NAME_LENGTH"],
+        sync_interval=app.config["SUGGEST_INDEX_SYNC_INTERVAL"],
+    )
+
+    # Tablas/columnas nuevas en bases existentes: una vez por proceso, antes de la primera request
+    app.before_request(ensure_schema)
+
+    # Compresión negociada de respuestas (gzip; zstd/br si están instalados)
+    response_compressor.init_app(app)
+
+    # Pool de hashing saturado: rechazo rápido en lugar de encolar sin límite
+    @app.errorhandler(HashingPoolSaturated)
+    def hashing_pool_saturated(error):
+        return jsonify(message=error.message), 503, {"Retry-After": "1"}
 
     # Identidad como string (compat PyJWT 2.x)
     @jwt.user_identity_loader
     def user_identity_lookup(user_or_id):
         return str(user_or_id)
 
-    # Carga de usuario desde JWT usando SQLite directo (si preferís, reemplazar por SQLAlchemy)
+    # Carga de usuario desde JWT: un único principal por request, compartido con los decoradores
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        try:
-            user_id = int(jwt_data["sub"])  # identidad viene como string
-            db_path = Path(current_app.instance_path) / "stock_management.db"
-            if not db_path.exists():
-                return None
-
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT id, username, email, password_hash, first_name, last_name,
-                           role, is_active, created_at, updated_at, last_login
-                    FROM users
-                    WHERE id = ? AND is_active = 1
-                    """,
-                    (user_id,),
-                )
-                row = cursor.fetchone()
-
-            if not row:
-                return None
-
-            class MockUser:
-                __slots__ = (
-                    "id",
-                    "username",
-                    "email",
-                    "password_hash",
-                    "first_name",
-                    "last_name",
-                    "role",
-                    "is_active",
-                    "created_at",
-                    "updated_at",
-                    "last_login",
-                )
-
-                def __init__(self, d):
-                    (
-                        self.id,
-                        self.username,
-                        self.email,
-                        self.password_hash,
-                        self.first_name,
-                        self.last_name,
-                        self.role,
-                        is_active,
-                        self.created_at,
-                        self.updated_at,
-                        self.last_login,
-                    ) = d
-                    self.is_active = bool(is_active)
-
-                def to_dict(self):
-                    return {
-                        "id": self.id,
-                        "username": self.username,
-                        "email": self.email,
-                        "first_name": self.first_name,
-                        "last_name": self.last_name,
-                        "role": self.role,
-                        "is_active": self.is_active,
-                        "created_at": self.created_at,
-                        "updated_at": self.updated_at,
-                        "last_login": self.last_login,
-                    }
-
-            return MockUser(row)
-
-        except Exception as e:
-            print(f"Error en user_lookup_callback: {e}")
-            return None
+        return resolve_principal(jwt_data["sub"], jwt_data)
 
     # Handlers JWT en JSON (coherentes con API)
     @jwt.unauthorized_loader
@@ -135,6 +129,11 @@ def create_app():
     def expired_token(jwt_header, jwt_payload):
         return jsonify(message="Token expirado"), 401
 
+    # Revocación por jti: lookup en memoria, sin consultar la BD por request
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(_jwt_header, jwt_payload):
+        return token_revocation_store.is_revoked(jwt_payload["jti"])
+
     @jwt.revoked_token_loader
     def revoked_token_callback(jwt_header, jwt_payload):
         return jsonify(message="Token revocado"), 401
@@ -148,6 +147,10 @@ def create_app():
         from .models.order import Order
         from .models.order_item import OrderItem
         from .models.purchase_order import PurchaseOrder
+        from .models.auth_invalidation import AuthInvalidation
+        from .models.revoked_token import RevokedToken
+        from .models.table_version import TableVersion
+        from .models.stock_movement import StockMovement, StockMovementReason, StockSnapshot
 
         from .routes.frontend import frontend_bp
         from .api import init_api
@@ -6,6 +6,7 @@ from .stock import stock_bp
 from .orders import orders_bp
 from .purchases import purchases_bp
 from .auth import auth_bp
+from .system import system_bp
 
 def init_api(app):
     """Inicializar API con flask-smorest"""
@@ -18,5 +19,6 @@ def init_api(app):
     api.register_blueprint(orders_bp, url_prefix='/api/orders')
     api.register_blueprint(purchases_bp, url_prefix='/api/purchases')
     api.register_blueprint(auth_bp, url_prefix='/api/auth')
+    api.register_blueprint(system_bp, url_prefix='/api/system')
     
     return api
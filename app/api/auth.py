@@ -11,6 +11,8 @@ from flask_jwt_extended import (
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
+    get_jwt,
+    decode_token,
 )
 from app.database import db
 from app.models.user import User
@@ -19,14 +21,24 @@ from app.schemas.user import (
     UserCreateSchema,
     UserUpdateSchema,
     UserLoginSchema,
+    UserLogoutSchema,
     UserListSchema,
 )
 from app.middleware.auth_middleware import require_permission
-import sqlite3
-from pathlib import Path
-from werkzeug.security import check_password_hash
+from app.core.sqlite_pool import direct_connection
+from app.core.last_login_buffer import last_login_buffer
+from app.core.token_revocation import token_revocation_store
+from app.core.pagination import paginate_query
+from app.core.aggregates import summary_counts
+from app.schemas.pagination import PaginationQuerySchema
+from app.core.password_hashing import (
+    HashingPoolSaturated,
+    hash_password,
+    verify_password,
+    needs_rehash,
+)
+from werkzeug.exceptions import HTTPException
 from datetime import datetime
-from flask import current_app  # <-- (CAMBIO) para resolver ruta a /instance
 
 # Crear blueprint para autenticación
 auth_blp = Blueprint(
@@ -36,35 +48,24 @@ auth_blp = Blueprint(
 )
 
 
-# --- Helpers SQLite (con ruta robusta via current_app.instance_path) ---
-
-def _db_path() -> Path:
-    """Devuelve la ruta absoluta al archivo SQLite dentro de /instance."""
-    return Path(current_app.instance_path) / "stock_management.db"  # (CAMBIO)
-
+# --- Helpers SQLite (conexiones del pool compartido, misma BD que SQLAlchemy) ---
 
 def get_user_by_username_direct(username):
     """Obtiene usuario por username usando SQLite directo"""
     try:
-        db_path = _db_path()  # (CAMBIO)
-        if not db_path.exists():
-            return None
-
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, username, email, password_hash, first_name, last_name, 
-                   role, is_active, created_at, updated_at, last_login
-            FROM users 
-            WHERE username = ? AND is_active = 1
-        """,
-            (username,),
-        )
-
-        user_data = cursor.fetchone()
-        conn.close()
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+
+            user_data = conn.execute(
+                """
+                SELECT id, username, email, password_hash, first_name, last_name,
+                       role, is_active, created_at, updated_at, last_login
+                FROM users
+                WHERE username = ? AND is_active = 1
+            """,
+                (username,),
+            ).fetchone()
 
         if user_data:
             return {
@@ -91,25 +92,19 @@ def get_user_by_username_direct(username):
 def get_user_by_id_direct(user_id):
     """Obtiene usuario por ID usando SQLite directo"""
     try:
-        db_path = _db_path()  # (CAMBIO)
-        if not db_path.exists():
-            return None
-
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, username, email, password_hash, first_name, last_name, 
-                   role, is_active, created_at, updated_at, last_login
-            FROM users 
-            WHERE id = ? AND is_active = 1
-        """,
-            (user_id,),
-        )
-
-        user_data = cursor.fetchone()
-        conn.close()
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+
+            user_data = conn.execute(
+                """
+                SELECT id, username, email, password_hash, first_name, last_name,
+                       role, is_active, created_at, updated_at, last_login
+                FROM users
+                WHERE id = ? AND is_active = 1
+            """,
+                (user_id,),
+            ).fetchone()
 
         if user_data:
             return {
@@ -133,32 +128,26 @@ def get_user_by_id_direct(user_id):
         return None
 
 
-def update_last_login_direct(user_id):
-    """Actualiza last_login usando SQLite directo"""
+def update_password_hash_direct(user_id, password_hash):
+    """Reemplaza el hash de contraseña usando SQLite directo"""
     try:
-        db_path = _db_path()  # (CAMBIO)
-        if not db_path.exists():
-            return False
-
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        current_time = datetime.now().isoformat()
-        cursor.execute(
-            """
-            UPDATE users 
-            SET last_login = ?, updated_at = ?
-            WHERE id = ?
-        """,
-            (current_time, current_time, user_id),
-        )
-
-        conn.commit()
-        conn.close()
+        with direct_connection() as conn:
+            if conn is None:
+                return False
+
+            conn.execute(
+                """
+                UPDATE users
+                SET password_hash = ?, updated_at = ?
+                WHERE id = ?
+            """,
+                (password_hash, datetime.now().isoformat(), user_id),
+            )
+            conn.commit()
         return True
 
     except Exception as e:
-        print(f"Error en update_last_login_direct: {e}")
+        print(f"Error en update_password_hash_direct: {e}")
         return False
 
 
@@ -184,8 +173,8 @@ class Login(MethodView):
 
             print(f"✅ Usuario encontrado: {user['username']}")
 
-            # Verificar contraseña
-            if not check_password_hash(user["password_hash"], password):
+            # Verificar contraseña (en el pool de hashing acotado)
+            if not verify_password(user["password_hash"], password):
                 print(f"❌ Contraseña inválida para usuario: {username}")
                 abort(401, message="Credenciales inválidas")
 
@@ -195,9 +184,17 @@ class Login(MethodView):
                 print(f"❌ Usuario inactivo: {username}")
                 abort(401, message="Usuario desactivado")
 
-            # Actualizar último login
-            update_last_login_direct(user["id"])
-            print(f"✅ Last login actualizado para usuario: {username}")
+            # Re-hash transparente si cambió la política de costo
+            try:
+                if needs_rehash(user["password_hash"]):
+                    update_password_hash_direct(user["id"], hash_password(password))
+                    print(f"🔁 Hash de contraseña actualizado para usuario: {username}")
+            except HashingPoolSaturated:
+                pass  # se reintentará en el próximo login
+
+            # Registrar último login (se persiste en lote, fuera de la request)
+            last_login_buffer.record(user["id"])
+            print(f"✅ Last login registrado para usuario: {username}")
 
             # Normalizar roles como lista (CAMBIO)
             roles = (
@@ -230,6 +227,10 @@ class Login(MethodView):
                     "is_active": user["is_active"],
                 },
             }
+        except HTTPException:
+            raise
+        except HashingPoolSaturated as e:
+            abort(503, message=e.message, headers={"Retry-After": "1"})
         except Exception as e:
             print(f"❌ Error en login: {e}")
             abort(500, message="Error interno del servidor")
@@ -351,16 +352,24 @@ class Profile(MethodView):
 class Users(MethodView):
     """Endpoint para gestión de usuarios (solo admin)"""
 
+    @auth_blp.arguments(PaginationQuerySchema, location="query")
     @auth_blp.response(200, UserListSchema)
     @jwt_required()
     @require_permission("manage_users")
-    def get(self):
-        """Listar todos los usuarios"""
+    def get(self, pagination_args):
+        """Listar usuarios (paginado por cursor)"""
         try:
-            users = User.query.all()
-            active_count = sum(1 for user in users if user.is_active)
+            # Contadores de todos los usuarios (no solo la página) en un único SELECT
+            counts = summary_counts(
+                User.query,
+                active_count=User.is_active.is_(True),
+                inactive_count=User.is_active.is_(False),
+            )
+            page = paginate_query(
+                User.query, User, pagination_args, ("id", "username"), total=counts.pop("total")
+            )
 
-            return {"users": users, "total": len(users), "active_count": active_count}
+            return {"users": page.items, **counts, **page.meta()}
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
 
@@ -392,12 +401,31 @@ class Users(MethodView):
 class Logout(MethodView):
     """Endpoint para logout"""
 
+    @auth_blp.arguments(UserLogoutSchema)
     @auth_blp.response(200, description="Logout exitoso")
     @jwt_required()
-    def post(self):
-        """Logout de usuario"""
-        # En JWT, el logout se maneja en el frontend invalidando el token
-        return {"message": "Logout exitoso"}
+    def post(self, logout_data):
+        """Logout de usuario: revoca el access token y, si se envía, el refresh token"""
+        try:
+            jwt_data = get_jwt()
+            user_id = int(jwt_data["sub"])
+            token_revocation_store.revoke(jwt_data["jti"], jwt_data["exp"], user_id)
+
+            refresh_token = logout_data.get("refresh_token")
+            if refresh_token:
+                try:
+                    refresh_data = decode_token(refresh_token)
+                except Exception:
+                    refresh_data = None
+                # Solo revocar refresh tokens válidos del mismo usuario
+                if refresh_data and refresh_data.get("sub") == jwt_data["sub"]:
+                    token_revocation_store.revoke(refresh_data["jti"], refresh_data["exp"], user_id)
+
+            db.session.commit()
+            return {"message": "Logout exitoso"}
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            abort(500, message=f"Error de base de datos: {str(e)}")
 
 
 # Exportar el blueprint con el nombre esperado
@@ -9,9 +9,18 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.database import db
 from app.models.category import Category
 from app.schemas.category import CategorySchema, CategoryUpdateSchema, CategoryListSchema
+from app.schemas.pagination import PaginationQuerySchema, FieldsQuerySchema
+from app.core.pagination import paginate_query
+from app.core.loader_options import with_loaders
+from app.core.fieldsets import parse_fields, sparse_response
+from app.core.change_versions import conditional_get
+from app.core.response_cache import response_cache
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.decorators import user_or_above_required, manager_or_admin_required, admin_required
 
+# Columnas NOT NULL por las que se puede ordenar/paginar
+CATEGORY_SORT_KEYS = ("id", "name")
+
 # Crear blueprint para categorías
 categories_blp = Blueprint(
     "categories", 
@@ -23,17 +32,23 @@ categories_blp = Blueprint(
 class Categories(MethodView):
     """Endpoint para listar y crear categorías"""
     
+    @categories_blp.arguments(PaginationQuerySchema, location="query")
     @categories_blp.response(200, CategoryListSchema)
     @jwt_required()
     @user_or_above_required
-    def get(self):
-        """Listar todas las categorías"""
+    @conditional_get("categories")
+    @response_cache.cached(CategoryListSchema, "categories")
+    def get(self, pagination_args):
+        """Listar categorías (paginado por cursor)"""
+        fields = parse_fields(pagination_args.get("sparse_fields"), CategorySchema)
         try:
-            categories = Category.query.all()
-            return {
-                "categories": categories,
-                "total": len(categories)
-            }
+            query = with_loaders(
+                Category.query, "categories", fields, keep=(pagination_args.get("sort") or "id",)
+            )
+            page = paginate_query(query, Category, pagination_args, CATEGORY_SORT_KEYS)
+            return sparse_response(
+                CategoryListSchema, {"categories": page.items, **page.meta()}, fields, "categories"
+            )
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -65,14 +80,17 @@ class Categories(MethodView):
 class CategoryById(MethodView):
     """Endpoint para obtener, actualizar y eliminar categoría por ID"""
     
+    @categories_blp.arguments(FieldsQuerySchema, location="query")
     @categories_blp.response(200, CategorySchema)
     @jwt_required()
     @user_or_above_required
-    def get(self, category_id):
+    @conditional_get("categories")
+    def get(self, fields_args, category_id):
         """Obtener categoría por ID"""
+        fields = parse_fields(fields_args.get("sparse_fields"), CategorySchema)
         try:
-            category = Category.query.get_or_404(category_id)
-            return category
+            category = with_loaders(Category.query, "categories", fields).get_or_404(category_id)
+            return sparse_response(CategorySchema, category, fields)
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
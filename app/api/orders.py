@@ -6,14 +6,18 @@ Endpoints de Órdenes con flask-smorest
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, timezone
 from app.database import db
 from app.models.order import Order
 from app.schemas.order import OrderSchema, OrderCreateSchema, OrderUpdateSchema, OrderListSchema
+from app.schemas.pagination import PaginationQuerySchema, FieldsQuerySchema
+from app.core.pagination import paginate_query
+from app.core.aggregates import summary_counts
+from app.core.loader_options import with_loaders
+from app.core.fieldsets import parse_fields, sparse_response
+from app.core.stock_operations import StockOperationError, complete_order
 from app.middleware.auth_middleware import require_auth, require_permission
 from app.validators.order_validators import (
-    validate_order_completion, validate_order_update, 
-    validate_order_deletion, calculate_order_total
+    validate_order_update, validate_order_deletion, calculate_order_total
 )
 from marshmallow import ValidationError
 
@@ -28,21 +32,30 @@ orders_blp = Blueprint(
 class Orders(MethodView):
     """Endpoint para listar y crear órdenes"""
     
+    @orders_blp.arguments(PaginationQuerySchema, location="query")
     @orders_blp.response(200, OrderListSchema)
     @require_auth
-    def get(self):
-        """Listar todas las órdenes"""
+    def get(self, pagination_args):
+        """Listar órdenes (paginado por cursor)"""
+        fields = parse_fields(pagination_args.get("sparse_fields"), OrderSchema)
         try:
-            orders = Order.query.all()
-            pending_count = sum(1 for order in orders if order.status == 'pending')
-            completed_count = sum(1 for order in orders if order.status == 'completed')
+            # Contadores de todas las órdenes (no solo la página) en un único SELECT
+            counts = summary_counts(
+                Order.query,
+                pending_count=Order.status == 'pending',
+                completed_count=Order.status == 'completed',
+                cancelled_count=Order.status == 'cancelled'
+            )
+            page = paginate_query(
+                with_loaders(Order.query, "orders", fields, keep=(pagination_args.get("sort") or "id",)),
+                Order,
+                pagination_args,
+                total=counts.pop("total")
+            )
             
-            return {
-                "orders": orders,
-                "total": len(orders),
-                "pending_count": pending_count,
-                "completed_count": completed_count
-            }
+            return sparse_response(
+                OrderListSchema, {"orders": page.items, **counts, **page.meta()}, fields, "orders"
+            )
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -93,13 +106,15 @@ class Orders(MethodView):
 class OrderById(MethodView):
     """Endpoint para obtener, actualizar y eliminar orden por ID"""
     
+    @orders_blp.arguments(FieldsQuerySchema, location="query")
     @orders_blp.response(200, OrderSchema)
     @require_auth
-    def get(self, order_id):
+    def get(self, fields_args, order_id):
         """Obtener orden por ID"""
+        fields = parse_fields(fields_args.get("sparse_fields"), OrderSchema)
         try:
-            order = Order.query.get_or_404(order_id)
-            return order
+            order = with_loaders(Order.query, "orders", fields).get_or_404(order_id)
+            return sparse_response(OrderSchema, order, fields)
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -115,9 +130,10 @@ class OrderById(MethodView):
                 validate_order_update(order_id, order_data['items'])
                 
                 # Actualizar items de la orden
-                # Primero eliminar items existentes
+                # Primero eliminar items existentes (por la sesión: el flush libera su reserva)
                 from app.models.order_item import OrderItem
-                OrderItem.query.filter_by(order_id=order_id).delete()
+                for order_item in OrderItem.query.filter_by(order_id=order_id):
+                    db.session.delete(order_item)
                 
                 # Crear nuevos items
                 from app.models.product import Product
@@ -176,29 +192,13 @@ class CompleteOrder(MethodView):
     def put(self, order_id):
         """Completar orden"""
         try:
-            # Validar que se pueda completar
-            order = validate_order_completion(order_id)
-            
-            # Actualizar stock (descontar productos vendidos)
-            from app.models.stock import Stock
-            for item in order.items:
-                stock = Stock.query.filter_by(product_id=item.product_id).first()
-                if stock:
-                    stock.quantity -= item.quantity
-                    if stock.quantity < 0:
-                        raise ValidationError(f"Stock insuficiente para completar la orden")
-                    stock.updated_at = datetime.now(timezone.utc)
-            
-            # Marcar orden como completada
-            order.status = 'completed'
-            order.updated_at = datetime.now(timezone.utc)
-            order.completed_at = datetime.now(timezone.utc)
-            
+            # Estado y descuentos de stock como UPDATE condicionales en lote, un solo commit
+            complete_order(db.session, order_id)
             db.session.commit()
-            return order
-        except ValidationError as e:
+            return db.session.get(Order, order_id)
+        except StockOperationError as e:
             db.session.rollback()
-            abort(400, message=str(e))
+            abort(400, message=e.message)
         except SQLAlchemyError as e:
             db.session.rollback()
             abort(500, message=f"Error de base de datos: {str(e)}")
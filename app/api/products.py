@@ -3,18 +3,84 @@
 Endpoints de Productos con flask-smorest
 """
 
+from flask import current_app
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
+from sqlalchemy import case, literal_column
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
 from app.database import db
 from app.models.product import Product
+from app.models.category import Category
+from app.models.stock import Stock
 from app.schemas.product import (
     ProductSchema, ProductCreateSchema, ProductUpdateSchema, 
-    ProductListSchema, ProductSearchSchema
+    ProductListSchema, ProductSearchSchema, ProductSuggestQuerySchema,
+    ProductSuggestionListSchema
 )
+from app.schemas.pagination import PaginationQuerySchema, FieldsQuerySchema
+from app.core.pagination import paginate_query
+from app.core.aggregates import facet_counts
+from app.core.loader_options import with_loaders
+from app.core.fieldsets import parse_fields, sparse_response
+from app.core.change_versions import conditional_get
+from app.core.response_cache import response_cache
+from app.core.product_search import apply_text_search
+from app.core.product_suggest import product_suggest_index
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.decorators import user_or_above_required, manager_or_admin_required, admin_required
 
+# Columnas NOT NULL por las que se puede ordenar/paginar
+PRODUCT_SORT_KEYS = ("id", "name", "price", "category_id")
+
+# Con stock / stock bajo: mismos predicados que los índices parciales de stocks
+# (ix_stocks_in_stock_product_id, ix_stocks_low_stock_product_id). El 0 va literal:
+# con un parámetro el planificador no puede usar el índice parcial
+IN_STOCK_CONDITION = Stock.quantity > literal_column("0")
+LOW_STOCK_CONDITION = Stock.quantity <= Stock.min_stock
+
+def price_bucket_bounds():
+    """Límites de los rangos de precio de las facetas (PRODUCT_PRICE_BUCKETS)"""
+    raw = current_app.config["PRODUCT_PRICE_BUCKETS"]
+    return sorted(float(bound) for bound in raw.split(",") if bound.strip())
+
+
+def product_facets(query):
+    """
+    Facetas de categoría, rango de precio y stock sobre el filtro de `query`
+    en una sola consulta agregada. Devuelve (total, facetas para el esquema).
+    """
+    bounds = price_bucket_bounds()
+    category = aliased(Category)
+    stock = aliased(Stock)
+    bucket = case(*[(Product.price < bound, index) for index, bound in enumerate(bounds)], else_=len(bounds))
+    available = case((stock.quantity > 0, True), else_=False)
+
+    counts = facet_counts(
+        query.outerjoin(category, category.id == Product.category_id)
+        .outerjoin(stock, stock.product_id == Product.id),
+        category=(Product.category_id, category.name),
+        price=bucket,
+        in_stock=available,
+    )
+    edges = [0.0] + bounds + [None]
+    facets = {
+        "category": [
+            {"id": category_id, "name": name, "count": count}
+            for (category_id, name), count in sorted(counts["category"].items(), key=lambda item: -item[1])
+        ],
+        "price": [
+            {"min": edges[index], "max": edges[index + 1], "count": counts["price"].get(index, 0)}
+            for index in range(len(bounds) + 1)
+        ],
+        "in_stock": [
+            {"value": value, "count": sum(n for key, n in counts["in_stock"].items() if bool(key) is value)}
+            for value in (True, False)
+        ],
+    }
+    return counts["total"], facets
+
+
 # Crear blueprint para productos
 products_blp = Blueprint(
     "products", 
@@ -26,10 +92,11 @@ products_blp = Blueprint(
 class Products(MethodView):
     """Endpoint para listar y crear productos"""
     
+    @products_blp.arguments(PaginationQuerySchema, location="query")
     @products_blp.response(200, ProductListSchema)
     @products_blp.doc(
         summary="Listar productos",
-        description="Obtiene una lista paginada de todos los productos en el sistema",
+        description="Obtiene una lista paginada de productos. Usar `next_cursor` como `cursor` para la página siguiente; `page`/`per_page` se mantienen por compatibilidad. `fields` limita los campos devueltos (p. ej. `?fields=id,name,price`).",
         responses={
             200: {
                 "description": "Lista de productos obtenida exitosamente",
@@ -47,26 +114,31 @@ class Products(MethodView):
                         }
                     ],
                     "total": 1,
-                    "page": 1,
-                    "per_page": 1
+                    "limit": 50,
+                    "next_cursor": None,
+                    "has_more": False
                 }
             },
+            304: {"description": "Sin cambios desde el ETag enviado en If-None-Match"},
             401: {"description": "No autorizado - Token JWT requerido"},
             500: {"description": "Error interno del servidor"}
         }
     )
     @jwt_required()
     @user_or_above_required
-    def get(self):
-        """Listar todos los productos"""
+    @conditional_get("products", "categories")
+    @response_cache.cached(ProductListSchema, "products", "categories")
+    def get(self, pagination_args):
+        """Listar productos (paginado por cursor)"""
+        fields = parse_fields(pagination_args.get("sparse_fields"), ProductSchema)
         try:
-            products = Product.query.all()
-            return {
-                "products": products,
-                "total": len(products),
-                "page": 1,
-                "per_page": len(products)
-            }
+            query = with_loaders(
+                Product.query, "products", fields, keep=(pagination_args.get("sort") or "id",)
+            )
+            page = paginate_query(query, Product, pagination_args, PRODUCT_SORT_KEYS)
+            return sparse_response(
+                ProductListSchema, {"products": page.items, **page.meta()}, fields, "products"
+            )
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -126,6 +198,7 @@ class Products(MethodView):
 class ProductById(MethodView):
     """Endpoint para obtener, actualizar y eliminar producto por ID"""
     
+    @products_blp.arguments(FieldsQuerySchema, location="query")
     @products_blp.response(200, ProductSchema)
     @products_blp.doc(
         summary="Obtener producto",
@@ -153,6 +226,7 @@ class ProductById(MethodView):
                     "updated_at": "2024-01-15T10:00:00"
                 }
             },
+            304: {"description": "Sin cambios desde el ETag enviado en If-None-Match"},
             401: {"description": "No autorizado - Token JWT requerido"},
             404: {"description": "Producto no encontrado"},
             500: {"description": "Error interno del servidor"}
@@ -160,11 +234,14 @@ class ProductById(MethodView):
     )
     @jwt_required()
     @user_or_above_required
-    def get(self, product_id):
+    @conditional_get("products", "categories")
+    @response_cache.cached(ProductSchema, "products", "categories")
+    def get(self, fields_args, product_id):
         """Obtener producto por ID"""
+        fields = parse_fields(fields_args.get("sparse_fields"), ProductSchema)
         try:
-            product = Product.query.get_or_404(product_id)
-            return product
+            product = with_loaders(Product.query, "products", fields).get_or_404(product_id)
+            return sparse_response(ProductSchema, product, fields)
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -287,7 +364,7 @@ class ProductSearch(MethodView):
     @products_blp.response(200, ProductListSchema)
     @products_blp.doc(
         summary="Buscar productos",
-        description="Busca y filtra productos según criterios específicos",
+        description="Busca y filtra productos según criterios específicos. `name` busca por prefijo de palabras en nombre y descripción (índice de texto completo) y, sin `sort`, ordena por relevancia. `in_stock` y `low_stock` filtran productos con stock disponible o en el mínimo. `facets=true` agrega contadores por categoría, rango de precio y stock sobre el resultado completo",
         responses={
             200: {
                 "description": "Productos encontrados según los criterios de búsqueda",
@@ -305,24 +382,38 @@ class ProductSearch(MethodView):
                         }
                     ],
                     "total": 1,
-                    "page": 1,
-                    "per_page": 1
+                    "limit": 50,
+                    "next_cursor": None,
+                    "has_more": False,
+                    "facets": {
+                        "category": [{"id": 1, "name": "Computadoras", "count": 1}],
+                        "price": [{"min": 1000.0, "max": None, "count": 1}],
+                        "in_stock": [{"value": True, "count": 1}, {"value": False, "count": 0}]
+                    }
                 }
             },
+            304: {"description": "Sin cambios desde el ETag enviado en If-None-Match"},
             401: {"description": "No autorizado - Token JWT requerido"},
             500: {"description": "Error interno del servidor"}
         }
     )
     @jwt_required()
     @user_or_above_required
+    @conditional_get("products", "categories", "stocks")
+    @response_cache.cached(ProductListSchema, "products", "categories", "stocks")
     def get(self, search_params):
         """Buscar productos según criterios"""
+        fields = parse_fields(search_params.get("sparse_fields"), ProductSchema)
         try:
-            query = Product.query
+            query = with_loaders(
+                Product.query, "products", fields, keep=(search_params.get("sort") or "id",)
+            )
             
             # Aplicar filtros de búsqueda
+            relevance = None
             if search_params.get('name'):
-                query = query.filter(Product.name.ilike(f"%{search_params['name']}%"))
+                # Índice de texto completo sobre nombre y descripción (prefijos + ranking)
+                query, relevance = apply_text_search(query, search_params['name'])
             
             if search_params.get('category_id'):
                 query = query.filter(Product.category_id == search_params['category_id'])
@@ -333,20 +424,73 @@ class ProductSearch(MethodView):
             if search_params.get('max_price'):
                 query = query.filter(Product.price <= search_params['max_price'])
             
+            # Stock: EXISTS correlacionado que resuelve cada producto con una búsqueda en el
+            # índice parcial (sin materializar la lista de ids ni recorrer stocks)
             if search_params.get('in_stock'):
-                # Filtrar solo productos con stock disponible
-                query = query.join(Product.stock).filter(Product.stock.quantity > 0)
-            
-            products = query.all()
+                query = query.filter(Product.stock.has(IN_STOCK_CONDITION))
+
+            if search_params.get('low_stock'):
+                query = query.filter(Product.stock.has(LOW_STOCK_CONDITION))
             
-            return {
-                "products": products,
-                "total": len(products),
-                "page": 1,
-                "per_page": len(products)
-            }
+            # Facetas: la misma consulta agregada da el total (reemplaza el COUNT)
+            total, facets = None, None
+            if search_params.get('facets'):
+                total, facets = product_facets(query)
+
+            if relevance is None:
+                page = paginate_query(query, Product, search_params, PRODUCT_SORT_KEYS, total=total)
+            else:
+                # Con texto de búsqueda, por defecto primero las mejores coincidencias
+                page = paginate_query(
+                    query, Product, search_params, PRODUCT_SORT_KEYS, total=total,
+                    default_sort="relevance", sort_expressions={"relevance": relevance}
+                )
+            data = {"products": page.items, **page.meta()}
+            if facets is not None:
+                data["facets"] = facets
+            return sparse_response(ProductListSchema, data, fields, "products")
+        except SQLAlchemyError as e:
+            abort(500, message=f"Error de base de datos: {str(e)}")
+
+@products_blp.route("/suggest")
+class ProductSuggest(MethodView):
+    """Endpoint de autocompletado de productos (índice de trigramas en memoria)"""
+
+    @products_blp.arguments(ProductSuggestQuerySchema, location="query")
+    @products_blp.response(200, ProductSuggestionListSchema)
+    @products_blp.doc(
+        summary="Sugerir productos",
+        description="Devuelve los productos cuyo nombre más se parece a `q` (tolera errores de tipeo y acentos), sin consultar la base de datos",
+        responses={
+            200: {
+                "description": "Mejores coincidencias ordenadas por puntaje",
+                "example": {
+                    "q": "lapto del",
+                    "suggestions": [
+                        {"id": 1, "name": "Laptop Dell XPS 13", "score": 0.7833}
+                    ]
+                }
+            },
+            401: {"description": "No autorizado - Token JWT requerido"},
+            422: {"description": "Parámetros inválidos"}
+        }
+    )
+    @jwt_required()
+    @user_or_above_required
+    def get(self, suggest_args):
+        """Sugerir productos por nombre"""
+        if not product_suggest_index.enabled:
+            abort(503, message="Índice de sugerencias deshabilitado")
+        try:
+            matches = product_suggest_index.search(suggest_args["q"], suggest_args["limit"])
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
+        return {
+            "q": suggest_args["q"],
+            "suggestions": [
+                {"id": product_id, "name": name, "score": score} for product_id, name, score in matches
+            ]
+        }
 
 @products_blp.route("/<int:product_id>/stock")
 class ProductStock(MethodView):
@@ -369,6 +513,7 @@ class ProductStock(MethodView):
             200: {
                 "description": "Producto con información de stock obtenido exitosamente"
             },
+            304: {"description": "Sin cambios desde el ETag enviado en If-None-Match"},
             401: {"description": "No autorizado - Token JWT requerido"},
             404: {"description": "Producto no encontrado"},
             500: {"description": "Error interno del servidor"}
@@ -376,6 +521,7 @@ class ProductStock(MethodView):
     )
     @jwt_required()
     @user_or_above_required
+    @conditional_get("products", "categories")
     def get(self, product_id):
         """Obtener producto con información de stock"""
         try:
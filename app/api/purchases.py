@@ -9,6 +9,11 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.database import db
 from app.models.purchase_order import PurchaseOrder
 from app.schemas.purchase_order import PurchaseOrderSchema, PurchaseOrderCreateSchema, PurchaseOrderUpdateSchema, PurchaseOrderListSchema
+from app.schemas.pagination import PaginationQuerySchema, FieldsQuerySchema
+from app.core.pagination import paginate_query
+from app.core.aggregates import summary_counts
+from app.core.loader_options import with_loaders
+from app.core.fieldsets import parse_fields, sparse_response
 from app.middleware.auth_middleware import require_auth, require_permission
 from app.validators.purchase_order_validators import (
     validate_purchase_order_completion, validate_purchase_order_update,
@@ -28,21 +33,34 @@ purchases_blp = Blueprint(
 class PurchaseOrders(MethodView):
     """Endpoint para listar y crear órdenes de compra"""
     
+    @purchases_blp.arguments(PaginationQuerySchema, location="query")
     @purchases_blp.response(200, PurchaseOrderListSchema)
     @require_auth
-    def get(self):
-        """Listar todas las órdenes de compra"""
+    def get(self, pagination_args):
+        """Listar órdenes de compra (paginado por cursor)"""
+        fields = parse_fields(pagination_args.get("sparse_fields"), PurchaseOrderSchema)
         try:
-            purchase_orders = PurchaseOrder.query.all()
-            pending_count = sum(1 for po in purchase_orders if po.status == 'pending')
-            completed_count = sum(1 for po in purchase_orders if po.status == 'completed')
+            # Contadores de todas las órdenes (no solo la página) en un único SELECT
+            counts = summary_counts(
+                PurchaseOrder.query,
+                pending_count=PurchaseOrder.status == 'pending',
+                completed_count=PurchaseOrder.status == 'completed'
+            )
+            page = paginate_query(
+                with_loaders(
+                    PurchaseOrder.query, "purchases", fields, keep=(pagination_args.get("sort") or "id",)
+                ),
+                PurchaseOrder,
+                pagination_args,
+                total=counts.pop("total")
+            )
             
-            return {
-                "purchase_orders": purchase_orders,
-                "total": len(purchase_orders),
-                "pending_count": pending_count,
-                "completed_count": completed_count
-            }
+            return sparse_response(
+                PurchaseOrderListSchema,
+                {"purchase_orders": page.items, **counts, **page.meta()},
+                fields,
+                "purchase_orders"
+            )
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -89,13 +107,17 @@ class PurchaseOrders(MethodView):
 class PurchaseOrderById(MethodView):
     """Endpoint para obtener, actualizar y eliminar orden de compra por ID"""
     
+    @purchases_blp.arguments(FieldsQuerySchema, location="query")
     @purchases_blp.response(200, PurchaseOrderSchema)
     @require_auth
-    def get(self, purchase_order_id):
+    def get(self, fields_args, purchase_order_id):
         """Obtener orden de compra por ID"""
+        fields = parse_fields(fields_args.get("sparse_fields"), PurchaseOrderSchema)
         try:
-            purchase_order = PurchaseOrder.query.get_or_404(purchase_order_id)
-            return purchase_order
+            purchase_order = with_loaders(
+                PurchaseOrder.query, "purchases", fields
+            ).get_or_404(purchase_order_id)
+            return sparse_response(PurchaseOrderSchema, purchase_order, fields)
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -3,15 +3,39 @@
 Endpoints de Stock con flask-smorest
 """
 
+from datetime import datetime, timezone
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from sqlalchemy.exc import SQLAlchemyError
 from app.database import db
 from app.models.stock import Stock
-from app.schemas.stock import StockSchema, StockCreateSchema, StockUpdateSchema, StockListSchema
+from app.models.stock_movement import StockMovement
+from app.schemas.stock import (
+    StockSchema, StockCreateSchema, StockUpdateSchema, StockListSchema, StockMovementListSchema,
+    StockBalanceQuerySchema, StockBalanceSchema, StockAuditQuerySchema, StockAuditSchema,
+    StockMovementSummaryQuerySchema, StockMovementSummarySchema, StockSnapshotResultSchema
+)
+from app.schemas.pagination import PaginationQuerySchema, FieldsQuerySchema
+from app.core.pagination import paginate_query
+from app.core.aggregates import summary_counts
+from app.core.loader_options import with_loaders
+from app.core.fieldsets import parse_fields, sparse_response
+from app.core.change_versions import conditional_get
+from app.core.stock_ledger import audit_balances, movement_summary, quantity_at, take_snapshots
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.decorators import user_or_above_required, manager_or_admin_required, admin_required
 from app.validators.stock_validators import validate_stock_creation, validate_stock_update
+from marshmallow import ValidationError
+
+# Columnas NOT NULL por las que se puede ordenar/paginar
+STOCK_SORT_KEYS = ("id", "product_id", "quantity")
+
+
+def _epoch(value):
+    """datetime del query string -> epoch (sin zona horaria se asume UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
 
 # Crear blueprint para stock
 stock_blp = Blueprint(
@@ -24,20 +48,32 @@ stock_blp = Blueprint(
 class StockItems(MethodView):
     """Endpoint para listar y crear items de stock"""
     
+    @stock_blp.arguments(PaginationQuerySchema, location="query")
     @stock_blp.response(200, StockListSchema)
     @jwt_required()
     @user_or_above_required
-    def get(self):
-        """Listar todo el stock"""
+    @conditional_get("stocks", "products", "categories")
+    def get(self, pagination_args):
+        """Listar stock (paginado por cursor)"""
+        fields = parse_fields(pagination_args.get("sparse_fields"), StockSchema)
         try:
-            stock_items = Stock.query.all()
-            low_stock_count = sum(1 for item in stock_items if item.quantity <= item.min_stock)
+            # Contadores de todo el stock (no solo la página) en un único SELECT
+            counts = summary_counts(
+                Stock.query,
+                low_stock_count=Stock.quantity <= Stock.min_stock,
+                out_of_stock_count=Stock.quantity == 0
+            )
+            page = paginate_query(
+                with_loaders(Stock.query, "stock", fields, keep=(pagination_args.get("sort") or "id",)),
+                Stock,
+                pagination_args,
+                STOCK_SORT_KEYS,
+                total=counts.pop("total")
+            )
             
-            return {
-                "stock_items": stock_items,
-                "total": len(stock_items),
-                "low_stock_count": low_stock_count
-            }
+            return sparse_response(
+                StockListSchema, {"stock_items": page.items, **counts, **page.meta()}, fields, "stock_items"
+            )
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -70,14 +106,17 @@ class StockItems(MethodView):
 class StockById(MethodView):
     """Endpoint para obtener, actualizar y eliminar stock por ID"""
     
+    @stock_blp.arguments(FieldsQuerySchema, location="query")
     @stock_blp.response(200, StockSchema)
     @jwt_required()
     @user_or_above_required
-    def get(self, stock_id):
+    @conditional_get("stocks", "products", "categories")
+    def get(self, fields_args, stock_id):
         """Obtener stock por ID"""
+        fields = parse_fields(fields_args.get("sparse_fields"), StockSchema)
         try:
-            stock = Stock.query.get_or_404(stock_id)
-            return stock
+            stock = with_loaders(Stock.query, "stock", fields).get_or_404(stock_id)
+            return sparse_response(StockSchema, stock, fields)
         except SQLAlchemyError as e:
             abort(500, message=f"Error de base de datos: {str(e)}")
     
@@ -113,11 +152,111 @@ class StockById(MethodView):
         """Eliminar stock"""
         try:
             stock = Stock.query.get_or_404(stock_id)
+            if stock.reserved_quantity > 0:
+                abort(400, message="No se puede eliminar stock con unidades reservadas por órdenes pendientes")
             db.session.delete(stock)
             db.session.commit()
         except SQLAlchemyError as e:
             db.session.rollback()
             abort(500, message=f"Error de base de datos: {str(e)}")
 
+@stock_blp.route("/<int:stock_id>/movements")
+class StockMovements(MethodView):
+    """Historia de movimientos (libro mayor) del producto de un item de stock"""
+
+    @stock_blp.arguments(PaginationQuerySchema, location="query")
+    @stock_blp.response(200, StockMovementListSchema)
+    @jwt_required()
+    @user_or_above_required
+    @conditional_get("stock_movements", "stocks")
+    def get(self, pagination_args, stock_id):
+        """Listar movimientos de stock (paginado por cursor)"""
+        try:
+            stock = Stock.query.get_or_404(stock_id)
+            page = paginate_query(
+                StockMovement.query.filter(StockMovement.product_id == stock.product_id),
+                StockMovement,
+                pagination_args,
+            )
+            return {"movements": page.items, **page.meta()}
+        except SQLAlchemyError as e:
+            abort(500, message=f"Error de base de datos: {str(e)}")
+
+
+@stock_blp.route("/<int:stock_id>/balance")
+class StockBalance(MethodView):
+    """Saldo de un item de stock en un instante dado"""
+
+    @stock_blp.arguments(StockBalanceQuerySchema, location="query")
+    @stock_blp.response(200, StockBalanceSchema)
+    @jwt_required()
+    @user_or_above_required
+    def get(self, balance_args, stock_id):
+        """Reconstruir el saldo desde la última instantánea anterior"""
+        try:
+            stock = Stock.query.get_or_404(stock_id)
+            at = balance_args.get("at") or datetime.now(timezone.utc)
+            return quantity_at(db.session, stock.product_id, _epoch(at))
+        except SQLAlchemyError as e:
+            abort(500, message=f"Error de base de datos: {str(e)}")
+
+
+@stock_blp.route("/movements/summary")
+class StockMovementSummary(MethodView):
+    """Totales de movimientos por tipo y motivo"""
+
+    @stock_blp.arguments(StockMovementSummaryQuerySchema, location="query")
+    @stock_blp.response(200, StockMovementSummarySchema)
+    @jwt_required()
+    @manager_or_admin_required
+    def get(self, summary_args):
+        """Resumen de movimientos de un período (p. ej. mermas por motivo)"""
+        try:
+            totals = movement_summary(
+                db.session,
+                since=_epoch(summary_args["since"]) if "since" in summary_args else None,
+                until=_epoch(summary_args["until"]) if "until" in summary_args else None,
+                kinds=[summary_args["kind"]] if "kind" in summary_args else None,
+                product_id=summary_args.get("product_id"),
+            )
+            return {"totals": totals}
+        except SQLAlchemyError as e:
+            abort(500, message=f"Error de base de datos: {str(e)}")
+
+
+@stock_blp.route("/audit")
+class StockAudit(MethodView):
+    """Conciliación del saldo materializado con el libro mayor"""
+
+    @stock_blp.arguments(StockAuditQuerySchema, location="query")
+    @stock_blp.response(200, StockAuditSchema)
+    @jwt_required()
+    @admin_required
+    def get(self, audit_args):
+        """Auditar saldos contra instantáneas y movimientos"""
+        try:
+            product_id = audit_args.get("product_id")
+            return audit_balances(db.session, [product_id] if product_id is not None else None)
+        except SQLAlchemyError as e:
+            abort(500, message=f"Error de base de datos: {str(e)}")
+
+
+@stock_blp.route("/snapshots")
+class StockSnapshots(MethodView):
+    """Instantáneas de saldos del libro mayor"""
+
+    @stock_blp.response(201, StockSnapshotResultSchema)
+    @jwt_required()
+    @admin_required
+    def post(self):
+        """Tomar instantáneas de los productos con movimientos nuevos"""
+        try:
+            created = take_snapshots(db.session)
+            db.session.commit()
+            return {"snapshots": created}
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            abort(500, message=f"Error de base de datos: {str(e)}")
+
 # Exportar el blueprint con el nombre esperado
 stock_bp = stock_blp
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Endpoints de Sistema con flask-smorest
+"""
+
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from flask_jwt_extended import jwt_required
+from app.decorators import admin_required
+from app.core.response_cache import response_cache
+from app.core.principal_cache import principal_cache
+from app.core.token_cache import decoded_token_cache
+from app.core.product_suggest import product_suggest_index
+
+# Crear blueprint para sistema
+system_blp = Blueprint(
+    "system",
+    __name__,
+    description="Estado interno del servicio"
+)
+
+@system_blp.route("/cache-stats")
+class CacheStats(MethodView):
+    """Contadores de los caches del proceso (para ajustar tamaños)"""
+
+    @system_blp.response(200)
+    @system_blp.doc(
+        summary="Estadísticas de caches",
+        description="Aciertos, fallos, expulsiones e invalidaciones de los caches de este worker, y memoria del índice de sugerencias",
+        responses={
+            200: {
+                "description": "Contadores por cache",
+                "example": {
+                    "response_cache": {
+                        "backend": "LRUCacheBackend",
+                        "size": 12,
+                        "hits": 340,
+                        "misses": 25,
+                        "evictions": 0,
+                        "invalidations": 13
+                    }
+                }
+            },
+            401: {"description": "No autorizado - Token JWT requerido"},
+            403: {"description": "Prohibido - Solo administradores"}
+        }
+    )
+    @jwt_required()
+    @admin_required
+    def get(self):
+        """Obtener estadísticas de caches"""
+        return {
+            "response_cache": response_cache.stats(),
+            "principal_cache": principal_cache.stats(),
+            "decoded_token_cache": decoded_token_cache.stats(),
+            "product_suggest_index": product_suggest_index.stats()
+        }
+
+# Exportar el blueprint con el nombre esperado
+system_bp = system_blp
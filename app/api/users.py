@@ -10,7 +10,9 @@ from marshmallow import Schema, fields, ValidationError
 from ..models.user import User
 from ..database import db
 from ..decorators.role_decorators import roles_required
-from werkzeug.security import generate_password_hash
+from ..core.principal_cache import invalidate_principal
+from ..core.password_hashing import hash_password
+from ..core.aggregates import summary_counts, group_counts
 
 # Crear blueprint
 users_blp = Blueprint(
@@ -84,7 +86,7 @@ class UsersList(MethodView):
         # Crear usuario
         new_user = User(
             username=user_data['username'],
-            password_hash=generate_password_hash(user_data['password']),
+            password_hash=hash_password(user_data['password']),
             first_name=user_data.get('first_name', ''),
             last_name=user_data.get('last_name', ''),
             email=user_data.get('email', ''),
@@ -138,8 +140,11 @@ class UsersResource(MethodView):
         if 'is_active' in user_data:
             user.is_active = user_data['is_active']
         
+        if 'role' in user_data or 'is_active' in user_data:
+            invalidate_principal(user.id)
+        
         if 'password' in user_data and user_data['password']:
-            user.password_hash = generate_password_hash(user_data['password'])
+            user.password_hash = hash_password(user_data['password'])
         
         db.session.commit()
         return user
@@ -160,6 +165,7 @@ class UsersResource(MethodView):
             if admin_count <= 1:
                 abort(400, message="No se puede eliminar el último administrador")
         
+        invalidate_principal(user.id)
         db.session.delete(user)
         db.session.commit()
         
@@ -186,6 +192,7 @@ class UserToggleStatus(MethodView):
                 abort(400, message="No se puede desactivar el último administrador")
         
         user.is_active = not user.is_active
+        invalidate_principal(user.id)
         db.session.commit()
         
         return {
@@ -224,7 +231,7 @@ class UserProfile(MethodView):
             user.email = profile_data['email']
         
         if 'password' in profile_data and profile_data['password']:
-            user.password_hash = generate_password_hash(profile_data['password'])
+            user.password_hash = hash_password(profile_data['password'])
         
         db.session.commit()
         return user
@@ -237,13 +244,14 @@ class UserStats(MethodView):
     @roles_required('admin')
     def get(self):
         """Obtener estadísticas de usuarios"""
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
+        # Un SELECT para totales y un GROUP BY para la distribución por rol
+        counts = summary_counts(User.query, active=User.is_active.is_(True))
+        total_users = counts['total']
+        active_users = counts['active']
         inactive_users = total_users - active_users
         
-        role_stats = {}
-        for role in ['admin', 'manager', 'supervisor', 'user']:
-            role_stats[role] = User.query.filter_by(role=role).count()
+        by_role = group_counts(User.query, User.role)
+        role_stats = {role: by_role.get(role, 0) for role in ['admin', 'manager', 'supervisor', 'user']}
         
         return {
             'total_users': total_users,
@@ -32,6 +32,52 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 hora
     JWT_REFRESH_TOKEN_EXPIRES = int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 2592000))  # 30 días
     
+    # ⚡ Cache de identidad (principales activos por proceso)
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 1024))  # 0 = deshabilitado
+    PRINCIPAL_CACHE_TTL = float(os.environ.get('PRINCIPAL_CACHE_TTL', 60))  # segundos
+    PRINCIPAL_CACHE_SYNC_INTERVAL = float(os.environ.get('PRINCIPAL_CACHE_SYNC_INTERVAL', 2))  # segundos entre workers
+    DECODED_TOKEN_CACHE_SIZE = int(os.environ.get('DECODED_TOKEN_CACHE_SIZE', 2048))  # tokens verificados; 0 = deshabilitado
+    
+    # 🔏 Autorización sin estado: confiar en los roles firmados del JWT
+    AUTH_TRUST_TOKEN_CLAIMS = os.environ.get('AUTH_TRUST_TOKEN_CLAIMS', 'False').lower() == 'true'
+    AUTH_DENYLIST_REFRESH_INTERVAL = float(os.environ.get('AUTH_DENYLIST_REFRESH_INTERVAL', 5))  # segundos
+    
+    # 🚫 Revocación de tokens (logout) por jti
+    TOKEN_REVOCATION_SYNC_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', 2))  # segundos entre workers
+    TOKEN_REVOCATION_BLOOM_BITS = int(os.environ.get('TOKEN_REVOCATION_BLOOM_BITS', 0))  # 0 = sin filtro de Bloom
+    
+    # 🔑 Hashing de contraseñas (pool acotado y política de costo)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')  # p. ej. 'pbkdf2:sha256:600000'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))  # en espera antes de responder 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # segundos
+    
+    # 🕒 Escritura diferida de last_login (0 = escribir en cada login)
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', 5))  # segundos
+    LAST_LOGIN_FLUSH_SIZE = int(os.environ.get('LAST_LOGIN_FLUSH_SIZE', 100))  # logins pendientes
+    
+    # 📄 Paginación de listados
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get('PAGINATION_DEFAULT_LIMIT', 50))
+    PAGINATION_MAX_LIMIT = int(os.environ.get('PAGINATION_MAX_LIMIT', 500))
+    
+    # 🗃️ Cache de respuestas del catálogo (categorías y productos)
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'lru')  # 'lru' | 'redis' | 'none'
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))  # entradas LRU; 0 = deshabilitado
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))  # segundos (solo redis)
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # 🗜️ Compresión de respuestas negociada por Accept-Encoding
+    COMPRESSION_ALGORITHMS = os.environ.get('COMPRESSION_ALGORITHMS', 'zstd,br,gzip')  # preferencia; vacío = sin compresión
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    
+    # 🔎 Facetas de búsqueda de productos: límites de los rangos de precio
+    PRODUCT_PRICE_BUCKETS = os.environ.get('PRODUCT_PRICE_BUCKETS', '10,50,100,500,1000')
+    
+    # 🔤 Índice de trigramas para sugerencias de productos (autocompletado)
+    SUGGEST_INDEX_MAX_PRODUCTS = int(os.environ.get('SUGGEST_INDEX_MAX_PRODUCTS', 100000))  # 0 = deshabilitado
+    SUGGEST_INDEX_MAX_NAME_LENGTH = int(os.environ.get('SUGGEST_INDEX_MAX_NAME_LENGTH', 64))  # caracteres indexados
+    SUGGEST_INDEX_SYNC_INTERVAL = float(os.environ.get('SUGGEST_INDEX_SYNC_INTERVAL', 5))  # segundos entre workers
+    
     # 📚 Configuración de la API
     API_TITLE = os.environ.get('API_TITLE', 'Sistema de Gestión de Inventario API')
     API_VERSION = os.environ.get('API_VERSION', 'v1')
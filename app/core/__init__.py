@@ -17,6 +17,65 @@ from .permissions import (
     user_or_above_required,
     viewer_or_above_required
 )
+from .identity import (
+    Principal,
+    resolve_principal,
+    principal_from_claims,
+    get_current_principal
+)
+from .principal_cache import (
+    PrincipalCache,
+    principal_cache,
+    invalidate_principal
+)
+from .sqlite_pool import (
+    SQLitePool,
+    sqlite_pool,
+    direct_connection,
+    resolve_sqlite_path
+)
+from .user_denylist import (
+    UserDenylist,
+    user_denylist
+)
+from .password_hashing import (
+    PasswordHasher,
+    HashingPoolSaturated,
+    password_hasher,
+    hash_password,
+    verify_password,
+    needs_rehash
+)
+from .token_revocation import (
+    BloomFilter,
+    TokenRevocationStore,
+    token_revocation_store
+)
+from .token_cache import (
+    DecodedTokenCache,
+    CachingJWTManager,
+    decoded_token_cache
+)
+from .last_login_buffer import (
+    LastLoginBuffer,
+    last_login_buffer
+)
+from .schema_upgrades import (
+    schema_upgrade,
+    ensure_schema
+)
+from .change_versions import (
+    bump_versions,
+    current_versions,
+    conditional_get,
+    on_tables_committed
+)
+from .response_cache import (
+    LRUCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    response_cache
+)
 
 __all__ = [
     'PermissionManager',
@@ -30,5 +89,42 @@ __all__ = [
     'manager_or_above_required',
     'supervisor_or_above_required',
     'user_or_above_required',
-    'viewer_or_above_required'
+    'viewer_or_above_required',
+    'Principal',
+    'resolve_principal',
+    'principal_from_claims',
+    'get_current_principal',
+    'PrincipalCache',
+    'principal_cache',
+    'invalidate_principal',
+    'SQLitePool',
+    'sqlite_pool',
+    'direct_connection',
+    'resolve_sqlite_path',
+    'UserDenylist',
+    'user_denylist',
+    'PasswordHasher',
+    'HashingPoolSaturated',
+    'password_hasher',
+    'hash_password',
+    'verify_password',
+    'needs_rehash',
+    'BloomFilter',
+    'TokenRevocationStore',
+    'token_revocation_store',
+    'DecodedTokenCache',
+    'CachingJWTManager',
+    'decoded_token_cache',
+    'LastLoginBuffer',
+    'last_login_buffer',
+    'schema_upgrade',
+    'ensure_schema',
+    'bump_versions',
+    'current_versions',
+    'conditional_get',
+    'on_tables_committed',
+    'LRUCacheBackend',
+    'RedisCacheBackend',
+    'ResponseCache',
+    'response_cache'
 ]
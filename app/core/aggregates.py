@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Agregados en SQL para Contadores de Listados
+Calcula los contadores de resumen (pendientes, stock bajo, activos...) en un
+único SELECT, sin materializar filas ORM y sin depender de la página devuelta.
+"""
+
+from sqlalchemy import case, func
+from app.database import db
+
+# Dialectos con soporte de COUNT(*) FILTER (WHERE ...)
+_FILTER_CLAUSE_DIALECTS = {"sqlite", "postgresql"}
+
+
+def _conditional_count(condition):
+    if db.engine.dialect.name in _FILTER_CLAUSE_DIALECTS:
+        return func.count().filter(condition)
+    # Portable: COUNT ignora los NULL del CASE sin ELSE
+    return func.count(case((condition, 1)))
+
+
+def summary_counts(query, **conditions) -> dict:
+    """
+    Devuelve {'total': n, <nombre>: n, ...} con un COUNT por condición,
+    todo en una sola consulta sobre el filtro de `query`.
+    """
+    columns = [func.count().label("total")]
+    columns += [_conditional_count(condition).label(name) for name, condition in conditions.items()]
+    row = query.order_by(None).with_entities(*columns).one()
+    return {key: value or 0 for key, value in row._asdict().items()}
+
+
+def group_counts(query, column) -> dict:
+    """Devuelve {valor: cantidad} con un único GROUP BY sobre `column`"""
+    rows = query.order_by(None).with_entities(column, func.count()).group_by(column).all()
+    return {value: count for value, count in rows}
+
+
+def facet_counts(query, **facets) -> dict:
+    """
+    Devuelve {'total': n, <faceta>: {valor: cantidad}} con un único GROUP BY
+    sobre todas las expresiones de faceta a la vez: el resultado tiene una fila
+    por combinación de valores (acotado por la cantidad de valores de cada
+    faceta, no por las filas filtradas) y cada faceta se suma aquí.
+
+    facets: nombre -> expresión, o tupla de expresiones (el valor es la tupla)
+    """
+    columns, slices = [], {}
+    for name, expression in facets.items():
+        group = expression if isinstance(expression, tuple) else (expression,)
+        slices[name] = (len(columns), len(columns) + len(group), isinstance(expression, tuple))
+        columns.extend(group)
+
+    rows = query.order_by(None).with_entities(*columns, func.count()).group_by(*columns).all()
+    result = {"total": 0, **{name: {} for name in facets}}
+    for row in rows:
+        count = row[-1]
+        result["total"] += count
+        for name, (start, end, composite) in slices.items():
+            value = tuple(row[start:end]) if composite else row[start]
+            result[name][value] = result[name].get(value, 0) + count
+    return result
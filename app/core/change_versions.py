@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Versiones de Cambio por Tabla y GET Condicional
+Cada flush de la sesión incrementa, en la misma transacción, la versión de
+las tablas que escribe (tabla table_versions). Los GET de catálogo derivan un
+ETag fuerte de esas versiones y responden 304 a If-None-Match sin cargar filas:
+un catálogo sin cambios cuesta una consulta mínima y ningún cuerpo.
+
+Al confirmar una transacción se avisa a los suscriptos (on_tables_committed)
+qué tablas escribió, p. ej. para invalidar caches de respuesta.
+"""
+
+import hashlib
+import sqlite3
+from functools import wraps
+from flask import Response, g, request
+from sqlalchemy import bindparam, event, inspect as sa_inspect, text
+from sqlalchemy.orm import Session
+from app.database import db
+from .sqlite_pool import direct_connection
+from .compression import etag_variants
+from .schema_upgrades import create_missing_tables, schema_upgrade
+
+VERSIONS_TABLE = "table_versions"
+
+# Callbacks(tables) llamados tras cada commit que escribió tablas
+_commit_listeners = []
+
+_BUMP_VERSION_SQL = text(
+    """
+    INSERT INTO table_versions (table_name, version) VALUES (:table_name, 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1
+    """
+)
+_SELECT_VERSIONS_SQL = text(
+    "SELECT table_name, version FROM table_versions WHERE table_name IN :tables"
+).bindparams(bindparam("tables", expanding=True))
+
+
+@schema_upgrade
+def ensure_versions_table(connection):
+    """Crea table_versions en bases anteriores a este módulo (cada flush escribe en ella)"""
+    create_missing_tables(connection, VERSIONS_TABLE)
+
+
+def bump_versions(connection, tables):
+    """
+    Incrementa la versión de `tables` sobre `connection` (Connection de
+    SQLAlchemy o sqlite3), dentro de la transacción en curso. Para escrituras
+    que no pasan por la sesión ORM (SQL directo).
+    """
+    rows = [{"table_name": name} for name in sorted(set(tables)) if name != VERSIONS_TABLE]
+    if not rows:
+        return
+    if isinstance(connection, sqlite3.Connection):
+        connection.executemany(str(_BUMP_VERSION_SQL), rows)
+    else:
+        connection.execute(_BUMP_VERSION_SQL, rows)
+
+
+def on_tables_committed(callback):
+    """Suscribe callback(tables) a los commits de la sesión que escriben tablas"""
+    _commit_listeners.append(callback)
+    return callback
+
+
+def _record_written(session, tables):
+    session.info.setdefault("written_tables", set()).update(tables)
+
+
+def _tables_of(instances):
+    tables = set()
+    for instance in instances:
+        for table in sa_inspect(instance).mapper.tables:
+            tables.add(table.name)
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session, flush_context):
+    # new/dirty/deleted todavía reflejan el estado previo al flush
+    dirty = (obj for obj in session.dirty if session.is_modified(obj, include_collections=False))
+    tables = _tables_of(session.new) | _tables_of(dirty) | _tables_of(session.deleted)
+    if tables:
+        bump_versions(session.connection(), tables)
+        _record_written(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_write(orm_execute_state):
+    # query.update()/query.delete() no pasan por el flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper:
+        tables = {table.name for table in orm_execute_state.bind_mapper.tables}
+        bump_versions(orm_execute_state.session.connection(), tables)
+        _record_written(orm_execute_state.session, tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_commit(session):
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        for callback in _commit_listeners:
+            callback(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written(session):
+    session.info.pop("written_tables", None)
+
+
+def current_versions(tables) -> dict:
+    """{tabla: versión} de las versiones confirmadas (0 si la tabla nunca se escribió)"""
+    tables = tuple(tables)
+    versions = dict.fromkeys(tables, 0)
+    try:
+        with direct_connection() as conn:
+            if conn is not None:
+                placeholders = ",".join("?" * len(tables))
+                rows = conn.execute(
+                    f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})",
+                    tables,
+                ).fetchall()
+            else:
+                rows = db.session.execute(_SELECT_VERSIONS_SQL, {"tables": list(tables)}).fetchall()
+    except sqlite3.OperationalError:
+        # Tabla aún no creada: sin versiones publicadas
+        return versions
+    versions.update(dict(rows))
+    return versions
+
+
+def request_versions(tables) -> dict:
+    """current_versions() leído una sola vez por request (ETag y cache lo comparten)"""
+    key = tuple(sorted(tables))
+    cached = g.setdefault("_table_versions", {})
+    if key not in cached:
+        cached[key] = current_versions(key)
+    return cached[key]
+
+
+def compute_etag(tables) -> str:
+    """ETag fuerte de la representación pedida (ruta + query string) a las versiones actuales"""
+    versions = request_versions(tables)
+    payload = request.full_path + "|" + ",".join(f"{name}:{versions[name]}" for name in sorted(versions))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def conditional_get(*tables):
+    """
+    Decorador para GET que dependen de `tables`: responde 304 si If-None-Match
+    coincide (antes de ejecutar la vista) y agrega ETag a la respuesta.
+    Va debajo de los decoradores de autenticación.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(tables)
+            # El cliente puede tener la variante comprimida (p. ej. "<etag>-gzip")
+            for variant in etag_variants(etag):
+                if variant in request.if_none_match:
+                    response = Response(status=304)
+                    response.set_etag(variant)
+                    return response
+
+            result = view(*args, **kwargs)
+            if isinstance(result, Response):
+                result.set_etag(etag)
+                return result
+            return result, {"ETag": f'"{etag}"'}
+        return wrapper
+    return decorator
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compresión Negociada de Respuestas
+Comprime las respuestas de la API según Accept-Encoding (zstd, br, gzip, en
+ese orden de preferencia si están disponibles), a partir de un tamaño mínimo.
+Las respuestas en streaming se comprimen por chunks (con flush en cada uno) y
+las que vienen del cache de respuestas guardan su variante comprimida para
+no recomprimir en cada acierto.
+"""
+
+import gzip
+import zlib
+from flask import g, request
+
+try:
+    import zstandard
+except ImportError:  # codec opcional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # codec opcional
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+# Niveles: compromiso entre CPU por request y tamaño
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 5
+_ZSTD_LEVEL = 3
+
+
+class _GzipCodec:
+    name = "gzip"
+
+    @staticmethod
+    def compress(data):
+        return gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0)
+
+    @staticmethod
+    def stream(chunks):
+        compressor = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: contenedor gzip
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class _BrotliCodec:
+    name = "br"
+
+    @staticmethod
+    def compress(data):
+        return brotli.compress(data, quality=_BROTLI_QUALITY)
+
+    @staticmethod
+    def stream(chunks):
+        compressor = brotli.Compressor(quality=_BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class _ZstdCodec:
+    name = "zstd"
+
+    @staticmethod
+    def compress(data):
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+
+    @staticmethod
+    def stream(chunks):
+        compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        yield compressor.flush()
+
+
+def available_codecs() -> dict:
+    """Codecs utilizables en este entorno, por nombre de Content-Encoding"""
+    codecs = {"gzip": _GzipCodec}
+    if brotli is not None:
+        codecs["br"] = _BrotliCodec
+    if zstandard is not None:
+        codecs["zstd"] = _ZstdCodec
+    return codecs
+
+
+def etag_variants(etag):
+    """ETags con los que puede volver un cliente: el base y uno por codificación"""
+    return [etag] + [f"{etag}-{name}" for name in available_codecs()]
+
+
+class ResponseCompressor:
+    """Middleware de compresión registrado como after_request"""
+
+    def __init__(self):
+        self.codecs = []
+        self.min_size = 1024
+
+    def init_app(self, app):
+        """Configura codecs y umbral desde app.config (se llama desde create_app)"""
+        available = available_codecs()
+        preferred = [name.strip() for name in app.config["COMPRESSION_ALGORITHMS"].split(",") if name.strip()]
+        self.codecs = [available[name] for name in preferred if name in available]
+        self.min_size = app.config["COMPRESSION_MIN_SIZE"]
+        if self.codecs:
+            app.after_request(self.compress_response)
+
+    def negotiate(self):
+        """Primer codec del servidor que el cliente acepta (q > 0), o None"""
+        accepted = request.accept_encodings
+        for codec in self.codecs:
+            if accepted.quality(codec.name) > 0:
+                return codec
+        return None
+
+    def compress_response(self, response):
+        if not self._is_compressible(response):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        codec = self.negotiate()
+        if codec is None:
+            return response
+
+        if response.is_streamed:
+            # Streaming/chunked: se comprime a medida que se generan los chunks
+            response.response = codec.stream(_as_bytes(response.response))
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(self._compressed_body(codec, data))
+
+        response.headers["Content-Encoding"] = codec.name
+        etag, weak = response.get_etag()
+        if etag:
+            # Representación distinta -> ETag distinto (conditional_get acepta las variantes)
+            response.set_etag(f"{etag}-{codec.name}", weak=weak)
+        return response
+
+    def _compressed_body(self, codec, data):
+        # Variante precomprimida junto a la entrada del cache de respuestas
+        entry = g.get("response_cache_entry")
+        if entry is None:
+            return codec.compress(data)
+        cache, key, tags = entry
+        compressed = cache.get_variant(key, codec.name)
+        if compressed is None:
+            compressed = codec.compress(data)
+            cache.put_variant(key, codec.name, compressed, tags)
+        return compressed
+
+    @staticmethod
+    def _is_compressible(response):
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if "Content-Encoding" in response.headers or response.direct_passthrough:
+            return False
+        mimetype = response.mimetype or ""
+        return mimetype.startswith(_COMPRESSIBLE_TYPES)
+
+
+def _as_bytes(chunks):
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+# Instancia única por proceso
+response_compressor = ResponseCompressor()
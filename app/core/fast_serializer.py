@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Serialización Compilada para Listados Grandes
+Genera una vez por esquema una función Python especializada que convierte
+filas (objetos ORM, Row de Core o dicts) en dicts listos para JSON, con la
+misma salida que Schema.dump pero sin recorrer la maquinaria de marshmallow
+campo por campo en cada objeto.
+
+FastDumpSchema la usa en dump(), así que se integra sin cambios con
+@blp.response de flask-smorest y con el `only` de los fieldsets.
+"""
+
+import decimal
+import threading
+from operator import methodcaller
+from marshmallow import Schema, fields, missing
+from marshmallow.utils import get_value
+from sqlalchemy.engine import Row
+
+# Campos cuya serialización se replica en línea: tipo exacto -> convertidor
+_STRING_FIELDS = (fields.String, fields.Email, fields.URL)
+_NUMBER_CONVERTERS = {fields.Integer: int, fields.Float: float}
+_ISO_FORMATS = (None, "iso", "iso8601")
+
+_compile_lock = threading.Lock()
+
+# Clases mapeadas por SQLAlchemy ya vistas (se leen desde __dict__)
+_ORM_CLASSES = set()
+
+
+def _decimal_converter(field):
+    places, rounding, allow_nan = field.places, field.rounding, field.allow_nan
+
+    def convert(value):
+        # Igual que fields.Decimal._format_num
+        num = decimal.Decimal(str(value))
+        if allow_nan and num.is_nan():
+            return decimal.Decimal("NaN")
+        if places is not None and num.is_finite():
+            num = num.quantize(places, rounding=rounding)
+        return num
+    return convert
+
+
+_isoformat = methodcaller("isoformat")
+
+
+class _NestedConverter:
+    """Serializa un Nested con el esquema anidado compilado (en el primer uso: admite ciclos)"""
+
+    __slots__ = ("field", "_dump")
+
+    def __init__(self, field):
+        self.field = field
+        self._dump = None
+
+    def __call__(self, value):
+        if self._dump is None:
+            schema = self.field.schema
+            serializer = compiled_serializer(schema)
+            many = schema.many or self.field.many
+            if serializer is None:
+                self._dump = lambda v: schema.dump(v, many=many)
+            elif many:
+                self._dump = lambda v: [serializer(item) for item in v]
+            else:
+                self._dump = serializer
+        return self._dump(value)
+
+
+def _converter(field):
+    """Convertidor en línea para `field`, o None si hay que delegar en marshmallow"""
+    if field.dump_default is not missing or not field._CHECK_ATTRIBUTE:
+        return None
+    field_type = type(field)
+    if field_type in _STRING_FIELDS:
+        return str
+    if field_type in _NUMBER_CONVERTERS and not field.as_string:
+        return _NUMBER_CONVERTERS[field_type]
+    if field_type is fields.Decimal and not field.as_string:
+        return _decimal_converter(field)
+    if field_type in (fields.DateTime, fields.Date) and field.format in _ISO_FORMATS:
+        return _isoformat
+    if field_type is fields.Nested:
+        return _NestedConverter(field)
+    return None
+
+
+def _getter(variant, name, attribute):
+    """Líneas que dejan en `v` el valor del campo (MISSING si no existe), como get_value"""
+    if "." in attribute:
+        if variant == "row":
+            # En filas de Core los valores anidados vienen etiquetados con el nombre del campo
+            return [f"v = getattr(obj, {name!r}, MISSING)"]
+        if variant == "dict":
+            return [f"v = get_value(obj, {attribute!r}, MISSING)"]
+        first, *rest = attribute.split(".")
+        lines = [f"v = getattr(obj, {first!r}, MISSING)"]
+        for key in rest:
+            lines.append(
+                f"v = MISSING if v is MISSING or v is None else "
+                f"(v.get({key!r}, MISSING) if v.__class__ is dict else getattr(v, {key!r}, MISSING))"
+            )
+        return lines
+    if variant == "dict":
+        return [f"v = obj.get({attribute!r}, MISSING)"]
+    if variant == "orm":
+        # Columnas ya cargadas: directo del __dict__ de la instancia (lo mismo que
+        # devuelve el descriptor instrumentado); si no está, getattr (lazy/expired)
+        return [
+            f"v = state.get({attribute!r}, MISSING)",
+            "if v is MISSING:",
+            f"    v = getattr(obj, {attribute!r}, MISSING)",
+        ]
+    return [f"v = getattr(obj, {attribute!r}, MISSING)"]
+
+
+def _compile(schema):
+    namespace = {"MISSING": missing, "get_value": get_value, "accessor": schema.get_attribute}
+    bodies = {"attr": [], "orm": ["    state = obj.__dict__"], "dict": [], "row": []}
+
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        convert = _converter(field)
+        for variant, body in bodies.items():
+            if convert is None:
+                namespace[f"f{index}"] = field
+                body.append(f"    v = f{index}.serialize({name!r}, obj, accessor=accessor)")
+                body.append("    if v is not MISSING:")
+                body.append(f"        out[{key!r}] = v")
+            else:
+                namespace[f"c{index}"] = convert
+                body.extend("    " + line for line in _getter(variant, name, attribute))
+                body.append("    if v is not MISSING:")
+                body.append(f"        out[{key!r}] = None if v is None else c{index}(v)")
+
+    source = []
+    for variant, body in bodies.items():
+        source.append(f"def dump_{variant}(obj):")
+        source.append("    out = {}")
+        source.extend(body)
+        source.append("    return out")
+    source.append("def dump(obj):")
+    source.append("    cls = obj.__class__")
+    source.append("    if cls in ORM_CLASSES:")
+    source.append("        return dump_orm(obj)")
+    source.append("    if cls is dict:")
+    source.append("        return dump_dict(obj)")
+    source.append("    if isinstance(obj, Row):")
+    source.append("        return dump_row(obj)")
+    source.append("    if hasattr(cls, '_sa_class_manager'):")
+    source.append("        ORM_CLASSES.add(cls)")
+    source.append("        return dump_orm(obj)")
+    source.append("    return dump_attr(obj)")
+    namespace["Row"] = Row
+    namespace["ORM_CLASSES"] = _ORM_CLASSES
+
+    exec(compile("\n".join(source), f"<fast_serializer {type(schema).__name__}>", "exec"), namespace)
+    return namespace["dump"]
+
+
+def compiled_serializer(schema):
+    """
+    Función obj -> dict compilada para la instancia `schema` (se cachea en
+    ella). None si el esquema tiene pre/post_dump o get_attribute propio:
+    en ese caso debe usarse schema.dump.
+    """
+    serializer = schema.__dict__.get("_compiled_dump", missing)
+    if serializer is not missing:
+        return serializer
+    with _compile_lock:
+        serializer = schema.__dict__.get("_compiled_dump", missing)
+        if serializer is missing:
+            customized = (
+                schema._hooks["pre_dump"]
+                or schema._hooks["post_dump"]
+                or type(schema).get_attribute is not Schema.get_attribute
+            )
+            serializer = None if customized else _compile(schema)
+            schema.__dict__["_compiled_dump"] = serializer
+    return serializer
+
+
+def _compile_positional(schema, keys):
+    """Variante para filas de Core con columnas `keys`: lee por índice, sin buscar por nombre"""
+    namespace = {"MISSING": missing, "accessor": schema.get_attribute}
+    body = []
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        column = name if "." in attribute else attribute
+        convert = _converter(field)
+        if convert is None:
+            namespace[f"f{index}"] = field
+            body.append(f"    v = f{index}.serialize({name!r}, obj, accessor=accessor)")
+            body.append("    if v is not MISSING:")
+            body.append(f"        out[{key!r}] = v")
+        elif column in keys:
+            namespace[f"c{index}"] = convert
+            body.append(f"    v = obj[{keys.index(column)}]")
+            body.append(f"    out[{key!r}] = None if v is None else c{index}(v)")
+    source = ["def dump_row(obj):", "    out = {}", *body, "    return out"]
+    exec(compile("\n".join(source), f"<fast_serializer {type(schema).__name__} rows>", "exec"), namespace)
+    return namespace["dump_row"]
+
+
+def serialize_rows(schema, rows):
+    """
+    Serializa una lista de filas con el esquema compilado. Para Row de Core
+    (p. ej. session.execute(select(...)).all()) los valores anidados se
+    etiquetan con el nombre del campo: Category.name.label("category_name").
+    """
+    serializer = compiled_serializer(schema)
+    if serializer is None:
+        return schema.dump(rows, many=True)
+    if rows and isinstance(rows[0], Row):
+        keys = tuple(rows[0]._fields)
+        with _compile_lock:
+            positional = schema.__dict__.setdefault("_compiled_rows", {})
+            if keys not in positional:
+                positional[keys] = _compile_positional(schema, keys)
+        serializer = positional[keys]
+    return [serializer(row) for row in rows]
+
+
+class FastDumpSchema(Schema):
+    """Schema cuyo dump() usa el serializador compilado (misma salida)"""
+
+    def dump(self, obj, *, many=None):
+        many = self.many if many is None else bool(many)
+        serializer = compiled_serializer(self)
+        if serializer is None or (many and obj is None):
+            return super().dump(obj, many=many)
+        if many:
+            return [serializer(item) for item in obj]
+        return serializer(obj)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Selección Parcial de Campos (?fields=)
+El cliente pide solo los campos que muestra: el esquema serializa solo esos
+campos, el SELECT trae solo sus columnas (load_only) y las relaciones que no
+se pidieron no se cargan.
+
+Formato: ?fields=id,name,category_name   |   ?fields=quantity,product.name
+"""
+
+from functools import lru_cache
+from flask import jsonify
+from flask_smorest import abort
+from marshmallow import fields as ma_fields
+from sqlalchemy import inspect as sa_inspect
+
+
+class Fieldset:
+    """Campos pedidos, como árbol {campo: subcampos | None (completo)}; None = todos"""
+
+    def __init__(self, paths=None):
+        self.paths = None if paths is None else tuple(sorted(set(paths)))
+        self._tree = None
+        if self.paths is not None:
+            tree = {}
+            for path in self.paths:
+                head, _, rest = path.partition(".")
+                if not rest:
+                    tree[head] = None
+                elif tree.get(head, []) is not None:
+                    tree.setdefault(head, []).append(rest)
+            self._tree = tree
+
+    @property
+    def is_all(self):
+        return self._tree is None
+
+    def names(self):
+        """Campos de primer nivel pedidos (None = todos)"""
+        return None if self._tree is None else set(self._tree)
+
+    def wants(self, name):
+        return self._tree is None or name in self._tree
+
+    def nested(self, name):
+        """Fieldset de los subcampos de `name` (todos si se pidió completo)"""
+        if self._tree is None or not self._tree.get(name):
+            return ALL_FIELDS
+        return Fieldset(self._tree[name])
+
+    def only(self, prefix=""):
+        """Rutas normalizadas para el `only` de marshmallow"""
+        paths = []
+        for name, sub in sorted(self._tree.items()):
+            if sub is None:
+                paths.append(prefix + name)
+            else:
+                paths.extend(prefix + f"{name}.{path}" for path in sub)
+        return tuple(paths)
+
+
+ALL_FIELDS = Fieldset()
+
+
+def _has_path(schema, path):
+    head, _, rest = path.partition(".")
+    field = schema.fields.get(head)
+    if field is None or field.load_only:
+        return False
+    if not rest:
+        return True
+    if not isinstance(field, ma_fields.Nested):
+        return False
+    return _has_path(field.schema, rest)
+
+
+def parse_fields(raw, schema_cls):
+    """Valida ?fields= contra `schema_cls`; aborta 400 si hay campos desconocidos"""
+    if not raw:
+        return ALL_FIELDS
+    paths = [path.strip() for path in raw.split(",") if path.strip()]
+    if not paths:
+        return ALL_FIELDS
+    schema = _schema(schema_cls)
+    unknown = [path for path in paths if not _has_path(schema, path)]
+    if unknown:
+        abort(400, message=f"Campos desconocidos: {', '.join(unknown)}")
+    return Fieldset(paths)
+
+
+def projected_columns(model, fieldset, depends=None, keep=()):
+    """
+    Columnas de `model` necesarias para serializar `fieldset`.
+
+    depends: {campo: (columnas,)} para campos que no son columnas (p. ej.
+             category_name -> category_id, product -> product_id)
+    keep: columnas que se cargan siempre (p. ej. la clave de orden del cursor)
+    """
+    depends = depends or {}
+    column_keys = sa_inspect(model).column_attrs.keys()
+    names = set(keep)
+    for name in fieldset.names():
+        names.update(depends.get(name, (name,)))
+    return [getattr(model, name) for name in sorted(names) if name in column_keys]
+
+
+@lru_cache(maxsize=None)
+def _schema(schema_cls):
+    return schema_cls()
+
+
+@lru_cache(maxsize=256)
+def _projected_schema(schema_cls, key, only):
+    if key is None:
+        return schema_cls(only=only)
+    # Esquema de lista: se proyecta solo la colección y se conservan los metadatos
+    meta = tuple(name for name in _schema(schema_cls).fields if name != key)
+    return schema_cls(only=meta + tuple(f"{key}.{path}" for path in only))
+
+
+def sparse_response(schema_cls, data, fieldset, key=None):
+    """
+    Devuelve `data` sin cambios si se piden todos los campos (lo serializa
+    @blp.response); si no, la respuesta ya serializada solo con `fieldset`.
+
+    key: nombre de la colección en esquemas de lista (p. ej. "products")
+    """
+    if fieldset.is_all:
+        return data
+    schema = _projected_schema(schema_cls, key, fieldset.only())
+    return jsonify(schema.dump(data))
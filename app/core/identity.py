@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Resolución de Identidad por Request
+Carga el usuario autenticado una sola vez por request y lo guarda en flask.g
+"""
+
+from typing import Optional
+from flask import g, current_app
+from flask_jwt_extended import get_jwt
+from .principal_cache import principal_cache
+from .user_denylist import user_denylist
+from .sqlite_pool import direct_connection
+
+# Clave en flask.g donde se guarda (identity, principal) de la request actual
+_G_PRINCIPAL_KEY = "_stock_principal"
+
+
+class Principal:
+    """Identidad compacta del usuario autenticado (solo lo necesario para autorizar)"""
+
+    __slots__ = ("id", "username", "role", "is_active")
+
+    def __init__(self, id, username, role, is_active):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.is_active = bool(is_active)
+
+    def __getitem__(self, key):
+        # Compatibilidad con el código que usa request.current_user['role']
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "role": self.role,
+            "is_active": self.is_active,
+        }
+
+    def __repr__(self):
+        return f"<Principal {self.id}:{self.username} ({self.role})>"
+
+
+def load_principal(user_id) -> Optional[Principal]:
+    """Obtiene el principal activo desde la base de datos (una consulta)"""
+    try:
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT id, username, role, is_active FROM users WHERE id = ? AND is_active = 1",
+                (int(user_id),),
+            ).fetchone()
+
+        return Principal(*row) if row else None
+
+    except Exception as e:
+        current_app.logger.error(f"Error cargando principal {user_id}: {e}")
+        return None
+
+
+def principal_from_claims(jwt_data) -> Optional[Principal]:
+    """
+    Construye el principal solo con los claims firmados del token (sin BD).
+    Devuelve None si el token no trae rol o el usuario está en la denylist.
+    """
+    roles = jwt_data.get("roles") or []
+    if not roles:
+        return None
+
+    user_id = int(jwt_data["sub"])
+    if user_denylist.is_denied(user_id, jwt_data.get("iat", 0)):
+        return None
+
+    return Principal(user_id, jwt_data.get("username"), roles[0], True)
+
+
+def resolve_principal(identity, jwt_data=None) -> Optional[Principal]:
+    """
+    Devuelve el principal para la identidad del JWT, consultando la base de datos
+    como máximo una vez por request (y normalmente ninguna, gracias al cache del
+    proceso). El resultado (incluido None) queda en flask.g.
+
+    Con AUTH_TRUST_TOKEN_CLAIMS activo se usan los claims del token verificado,
+    salvo que la denylist indique que dejaron de ser confiables.
+    """
+    cached = g.get(_G_PRINCIPAL_KEY)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+
+    principal = None
+    if identity is not None:
+        if jwt_data and current_app.config.get("AUTH_TRUST_TOKEN_CLAIMS"):
+            principal = principal_from_claims(jwt_data)
+
+        if principal is None:
+            user_id = int(identity)
+            principal = principal_cache.get(user_id)
+            if principal is None:
+                principal = load_principal(user_id)
+                principal_cache.put(user_id, principal)
+
+    setattr(g, _G_PRINCIPAL_KEY, (identity, principal))
+    return principal
+
+
+def get_current_principal() -> Optional[Principal]:
+    """Principal de la request actual (requiere verify_jwt_in_request previo)"""
+    jwt_data = get_jwt()
+    return resolve_principal(jwt_data.get("sub"), jwt_data)
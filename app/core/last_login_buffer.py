@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Buffer Write-Behind de last_login
+Acumula en memoria los logins exitosos y los persiste en una única transacción
+(executemany) cada cierto intervalo o al alcanzar un umbral, fuera del camino
+de la request. Se vacía también al apagar el proceso.
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime
+from .sqlite_pool import direct_connection
+
+_UPDATE_LAST_LOGIN_SQL = "UPDATE users SET last_login = ?, updated_at = ? WHERE id = ?"
+
+
+class LastLoginBuffer:
+    """Buffer de user_id -> último login pendiente de escribir"""
+
+    def __init__(self, flush_interval=5.0, flush_size=100):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._app = None
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.flush_interval = float(flush_interval)
+        self.flush_size = int(flush_size)
+        atexit.register(self.flush)
+
+    def configure(self, app, flush_interval, flush_size):
+        """Asocia la app (para resolver la BD desde el hilo de fondo) y los límites"""
+        self.flush()
+        with self._lock:
+            self._app = app
+            self.flush_interval = float(flush_interval)
+            self.flush_size = max(1, int(flush_size))
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_interval > 0
+
+    def record(self, user_id, when=None):
+        """Registra un login exitoso; con el buffer deshabilitado escribe en el momento"""
+        when = when or datetime.now().isoformat()
+        with self._lock:
+            self._pending[user_id] = when
+            pending = len(self._pending)
+
+        if not self.enabled:
+            self.flush()
+            return
+
+        self._ensure_flusher()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Escribe todos los logins pendientes en una sola transacción"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+        rows = [(when, when, user_id) for user_id, when in batch.items()]
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    written = _write_batch(rows)
+            else:
+                written = _write_batch(rows)
+        except Exception as e:
+            written = False
+            print(f"Error escribiendo lote de last_login: {e}")
+
+        if not written:
+            # Reencolar sin pisar logins más nuevos registrados mientras tanto
+            with self._lock:
+                for user_id, when in batch.items():
+                    self._pending.setdefault(user_id, when)
+            return 0
+
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+        return len(rows)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+            }
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            # Los hilos no sobreviven a un fork: cada worker arranca el suyo
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="last-login-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+def _write_batch(rows) -> bool:
+    with direct_connection() as conn:
+        if conn is None:
+            return False
+        conn.executemany(_UPDATE_LAST_LOGIN_SQL, rows)
+        conn.commit()
+    return True
+
+
+# Instancia única por proceso
+last_login_buffer = LastLoginBuffer()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Registro de Estrategias de Carga por Endpoint
+Cada listado declara qué relaciones serializa y con qué estrategia se cargan
+(selectinload para colecciones, joinedload para muchos-a-uno), de modo que la
+cantidad de consultas por request no crezca con la cantidad de filas (N+1).
+
+Con ?fields= (ver core/fieldsets.py) solo se cargan las relaciones pedidas y
+cada entidad se limita a las columnas que se van a serializar.
+"""
+
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from .fieldsets import ALL_FIELDS, projected_columns
+
+_LOADERS = {}
+
+# Campos serializados que no son columnas -> columnas de las que dependen
+_PRODUCT_DEPENDS = {"category_name": ("category_id",)}
+_STOCK_DEPENDS = {"product": ("product_id",), "available_quantity": ("quantity", "reserved_quantity")}
+_ITEM_DEPENDS = {"product": ("product_id",)}
+
+
+def register_loaders(name, depends=None):
+    """
+    Registra la función que construye las opciones de carga de un endpoint.
+    builder(fields) recibe el Fieldset pedido; depends mapea los campos de la
+    entidad raíz que no son columnas a las columnas que necesitan.
+    """
+    def decorator(builder):
+        _LOADERS[name] = (builder, depends or {})
+        return builder
+    return decorator
+
+
+def loader_options(name, fields=ALL_FIELDS):
+    """Opciones de carga registradas para `name` (tupla vacía si no hay)"""
+    builder, _ = _LOADERS.get(name, (None, None))
+    return tuple(builder(fields)) if builder else ()
+
+
+def with_loaders(query, name, fields=ALL_FIELDS, keep=()):
+    """
+    Aplica a `query` las opciones de carga del endpoint `name`.
+    Si `fields` no es completo, proyecta también las columnas de la entidad
+    raíz; `keep` agrega columnas necesarias fuera del esquema (clave de orden).
+    """
+    options = list(loader_options(name, fields))
+    if not fields.is_all:
+        _, depends = _LOADERS.get(name, (None, {}))
+        model = query.column_descriptions[0]["entity"]
+        options.append(load_only(*projected_columns(model, fields, depends, keep)))
+    return query.options(*options) if options else query
+
+
+def _project(loader, model, fields, depends):
+    """Limita una relación cargada a las columnas de su Fieldset"""
+    if fields.is_all:
+        return loader
+    return loader.load_only(*projected_columns(model, fields, depends))
+
+
+def _product_loader(loader, fields):
+    """Producto anidado (+ categoría solo si se serializa category_name)"""
+    from app.models.product import Product
+    loader = _project(loader, Product, fields, _PRODUCT_DEPENDS)
+    if fields.wants("category_name"):
+        loader = loader.joinedload(Product.category)
+    return loader
+
+
+def _items_loaders(items_attr, item_model, fields):
+    # items -> product -> category (los items anidan ProductSchema con category_name)
+    if not fields.wants("items"):
+        return []
+    item_fields = fields.nested("items")
+    items = _project(selectinload(items_attr), item_model, item_fields, _ITEM_DEPENDS)
+    if item_fields.wants("product"):
+        items = _product_loader(items.joinedload(item_model.product), item_fields.nested("product"))
+    return [items]
+
+
+# --- Estrategias (los modelos se importan al construir: evita ciclos de import) ---
+
+@register_loaders("orders")
+def _order_loaders(fields):
+    from app.models.order import Order
+    from app.models.order_item import OrderItem
+    return _items_loaders(Order.items, OrderItem, fields)
+
+
+@register_loaders("purchases")
+def _purchase_loaders(fields):
+    from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
+    return _items_loaders(PurchaseOrder.items, PurchaseOrderItem, fields)
+
+
+@register_loaders("stock", depends=_STOCK_DEPENDS)
+def _stock_loaders(fields):
+    from app.models.stock import Stock
+    if not fields.wants("product"):
+        return []
+    return [_product_loader(joinedload(Stock.product), fields.nested("product"))]
+
+
+@register_loaders("products", depends=_PRODUCT_DEPENDS)
+def _product_loaders(fields):
+    from app.models.product import Product
+    if not fields.wants("category_name"):
+        return []
+    return [joinedload(Product.category)]
+
+
+@register_loaders("categories")
+def _category_loaders(fields):
+    return []
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Paginación Keyset para Endpoints de Listado
+Pagina sobre (clave de orden, id) con un cursor opaco: cada página cuesta
+O(limit) sin importar qué tan profunda sea. La paginación por offset
+(page/per_page) se mantiene por compatibilidad, y sin ningún parámetro de
+paginación se devuelve el listado completo como antes (el frontend no pagina).
+"""
+
+import base64
+import json
+from flask import current_app
+from flask_smorest import abort
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort, order, value, row_id) -> str:
+    """Cursor opaco con la posición de la última fila entregada"""
+    payload = json.dumps([sort, order, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort, order):
+    """Devuelve (valor, id) del cursor; ValueError si no corresponde a este orden"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if cursor_sort != sort or cursor_order != order:
+        raise ValueError("El cursor pertenece a otro criterio de orden")
+    return value, row_id
+
+
+class Page:
+    """Resultado de una página: filas más metadatos para el esquema de lista"""
+
+    def __init__(self, items, total, limit, next_cursor=None, has_more=False, page=None, per_page=None):
+        self.items = items
+        self.total = total
+        self.limit = limit
+        self.next_cursor = next_cursor
+        self.has_more = has_more
+        self.page = page
+        self.per_page = per_page
+
+    def meta(self):
+        meta = {
+            "total": self.total,
+            "limit": self.limit,
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+        }
+        if self.page is not None:
+            meta["page"] = self.page
+            meta["per_page"] = self.per_page
+        return meta
+
+
+def _resolve_limit(requested):
+    default_limit = current_app.config["PAGINATION_DEFAULT_LIMIT"]
+    max_limit = current_app.config["PAGINATION_MAX_LIMIT"]
+    return min(requested or default_limit, max_limit)
+
+
+def paginate_query(query, model, params, sort_keys=("id",), default_sort="id", total=None,
+                   sort_expressions=None):
+    """
+    Aplica orden y paginación a `query`.
+
+    params: dict cargado con PaginationQuerySchema (limit, cursor, sort, order, page, per_page);
+            sin limit, cursor, page ni per_page devuelve todas las filas (limit None)
+    sort_keys: columnas NOT NULL del modelo por las que se permite ordenar
+    total: total ya calculado (p. ej. junto a los contadores de resumen) para no repetir el COUNT
+    sort_expressions: claves calculadas {nombre: expresión SQL} (p. ej. relevancia de una
+                      búsqueda); su valor se selecciona junto a cada fila para armar el cursor
+    """
+    sort_expressions = sort_expressions or {}
+    allowed = tuple(sort_keys) + tuple(sort_expressions)
+    sort = params.get("sort") or default_sort
+    if sort not in allowed:
+        abort(400, message=f"Orden no soportado: '{sort}'. Opciones: {', '.join(allowed)}")
+    order = params.get("order") or "asc"
+    descending = order == "desc"
+
+    id_column = model.id
+    computed = sort in sort_expressions
+    sort_column = sort_expressions[sort] if computed else getattr(model, sort)
+    if sort == "id":
+        order_by = [id_column.desc() if descending else id_column.asc()]
+    else:
+        order_by = [
+            sort_column.desc() if descending else sort_column.asc(),
+            id_column.desc() if descending else id_column.asc(),
+        ]
+
+    # Total del filtro completo (independiente del cursor)
+    if total is None:
+        total = query.enable_eagerloads(False).order_by(None).count()
+    ordered = query.order_by(*order_by)
+    if computed:
+        ordered = ordered.add_columns(sort_column.label("sort_value"))
+
+    # Offset (compatibilidad): solo si se pide page y no hay cursor
+    if params.get("page") and not params.get("cursor"):
+        per_page = _resolve_limit(params.get("per_page") or params.get("limit"))
+        page = params["page"]
+        rows = _entities(ordered.offset((page - 1) * per_page).limit(per_page + 1).all(), computed)
+        has_more = len(rows) > per_page
+        return Page(rows[:per_page], total, per_page, None, has_more, page, per_page)
+
+    # Sin parámetros de paginación: listado completo (compatibilidad con el frontend)
+    if not any(params.get(key) for key in ("limit", "cursor", "page", "per_page")):
+        return Page(_entities(ordered.all(), computed), total, None)
+
+    limit = _resolve_limit(params.get("limit"))
+    if params.get("cursor"):
+        try:
+            value, row_id = decode_cursor(params["cursor"], sort, order)
+        except ValueError as e:
+            abort(400, message=str(e))
+        if sort == "id":
+            condition = id_column < row_id if descending else id_column > row_id
+        else:
+            position = tuple_(sort_column, id_column)
+            condition = position < (value, row_id) if descending else position > (value, row_id)
+        ordered = ordered.filter(condition)
+
+    rows = ordered.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        if computed:
+            next_cursor = encode_cursor(sort, order, last.sort_value, last[0].id)
+        else:
+            next_cursor = encode_cursor(sort, order, getattr(last, sort), last.id)
+    return Page(_entities(rows, computed), total, limit, next_cursor, has_more)
+
+
+def _entities(rows, computed):
+    # Con clave calculada cada fila es (entidad, valor de orden)
+    return [row[0] for row in rows] if computed else rows
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Hashing de Contraseñas en Pool Acotado
+Ejecuta generate/check_password_hash en un pool de hilos dedicado con límite de
+cola, para que una ráfaga de logins no bloquee al resto de las requests.
+Incluye la política de costo configurable y la detección de hashes a renovar.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingPoolSaturated(Exception):
+    """El pool de hashing está lleno: la request debe rechazarse rápido (503)"""
+
+    def __init__(self, message="Servicio de autenticación saturado, reintente en unos segundos"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class PasswordHasher:
+    """Pool de hilos acotado para operaciones de hashing costosas"""
+
+    def __init__(self, workers=2, max_queue=16, method="scrypt", timeout=10.0):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.configure(workers, max_queue, method, timeout)
+
+    def configure(self, workers, max_queue, method, timeout):
+        """Ajusta tamaño del pool, profundidad de cola y política de costo"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.workers = max(1, int(workers))
+            self.max_queue = max(0, int(max_queue))
+            self.method = method
+            self.timeout = float(timeout)
+            # Operaciones en curso + en espera; al agotarse se rechaza sin encolar
+            self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+            self._method_prefix = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Los hilos no sobreviven a un fork (workers de gunicorn): recrear el pool
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Hash lento (pool atascado): misma respuesta rápida que con la cola llena
+            raise HashingPoolSaturated()
+
+    def hash(self, password: str) -> str:
+        """Genera el hash con la política de costo vigente"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Verifica una contraseña contra su hash almacenado"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True si el hash fue generado con parámetros distintos a la política vigente"""
+        prefix = self._method_prefix
+        if prefix is None:
+            # Prefijo canónico (p. ej. 'scrypt:32768:8:1'); se calcula una sola vez y fuera
+            # del pool, para que un pool saturado no rechace un login ya verificado
+            prefix = self._method_prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return password_hash.split("$", 1)[0] != prefix
+
+
+# Instancia única por proceso
+password_hasher = PasswordHasher()
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    return password_hasher.verify(password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return password_hasher.needs_rehash(password_hash)
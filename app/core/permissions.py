@@ -8,7 +8,8 @@ from enum import Enum
 from typing import List, Dict, Set
 from functools import wraps
 from flask import jsonify, request, current_app
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request
+from .identity import get_current_principal
 
 class PermissionLevel(Enum):
     """Niveles de permisos del sistema"""
@@ -137,53 +138,52 @@ class PermissionManager:
         Permission.ALL: Role.ADMIN
     }
     
+    # Mapeo de prefijos de endpoint a permisos requeridos
+    ENDPOINT_PERMISSIONS = {
+        '/api/users/': Permission.MANAGE_USERS,
+        '/api/system/': Permission.MANAGE_SYSTEM,
+        '/api/backup/': Permission.MANAGE_SYSTEM,
+        '/api/products/': Permission.MANAGE_PRODUCTS,
+        '/api/categories/': Permission.MANAGE_CATEGORIES,
+        '/api/stock/': Permission.MANAGE_STOCK,
+        '/api/orders/': Permission.MANAGE_ORDERS,
+        '/api/purchases/': Permission.MANAGE_PURCHASES,
+        '/api/reports/': Permission.VIEW_REPORTS,
+        '/api/dashboard/': Permission.READ,
+        '/api/analytics/': Permission.READ
+    }
+    
+    # Tablas precompiladas (ver _compile_permission_tables)
+    _PERMISSION_BITS: Dict[Permission, int] = {}
+    _ROLE_MASKS: Dict[object, int] = {}
+    _ROLE_PERMISSION_SETS: Dict[str, frozenset] = {}
+    _ROLE_LEVELS: Dict[object, int] = {}
+    _ENDPOINT_RULES: List[tuple] = []
+    
     @classmethod
     def get_user_permissions(cls, user_role: str) -> Set[Permission]:
         """Obtiene todos los permisos de un rol"""
-        try:
-            role = Role(user_role)
-            return set(cls.ROLE_PERMISSIONS.get(role, []))
-        except ValueError:
-            return set()
+        return set(cls._ROLE_PERMISSION_SETS.get(user_role, ()))
     
     @classmethod
     def has_permission(cls, user_role: str, permission: Permission) -> bool:
         """Verifica si un rol tiene un permiso específico"""
-        user_permissions = cls.get_user_permissions(user_role)
-        return permission in user_permissions or Permission.ALL in user_permissions
+        return bool(cls._ROLE_MASKS.get(user_role, 0) & cls._PERMISSION_BITS.get(permission, 0))
     
     @classmethod
     def has_role_level(cls, user_role: str, required_level: PermissionLevel) -> bool:
         """Verifica si un rol tiene el nivel mínimo requerido"""
-        try:
-            role = Role(user_role)
-            user_level = cls.ROLE_HIERARCHY.get(role, PermissionLevel.VIEWER)
-            return user_level.value >= required_level.value
-        except ValueError:
-            return False
+        user_level = cls._ROLE_LEVELS.get(user_role)
+        return user_level is not None and user_level >= required_level.value
     
     @classmethod
     def can_access_endpoint(cls, user_role: str, endpoint: str) -> bool:
         """Verifica si un usuario puede acceder a un endpoint específico"""
-        # Mapeo de endpoints a permisos requeridos
-        endpoint_permissions = {
-            '/api/users/': Permission.MANAGE_USERS,
-            '/api/system/': Permission.MANAGE_SYSTEM,
-            '/api/backup/': Permission.MANAGE_SYSTEM,
-            '/api/products/': Permission.MANAGE_PRODUCTS,
-            '/api/categories/': Permission.MANAGE_CATEGORIES,
-            '/api/stock/': Permission.MANAGE_STOCK,
-            '/api/orders/': Permission.MANAGE_ORDERS,
-            '/api/purchases/': Permission.MANAGE_PURCHASES,
-            '/api/reports/': Permission.VIEW_REPORTS,
-            '/api/dashboard/': Permission.READ,
-            '/api/analytics/': Permission.READ
-        }
-        
-        # Buscar el permiso requerido para el endpoint
-        for path, required_permission in endpoint_permissions.items():
-            if endpoint.startswith(path):
-                return cls.has_permission(user_role, required_permission)
+        # Un lookup por longitud de prefijo, del más largo al más corto
+        for length, rules in cls._ENDPOINT_RULES:
+            required_bit = rules.get(endpoint[:length])
+            if required_bit is not None:
+                return bool(cls._ROLE_MASKS.get(user_role, 0) & required_bit)
         
         # Por defecto, permitir acceso a usuarios autenticados
         return True
@@ -203,11 +203,38 @@ class PermissionManager:
     @classmethod
     def get_role_level(cls, role: str) -> int:
         """Obtiene el nivel numérico de un rol"""
-        try:
-            role_enum = Role(role)
-            return cls.ROLE_HIERARCHY.get(role_enum, PermissionLevel.VIEWER).value
-        except ValueError:
-            return 0
+        return cls._ROLE_LEVELS.get(role, 0)
+
+def _compile_permission_tables():
+    """
+    Compila la matriz rol/permiso en máscaras de bits al importar el módulo:
+    cada verificación queda en un lookup y un AND, sin construir enums ni sets
+    """
+    pm = PermissionManager
+    pm._PERMISSION_BITS = {permission: 1 << i for i, permission in enumerate(Permission)}
+    all_bits = (1 << len(pm._PERMISSION_BITS)) - 1
+    
+    for role, permissions in pm.ROLE_PERMISSIONS.items():
+        mask = 0
+        for permission in permissions:
+            mask |= pm._PERMISSION_BITS[permission]
+        if Permission.ALL in permissions:
+            mask = all_bits
+        level = pm.ROLE_HIERARCHY.get(role, PermissionLevel.VIEWER).value
+        # Indexado por string (valor en BD/JWT) y por enum, como aceptaba Role(...)
+        for key in (role.value, role):
+            pm._ROLE_MASKS[key] = mask
+            pm._ROLE_LEVELS[key] = level
+        pm._ROLE_PERMISSION_SETS[role.value] = frozenset(permissions)
+        pm._ROLE_PERMISSION_SETS[role] = pm._ROLE_PERMISSION_SETS[role.value]
+    
+    rules_by_length = {}
+    for prefix, permission in pm.ENDPOINT_PERMISSIONS.items():
+        rules_by_length.setdefault(len(prefix), {})[prefix] = pm._PERMISSION_BITS[permission]
+    pm._ENDPOINT_RULES = sorted(rules_by_length.items(), reverse=True)
+
+
+_compile_permission_tables()
 
 def require_permission(permission: Permission):
     """Decorador para requerir un permiso específico"""
@@ -216,11 +243,7 @@ def require_permission(permission: Permission):
         def decorated_function(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                
-                # Obtener información del usuario desde la base de datos
-                from app.middleware.auth_middleware import get_user_by_id_direct
-                current_user = get_user_by_id_direct(current_user_id)
+                current_user = get_current_principal()
                 
                 if not current_user or not current_user['is_active']:
                     return jsonify({'error': 'Usuario no válido o inactivo'}), 401
@@ -235,11 +258,11 @@ def require_permission(permission: Permission):
                     }), 403
                 
                 request.current_user = current_user
-                return f(*args, **kwargs)
-                
             except Exception as e:
                 current_app.logger.warning(f"Verificación de permisos fallida: {str(e)}")
                 return jsonify({'error': 'Autenticación requerida'}), 401
+
+            return f(*args, **kwargs)
         
         return decorated_function
     return decorator
@@ -251,10 +274,7 @@ def require_role(role: Role):
         def decorated_function(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                
-                from app.middleware.auth_middleware import get_user_by_id_direct
-                current_user = get_user_by_id_direct(current_user_id)
+                current_user = get_current_principal()
                 
                 if not current_user or not current_user['is_active']:
                     return jsonify({'error': 'Usuario no válido o inactivo'}), 401
@@ -270,11 +290,11 @@ def require_role(role: Role):
                     }), 403
                 
                 request.current_user = current_user
-                return f(*args, **kwargs)
-                
             except Exception as e:
                 current_app.logger.warning(f"Verificación de rol fallida: {str(e)}")
                 return jsonify({'error': 'Autenticación requerida'}), 401
+
+            return f(*args, **kwargs)
         
         return decorated_function
     return decorator
@@ -286,10 +306,7 @@ def require_any_role(*roles: Role):
         def decorated_function(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                
-                from app.middleware.auth_middleware import get_user_by_id_direct
-                current_user = get_user_by_id_direct(current_user_id)
+                current_user = get_current_principal()
                 
                 if not current_user or not current_user['is_active']:
                     return jsonify({'error': 'Usuario no válido o inactivo'}), 401
@@ -311,11 +328,11 @@ def require_any_role(*roles: Role):
                     }), 403
                 
                 request.current_user = current_user
-                return f(*args, **kwargs)
-                
             except Exception as e:
                 current_app.logger.warning(f"Verificación de roles fallida: {str(e)}")
                 return jsonify({'error': 'Autenticación requerida'}), 401
+
+            return f(*args, **kwargs)
         
         return decorated_function
     return decorator
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Cache de Principales por Proceso
+LRU acotado con TTL de usuarios activos, sincronizado entre workers mediante
+la tabla auth_invalidations (versión monotónica por usuario)
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from flask import current_app
+from sqlalchemy import text
+from app.database import db
+from .sqlite_pool import direct_connection
+from .user_denylist import user_denylist
+from .schema_upgrades import create_missing_tables, schema_upgrade
+
+# Publica una invalidación con una versión mayor a todas las existentes
+_PUBLISH_INVALIDATION_SQL = text(
+    """
+    INSERT INTO auth_invalidations (user_id, version, invalidated_at)
+    VALUES (:user_id, (SELECT COALESCE(MAX(version), 0) + 1 FROM auth_invalidations), :invalidated_at)
+    ON CONFLICT (user_id) DO UPDATE SET version = excluded.version, invalidated_at = excluded.invalidated_at
+    """
+)
+
+
+@schema_upgrade
+def ensure_invalidations_table(connection):
+    """Crea auth_invalidations en bases anteriores a este módulo (los cambios de rol escriben en ella)"""
+    create_missing_tables(connection, "auth_invalidations")
+
+
+class PrincipalCache:
+    """LRU thread-safe de principales activos indexado por user_id"""
+
+    def __init__(self, max_size=1024, ttl=60.0, sync_interval=2.0):
+        self._entries = OrderedDict()  # user_id -> (expira_en, principal)
+        self._lock = threading.Lock()
+        self._version = None  # última versión de invalidación aplicada
+        self._next_sync = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.configure(max_size, ttl, sync_interval)
+
+    def configure(self, max_size, ttl, sync_interval):
+        """Ajusta los límites del cache (se llama desde create_app)"""
+        with self._lock:
+            self.max_size = int(max_size)
+            self.ttl = float(ttl)
+            self.sync_interval = float(sync_interval)
+            self._entries.clear()
+            self._version = None
+            self._next_sync = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, user_id):
+        """Devuelve el principal cacheado o None si no está o expiró"""
+        if not self.enabled:
+            return None
+
+        self._sync_if_due()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, principal):
+        """Guarda un principal activo (los usuarios inactivos nunca se cachean)"""
+        if not self.enabled or principal is None or not principal.is_active:
+            return
+
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        """Elimina un usuario del cache de este proceso"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "version": self._version,
+            }
+
+    def _sync_if_due(self):
+        """Aplica las invalidaciones publicadas por otros workers (como mucho una vez por intervalo)"""
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+
+        changes = _read_invalidations(self._version)
+        if changes is None:
+            return
+
+        with self._lock:
+            if self._version is None:
+                # Primera sincronización: no sabemos qué cambió antes, empezar de cero
+                self._entries.clear()
+            else:
+                for user_id, _version in changes:
+                    self._entries.pop(user_id, None)
+            self._version = max([self._version or 0] + [v for _u, v in changes])
+
+
+def _read_invalidations(since_version) -> Optional[list]:
+    """Lee las invalidaciones posteriores a since_version (None: solo la versión actual)"""
+    try:
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+            if since_version is None:
+                row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM auth_invalidations").fetchone()
+                return [(None, row[0])]
+            return conn.execute(
+                "SELECT user_id, version FROM auth_invalidations WHERE version > ?",
+                (since_version,),
+            ).fetchall()
+
+    except sqlite3.OperationalError:
+        # Tabla aún no creada: el TTL sigue acotando la ventana de obsolescencia
+        return None
+    except Exception as e:
+        current_app.logger.warning(f"Error sincronizando cache de principales: {e}")
+        return None
+
+
+# Instancia única por proceso
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(user_id):
+    """
+    Invalida la identidad cacheada de un usuario cuyo rol o estado cambió.
+    Debe llamarse antes del commit: la invalidación viaja en la misma transacción.
+    """
+    invalidated_at = int(time.time())
+    db.session.execute(
+        _PUBLISH_INVALIDATION_SQL,
+        {"user_id": user_id, "invalidated_at": invalidated_at},
+    )
+    principal_cache.invalidate(user_id)
+    user_denylist.deny(user_id, invalidated_at)
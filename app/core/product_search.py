@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Búsqueda de Texto Completo de Productos
+Índice sobre nombre y descripción para /api/products/search: FTS5 en SQLite
+(tabla external-content sincronizada con triggers) y tsvector con índice GIN
+en PostgreSQL (columna generada). La búsqueda usa prefijos por término
+("lap del" encuentra "Laptop Dell") y ordena por relevancia (bm25 / ts_rank),
+con un costo proporcional a las coincidencias y no al tamaño del catálogo.
+
+Si el motor no soporta el índice se vuelve al ILIKE sobre el nombre.
+"""
+
+import re
+import threading
+from sqlalchemy import Float, Integer, event, func, literal_column, text
+from sqlalchemy.exc import OperationalError
+from app.database import db
+from app.models.product import Product
+
+FTS_TABLE = "products_fts"
+
+# Peso del nombre frente a la descripción en el ranking
+_NAME_WEIGHT = 10.0
+_DESCRIPTION_WEIGHT = 1.0
+
+_SQLITE_DDL = (
+    # remove_diacritics: "descripcion" encuentra "Descripción"; prefix: índices para 2 y 3 letras
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF id, name, description ON products BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+_SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+
+_POSTGRES_DDL = (
+    # Columna generada: PostgreSQL la mantiene en cada INSERT/UPDATE
+    """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+)
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Motores (por URL) con el índice ya verificado -> soporta o no búsqueda de texto completo
+_prepared = {}
+_prepare_lock = threading.Lock()
+
+
+def _create_index(connection, rebuild):
+    """Crea el índice si falta; devuelve False si el motor no lo soporta"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        try:
+            for statement in _SQLITE_DDL:
+                connection.execute(text(statement))
+        except OperationalError:  # SQLite compilado sin FTS5
+            return False
+        if rebuild and not exists:
+            # Tabla nueva sobre un catálogo existente: indexar las filas actuales
+            connection.execute(text(_SQLITE_REBUILD))
+        return True
+    if dialect == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+        return True
+    return False
+
+
+@event.listens_for(Product.__table__, "after_create")
+def _create_index_with_table(target, connection, **kw):
+    # db.create_all(): el índice nace junto con la tabla products
+    _prepared[str(connection.engine.url)] = _create_index(connection, rebuild=False)
+
+
+@event.listens_for(Product.__table__, "before_drop")
+def _drop_index_with_table(target, connection, **kw):
+    # Los triggers caen con la tabla; la tabla FTS hay que borrarla aparte
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _prepared.pop(str(connection.engine.url), None)
+
+
+def ensure_search_index() -> bool:
+    """
+    Verifica una vez por proceso que el índice exista (bases creadas antes de
+    este módulo) y lo construye si falta. True si hay búsqueda de texto completo.
+    """
+    engine = db.engine
+    key = str(engine.url)
+    supported = _prepared.get(key)
+    if supported is not None:
+        return supported
+    with _prepare_lock:
+        supported = _prepared.get(key)
+        if supported is None:
+            with engine.begin() as connection:
+                supported = _create_index(connection, rebuild=True)
+            _prepared[key] = supported
+    return supported
+
+
+def search_terms(term):
+    """Términos normalizados de la búsqueda (palabras, sin operadores)"""
+    return [word.lower() for word in _TERM_PATTERN.findall(term or "")]
+
+
+def apply_text_search(query, term):
+    """
+    Filtra `query` (sobre Product) por `term` con el índice de texto completo.
+
+    Devuelve (query, relevancia): la relevancia es una expresión ordenable de
+    forma ascendente (mejor coincidencia primero) para usar como clave de
+    orden en paginate_query, o None si se usó el ILIKE de respaldo.
+    """
+    words = search_terms(term)
+    if not words or not ensure_search_index():
+        return query.filter(Product.name.ilike(f"%{term}%")), None
+
+    if db.engine.dialect.name == "sqlite":
+        # Cada palabra como prefijo entre comillas (sin sintaxis FTS5 del usuario); AND implícito
+        match = " ".join(f'"{word}"*' for word in words)
+        matches = (
+            text(
+                f"SELECT rowid AS product_id, "
+                f"bm25({FTS_TABLE}, {_NAME_WEIGHT}, {_DESCRIPTION_WEIGHT}) AS rank "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+            )
+            .bindparams(match=match)
+            .columns(product_id=Integer, rank=Float)
+            .subquery("product_matches")
+        )
+        query = query.join(matches, matches.c.product_id == Product.id)
+        return query, matches.c.rank  # bm25: menor es mejor
+
+    tsquery = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+    vector = literal_column("products.search_vector")
+    query = query.filter(vector.op("@@")(tsquery))
+    return query, -func.ts_rank(vector, tsquery)  # ts_rank: mayor es mejor
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Índice de Trigramas para Sugerencias de Productos
+Índice en memoria del proceso sobre los nombres de productos para el
+autocompletado de los formularios (/api/products/suggest): cada pulsación se
+resuelve sin consultar la base de datos.
+
+El índice se construye en el primer uso a partir de la tabla products, se
+actualiza al confirmar escrituras de Product en este proceso y se sincroniza
+con las de otros workers cuando cambia la versión de la tabla (como mucho una
+vez por intervalo), comparando (id, nombre) de todos los productos contra el
+índice: no depende de updated_at, que no sirve de marca de avance cuando una
+transacción confirma tarde con un valor anterior. La memoria se acota con un
+máximo de productos y de caracteres indexados por nombre, y se informa en
+stats().
+"""
+
+import heapq
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from itertools import chain
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.database import db
+from app.models.product import Product
+from .change_versions import current_versions
+
+# Bonificación cuando el nombre empieza con la consulta o alguna palabra con un término
+_PREFIX_BONUS = 0.5
+_WORD_PREFIX_BONUS = 0.2
+# Entradas de listas invertidas que se cuentan por consulta (las más raras primero)
+_CANDIDATE_BUDGET = 20000
+# Candidatos por cantidad de trigramas compartidos que se puntúan en detalle (por resultado)
+_SHORTLIST_FACTOR = 20
+_MIN_SCORE = 0.1
+
+
+def normalize(text):
+    """Minúsculas y sin acentos: "Café" y "cafe" comparten trigramas"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def trigrams(normalized):
+    """Trigramas por palabra con relleno, como pg_trgm ("  ca", " ca", "caf", "afe", "fe ")"""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Índice invertido trigrama -> ids de producto, thread-safe. Las listas
+    invertidas son array('i') (4 bytes por entrada) y los trigramas de cada
+    nombre se recalculan cuando hacen falta en lugar de guardarse.
+    """
+
+    def __init__(self, max_products=100000, max_name_length=64, sync_interval=5.0):
+        self._lock = threading.Lock()
+        self.configure(max_products, max_name_length, sync_interval)
+
+    def configure(self, max_products, max_name_length, sync_interval):
+        """Ajusta los límites del índice (se llama desde create_app); se reconstruye en el próximo uso"""
+        with self._lock:
+            self.max_products = int(max_products)
+            self.max_name_length = int(max_name_length)
+            self.sync_interval = float(sync_interval)
+            self._reset()
+
+    def _reset(self):
+        self._names = {}  # id -> nombre original (para la respuesta)
+        self._keys = {}  # id -> nombre normalizado (truncado a max_name_length)
+        self._postings = {}  # trigrama -> array('i') de ids
+        self._built = False
+        self._version = None  # versión de products ya reflejada
+        self._next_sync = 0.0
+        self.skipped = 0  # productos fuera del índice por el límite
+        self.builds = 0
+        self.queries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_products > 0
+
+    # -- mantenimiento -------------------------------------------------------
+
+    def upsert(self, product_id, name):
+        with self._lock:
+            self._upsert(product_id, name)
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def _upsert(self, product_id, name):
+        if product_id not in self._keys and len(self._keys) >= self.max_products:
+            self.skipped += 1
+            return
+        self._remove(product_id)
+        # Solo la clave indexada se trunca; la respuesta lleva el nombre completo
+        key = normalize(name[:self.max_name_length])
+        self._names[product_id] = name
+        self._keys[product_id] = key
+        for gram in trigrams(key):
+            ids = self._postings.get(gram)
+            if ids is None:
+                ids = self._postings[sys.intern(gram)] = array("i")
+            ids.append(product_id)
+
+    def _remove(self, product_id):
+        key = self._keys.pop(product_id, None)
+        if key is None:
+            return
+        del self._names[product_id]
+        for gram in trigrams(key):
+            ids = self._postings[gram]
+            ids.remove(product_id)
+            if not ids:
+                del self._postings[gram]
+
+    def apply(self, changes):
+        """Aplica [(id, nombre | None)] confirmados en este proceso (None = borrado)"""
+        with self._lock:
+            if not self._built:
+                return
+            for product_id, name in changes:
+                if name is None:
+                    self._remove(product_id)
+                else:
+                    self._upsert(product_id, name)
+
+    def ensure_current(self):
+        """Construye el índice si hace falta o aplica los cambios de otros workers"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._build()
+            return
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+        version = current_versions(("products",))["products"]
+        if version != self._version:
+            with self._lock:
+                self._sync(version)
+
+    def _build(self):
+        version = current_versions(("products",))["products"]
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(Product.id, Product.name)).all()
+        self._reset()
+        for product_id, name in rows:
+            self._upsert(product_id, name)
+        self._version = version
+        self._next_sync = time.monotonic() + self.sync_interval
+        self._built = True
+        self.builds += 1
+
+    def _sync(self, version):
+        # Relee (id, nombre) y aplica solo las diferencias: una lectura de dos columnas por
+        # cambio de versión, que también ve escrituras confirmadas tarde o hechas por SQL directo
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(Product.id, Product.name)).all()
+        live_ids = {product_id for product_id, _ in rows}
+        for product_id in [pid for pid in self._keys if pid not in live_ids]:
+            self._remove(product_id)
+        for product_id, name in rows:
+            if self._names.get(product_id) != name:
+                self._upsert(product_id, name)
+        self.skipped = len(live_ids) - len(self._keys)
+        self._version = version
+
+    # -- consulta ------------------------------------------------------------
+
+    def search(self, query, limit=10):
+        """Top-`limit` [(id, nombre, puntaje)] por similitud de trigramas con bonificación por prefijo"""
+        self.ensure_current()
+        key = normalize(query).strip()
+        query_grams = trigrams(key)
+        if not query_grams:
+            return []
+        words = key.split()
+
+        with self._lock:
+            self.queries += 1
+            # Candidatos: trigramas alternando entre palabras, de la lista más corta a la más
+            # larga, hasta agotar el presupuesto (los trigramas comunes discriminan poco)
+            by_word = [
+                sorted((len(self._postings[gram]), gram) for gram in trigrams(word) if gram in self._postings)
+                for word in words
+            ]
+            candidates = Counter()
+            counted = 0
+            seen = set()
+            for _, gram in chain.from_iterable(_interleave(by_word)):
+                if gram in seen:
+                    continue
+                if counted >= _CANDIDATE_BUDGET:
+                    break
+                seen.add(gram)
+                ids = self._postings[gram]
+                candidates.update(ids)  # conteo en C
+                counted += len(ids)
+            if not candidates:
+                return []
+
+            scored = []
+            for product_id, _ in candidates.most_common(limit * _SHORTLIST_FACTOR):
+                name_key = self._keys[product_id]
+                grams = trigrams(name_key)
+                common = len(query_grams & grams)
+                score = common / (len(query_grams) + len(grams) - common)  # similitud de Jaccard
+                if name_key.startswith(key):
+                    score += _PREFIX_BONUS
+                elif any(word.startswith(term) for term in words for word in name_key.split()):
+                    score += _WORD_PREFIX_BONUS
+                if score >= _MIN_SCORE:
+                    scored.append((score, -product_id, product_id))
+            best = heapq.nlargest(limit, scored)
+            return [(product_id, self._names[product_id], round(score, 4)) for score, _, product_id in best]
+
+    def stats(self):
+        with self._lock:
+            approx_bytes = (
+                sys.getsizeof(self._names) + sys.getsizeof(self._keys) + sys.getsizeof(self._postings)
+                + sum(sys.getsizeof(name) for name in self._names.values())
+                + sum(sys.getsizeof(key) for key in self._keys.values())
+                + sum(sys.getsizeof(gram) + sys.getsizeof(ids) for gram, ids in self._postings.items())
+            )
+            return {
+                "built": self._built,
+                "products": len(self._keys),
+                "max_products": self.max_products,
+                "skipped": self.skipped,
+                "trigrams": len(self._postings),
+                "postings": sum(len(ids) for ids in self._postings.values()),
+                "approx_bytes": approx_bytes,
+                "builds": self.builds,
+                "queries": self.queries,
+                "version": self._version,
+            }
+
+
+def _interleave(lists):
+    # [[a1, a2], [b1]] -> [(a1, b1), (a2,)]: el mejor trigrama de cada palabra primero
+    depth = max((len(items) for items in lists), default=0)
+    return [[items[i] for items in lists if i < len(items)] for i in range(depth)]
+
+
+# Instancia única por proceso
+product_suggest_index = TrigramIndex()
+
+
+# -- Sincronización con las escrituras de la sesión ORM ----------------------
+
+def _record_change(session, product_id, name):
+    session.info.setdefault("suggest_changes", {})[product_id] = name
+
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+def _product_written(mapper, connection, target):
+    _record_change(Session.object_session(target), target.id, target.name)
+
+
+@event.listens_for(Product, "after_delete")
+def _product_deleted(mapper, connection, target):
+    _record_change(Session.object_session(target), target.id, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    changes = session.info.pop("suggest_changes", None)
+    if changes:
+        product_suggest_index.apply(changes.items())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("suggest_changes", None)
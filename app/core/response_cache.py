@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Cache de Respuestas para Lecturas de Catálogo
+Guarda el cuerpo JSON ya serializado de los GET de categorías y productos,
+indexado por ruta, query string, rol y versión de las tablas de las que
+depende (ver core/change_versions.py): una escritura en cualquier worker
+cambia la clave, y al confirmarla en este proceso se eliminan con precisión
+las entradas etiquetadas con las tablas escritas.
+
+Backends: LRU en memoria (por defecto) o uno compatible con Redis
+(get/set/sadd/smembers/delete/expire), reemplazable por un sustituto local.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, g, request
+from .change_versions import on_tables_committed, request_versions
+from .identity import get_current_principal
+
+try:
+    import redis
+except ImportError:  # backend opcional
+    redis = None
+
+
+class LRUCacheBackend:
+    """LRU thread-safe en memoria con índice de etiquetas (tabla -> claves)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = int(max_entries)
+        self._entries = OrderedDict()  # clave -> (cuerpo, etiquetas)
+        self._tags = {}  # etiqueta -> set(claves)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, body, tags):
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (body, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags) -> int:
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def size(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCacheBackend:
+    """Backend compartido entre workers sobre un cliente compatible con Redis"""
+
+    def __init__(self, client, prefix="stock:response:", ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = int(ttl)
+        self.evictions = 0  # las expulsiones las decide el servidor (maxmemory-policy)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, body, tags):
+        full_key = self.prefix + key
+        self.client.set(full_key, body, ex=self.ttl)
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            self.client.sadd(tag_key, full_key)
+            self.client.expire(tag_key, self.ttl)
+
+    def invalidate(self, tags) -> int:
+        tag_keys = [f"{self.prefix}tag:{tag}" for tag in tags]
+        keys = set()
+        for tag_key in tag_keys:
+            keys |= set(self.client.smembers(tag_key))
+        if keys or tag_keys:
+            self.client.delete(*keys, *tag_keys)
+        return len(keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """Fachada del cache con contadores de aciertos/fallos para ajuste"""
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.variant_hits = 0
+
+    def configure(self, backend="lru", max_entries=1024, ttl=300, redis_url=None, client=None):
+        """
+        Elige el backend (se llama desde create_app).
+        backend: 'lru' | 'redis' | 'none'; `client` permite inyectar un
+        sustituto compatible con Redis sin instalar el paquete.
+        """
+        if backend == "none" or int(max_entries) <= 0:
+            self._backend = None
+        elif backend == "redis":
+            if client is None:
+                if redis is None:
+                    raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requiere el paquete 'redis'")
+                client = redis.Redis.from_url(redis_url)
+            self._backend = RedisCacheBackend(client, ttl=ttl)
+        else:
+            self._backend = LRUCacheBackend(max_entries)
+        with self._lock:
+            self.hits = self.misses = self.invalidations = self.variant_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None
+
+    def get(self, key):
+        body = self._backend.get(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def put(self, key, body, tags):
+        self._backend.set(key, body, tags)
+
+    def get_variant(self, key, encoding):
+        """Cuerpo precomprimido con `encoding` de la entrada `key` (None si no está)"""
+        body = self._backend.get(f"{key}:{encoding}")
+        if body is not None:
+            with self._lock:
+                self.variant_hits += 1
+        return body
+
+    def put_variant(self, key, encoding, body, tags):
+        self._backend.set(f"{key}:{encoding}", body, tags)
+
+    def invalidate_tables(self, tables):
+        """Elimina las entradas que dependen de alguna de `tables`"""
+        if self._backend is None:
+            return
+        removed = self._backend.invalidate(tables)
+        with self._lock:
+            self.invalidations += removed
+
+    def clear(self):
+        if self._backend is not None:
+            self._backend.clear()
+
+    def stats(self):
+        backend = self._backend
+        with self._lock:
+            return {
+                "backend": type(backend).__name__ if backend else None,
+                "size": backend.size() if backend else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": backend.evictions if backend else 0,
+                "invalidations": self.invalidations,
+                "compressed_variant_hits": self.variant_hits,
+            }
+
+    def cached(self, schema, *tables):
+        """
+        Decorador para GET de catálogo que dependen de `tables`. `schema` es el
+        de @blp.response: en un fallo se serializa aquí para guardar el cuerpo.
+        Va debajo de los decoradores de autenticación y de conditional_get.
+        """
+        dumper = schema() if isinstance(schema, type) else schema
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                key = _cache_key(tables)
+                body = self.get(key)
+                if body is not None:
+                    g.response_cache_entry = (self, key, tables)
+                    return Response(body, mimetype="application/json")
+
+                result = view(*args, **kwargs)
+                if not isinstance(result, Response):
+                    result = current_app.json.response(dumper.dump(result))
+                if result.status_code == 200:
+                    self.put(key, result.get_data(), tables)
+                    # La compresión guarda su variante junto a esta entrada
+                    g.response_cache_entry = (self, key, tables)
+                return result
+            return wrapper
+        return decorator
+
+
+def _cache_key(tables) -> str:
+    principal = get_current_principal()
+    versions = request_versions(tables)
+    parts = [
+        request.path,
+        "&".join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True))),
+        principal.role if principal else "anonymous",
+        ",".join(f"{name}:{versions[name]}" for name in sorted(versions)),
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+# Instancia única por proceso
+response_cache = ResponseCache()
+
+# Invalidación precisa al confirmar escrituras en este proceso
+on_tables_committed(response_cache.invalidate_tables)
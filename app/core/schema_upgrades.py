@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Actualización de Esquema en el Primer Uso
+Las tablas y columnas que agregan los módulos de app/core no existen en
+bases creadas antes que ellos (el repo no tiene migraciones Alembic y
+db.create_all() no agrega columnas). Cada módulo registra un paso idempotente con
+@schema_upgrade y ensure_schema() los ejecuta una vez por proceso y base:
+antes de la primera request (create_app) o con `manage.py db upgrade`.
+"""
+
+import threading
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.database import db
+
+# Pasos step(connection), en orden de registro
+_upgrades = []
+_applied = set()  # URLs de las bases ya actualizadas por este proceso
+_lock = threading.Lock()
+
+
+def schema_upgrade(step):
+    """Registra step(connection) para ensure_schema(); debe poder repetirse sin efecto"""
+    _upgrades.append(step)
+    return step
+
+
+def create_missing_tables(connection, *table_names):
+    """
+    Crea las tablas del modelo (e índices) que falten. IF NOT EXISTS en lugar de
+    inspeccionar antes: varios workers pueden arrancar a la vez sobre la misma base.
+    """
+    for name in table_names:
+        table = db.metadata.tables[name]
+        connection.execute(CreateTable(table, if_not_exists=True))
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def has_table(connection, table_name):
+    """True si la tabla existe (los pasos que agregan columnas omiten bases aún vacías)"""
+    return sa_inspect(connection).has_table(table_name)
+
+
+def ensure_schema():
+    """Aplica los pasos registrados una vez por proceso y base (no-op las siguientes veces)"""
+    engine = db.engine
+    key = str(engine.url)
+    if key in _applied:
+        return
+    with _lock:
+        if key in _applied:
+            return
+        with engine.begin() as connection:
+            for step in _upgrades:
+                step(connection)
+        _applied.add(key)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Pool de Conexiones SQLite Directas
+Conexiones reutilizables y afinadas (WAL, synchronous=NORMAL, mmap, cache de
+páginas y de sentencias) para los helpers que consultan SQLite sin SQLAlchemy
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from app.database import db
+
+# PRAGMAs aplicados a cada conexión nueva
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-16000",  # ~16 MB de páginas en memoria
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Sentencias preparadas que sqlite3 mantiene por conexión
+_CACHED_STATEMENTS = 256
+
+
+def resolve_sqlite_path() -> Optional[Path]:
+    """
+    Ruta del archivo SQLite tal como la resuelve Flask-SQLAlchemy a partir de
+    SQLALCHEMY_DATABASE_URI (las rutas relativas cuelgan de instance_path).
+    Devuelve None si la base de datos configurada no es SQLite en archivo.
+    """
+    url = db.engine.url
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    return Path(url.database)
+
+
+class SQLitePool:
+    """Pool LIFO de conexiones sqlite3 por archivo de base de datos"""
+
+    def __init__(self, max_idle=8):
+        self.max_idle = max_idle
+        self._idle = {}  # ruta -> [conexiones libres]
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connect(self, path: Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(path),
+            timeout=5,
+            check_same_thread=False,  # la conexión cambia de hilo al volver al pool
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self, path: Path) -> sqlite3.Connection:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Proceso hijo (p. ej. worker de gunicorn): no compartir conexiones heredadas
+                self._idle = {}
+                self._pid = os.getpid()
+            idle = self._idle.get(path)
+            if idle:
+                return idle.pop()
+        return self._connect(path)
+
+    def _release(self, path: Path, conn: sqlite3.Connection):
+        with self._lock:
+            idle = self._idle.setdefault(path, [])
+            if len(idle) < self.max_idle and self._pid == os.getpid():
+                idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexión del pool durante el bloque `with`.
+        Produce None si la base de datos no es SQLite o el archivo no existe.
+        """
+        path = resolve_sqlite_path()
+        if path is None or not path.exists():
+            yield None
+            return
+
+        conn = self._acquire(path)
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(path, conn)
+
+    def close_all(self):
+        """Cierra todas las conexiones libres (tests o apagado)"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+# Instancia única por proceso
+sqlite_pool = SQLitePool()
+
+
+def direct_connection():
+    """Atajo: `with direct_connection() as conn:` sobre el pool del proceso"""
+    return sqlite_pool.connection()
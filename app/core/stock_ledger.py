@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Libro Mayor de Movimientos de Stock
+Cada cambio de stocks.quantity deja un movimiento (producto, delta, tipo,
+motivo, referencia) en stock_movements dentro de la misma transacción: el
+saldo materializado es siempre la suma de su historia. Las instantáneas
+(stock_snapshots) guardan el saldo tras un movimiento dado, así que el saldo
+en cualquier instante se reconstruye desde la instantánea anterior sumando
+solo los movimientos posteriores, y la auditoría compara esa reconstrucción
+con stocks.quantity sin recorrer toda la historia.
+
+Las escrituras ORM de Stock (alta, cambio de quantity, baja) se registran
+solas en el flush; describe_movements() indica su tipo y motivo. Las
+escrituras por SQL directo (core/stock_operations.py) llaman a
+record_movements().
+"""
+
+import time
+from sqlalchemy import event, func, insert, inspect as sa_inspect, literal, select, text
+from sqlalchemy.orm import Session
+from app.models.stock import Stock
+from app.models.stock_movement import (
+    MOVEMENT_KINDS, MOVEMENT_KIND_NAMES, StockMovement, StockMovementReason, StockSnapshot
+)
+from .change_versions import bump_versions
+from .schema_upgrades import schema_upgrade
+
+_movements = StockMovement.__table__
+_reasons = StockMovementReason.__table__
+_snapshots = StockSnapshot.__table__
+_stocks = Stock.__table__
+
+_REASON_MAX_LENGTH = 200
+_INSERT_REASON_SQL = text(
+    "INSERT INTO stock_movement_reasons (label) VALUES (:label) ON CONFLICT (label) DO NOTHING"
+)
+
+
+def _now():
+    return int(time.time())
+
+
+def reason_id(connection, reason):
+    """Id del motivo normalizado (lo crea si es nuevo); None si no hay motivo"""
+    label = (reason or "").strip()[:_REASON_MAX_LENGTH]
+    if not label:
+        return None
+    lookup = select(_reasons.c.id).where(_reasons.c.label == label)
+    found = connection.execute(lookup).scalar()
+    if found is None:
+        # ON CONFLICT: otra transacción pudo crear el mismo motivo en paralelo
+        connection.execute(_INSERT_REASON_SQL, {"label": label})
+        found = connection.execute(lookup).scalar_one()
+    return found
+
+
+def record_movements(connection, deltas, kind, reason=None, reference_id=None):
+    """
+    Inserta un movimiento por cada {product_id: delta} distinto de cero en la
+    transacción de `connection` (la misma que modificó stocks.quantity).
+    Devuelve la cantidad de movimientos registrados.
+    """
+    changes = sorted((product_id, delta) for product_id, delta in deltas.items() if delta)
+    if not changes:
+        return 0
+    shared = {
+        "kind": MOVEMENT_KINDS[kind],
+        "reason_id": reason_id(connection, reason),
+        "reference_id": reference_id,
+        "occurred_at": _now(),
+    }
+    connection.execute(
+        insert(_movements),
+        [{"product_id": product_id, "delta": delta, **shared} for product_id, delta in changes],
+    )
+    bump_versions(connection, ["stock_movements"])
+    return len(changes)
+
+
+def describe_movements(session, kind, reason=None, reference_id=None):
+    """
+    Tipo, motivo y referencia de los movimientos que generen las escrituras
+    ORM de Stock en la transacción en curso (por defecto: 'initial' al crear,
+    'correction' al cambiar quantity y 'removal' al borrar).
+    """
+    session.info["stock_movement_context"] = (kind, reason, reference_id)
+
+
+# -- Registro automático de las escrituras ORM --------------------------------
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_quantities(session, flush_context, instances):
+    # El saldo de un stock borrado se necesita después del flush (delta de la baja)
+    for instance in session.deleted:
+        if isinstance(instance, Stock):
+            instance.quantity
+
+
+@event.listens_for(Session, "after_flush")
+def _record_orm_movements(session, flush_context):
+    # new/dirty/deleted todavía reflejan el estado previo al flush
+    by_kind = {}
+
+    def add(kind, product_id, delta):
+        if delta:
+            deltas = by_kind.setdefault(kind, {})
+            deltas[product_id] = deltas.get(product_id, 0) + delta
+
+    for instance in session.new:
+        if isinstance(instance, Stock):
+            add("initial", instance.product_id, instance.quantity)
+    for instance in session.dirty:
+        if isinstance(instance, Stock):
+            history = sa_inspect(instance).attrs.quantity.history
+            if history.added and history.deleted:
+                add("correction", instance.product_id, history.added[0] - history.deleted[0])
+    for instance in session.deleted:
+        if isinstance(instance, Stock):
+            add("removal", instance.product_id, -(instance.quantity or 0))
+    if not by_kind:
+        return
+
+    context = session.info.get("stock_movement_context")
+    connection = session.connection()
+    if context is not None:
+        kind, reason, reference_id = context
+        merged = {}
+        for deltas in by_kind.values():
+            for product_id, delta in deltas.items():
+                merged[product_id] = merged.get(product_id, 0) + delta
+        record_movements(connection, merged, kind, reason, reference_id)
+    else:
+        for kind, deltas in by_kind.items():
+            record_movements(connection, deltas, kind)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_context(session):
+    session.info.pop("stock_movement_context", None)
+
+
+@event.listens_for(StockMovement.__table__, "after_create")
+def _open_balances(target, connection, **kw):
+    # Tabla nueva sobre stock existente: saldo de apertura por producto, para que la
+    # suma de la historia coincida desde el primer día
+    if not sa_inspect(connection).has_table(_stocks.name):
+        return
+    connection.execute(
+        insert(_movements).from_select(
+            ["product_id", "delta", "kind", "occurred_at"],
+            select(
+                _stocks.c.product_id, _stocks.c.quantity,
+                literal(MOVEMENT_KINDS["initial"]), literal(_now()),
+            ).where(_stocks.c.quantity != 0),
+        )
+    )
+
+
+
+@schema_upgrade
+def ensure_ledger_tables(connection):
+    """Crea las tablas del libro mayor en bases anteriores a él (cada cambio de stock escribe en ellas)"""
+    # create(checkfirst) y no IF NOT EXISTS: dispara after_create y con él los saldos de apertura
+    for table in (_reasons, _movements, _snapshots):
+        table.create(connection, checkfirst=True)
+
+
+# -- Instantáneas, reconstrucción y auditoría ---------------------------------
+
+def _watermark(connection):
+    # Cada take_snapshots cubre todos los productos hasta el mismo movimiento, así que
+    # los movimientos posteriores al mayor movement_id son los únicos sin instantánea
+    return connection.execute(select(func.coalesce(func.max(_snapshots.c.movement_id), 0))).scalar()
+
+
+def _latest_snapshots():
+    """Subconsulta (product_id, movement_id, quantity) de la última instantánea de cada producto"""
+    latest = (
+        select(_snapshots.c.product_id, func.max(_snapshots.c.movement_id).label("movement_id"))
+        .group_by(_snapshots.c.product_id)
+        .subquery("latest")
+    )
+    return (
+        select(_snapshots.c.product_id, _snapshots.c.movement_id, _snapshots.c.quantity)
+        .join(
+            latest,
+            (latest.c.product_id == _snapshots.c.product_id)
+            & (latest.c.movement_id == _snapshots.c.movement_id),
+        )
+        .subquery("snapshot")
+    )
+
+
+def take_snapshots(session):
+    """
+    Guarda el saldo de cada producto con movimientos desde la instantánea
+    anterior (pensado para ejecutarse periódicamente, p. ej. desde cron con
+    `manage.py stock snapshot`). Solo lee los movimientos nuevos. No confirma;
+    devuelve la cantidad de instantáneas creadas.
+    """
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        # Espera a las transacciones con movimientos en curso: ningún id menor al
+        # límite puede confirmarse después de la instantánea
+        connection.execute(text("LOCK TABLE stock_movements IN SHARE MODE"))
+    upto = connection.execute(select(func.max(_movements.c.id))).scalar()
+    since = _watermark(connection)
+    if upto is None or upto <= since:
+        return 0
+
+    previous = (
+        select(_snapshots.c.quantity)
+        .where(_snapshots.c.product_id == _movements.c.product_id)
+        .order_by(_snapshots.c.movement_id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    pending = (
+        select(
+            _movements.c.product_id,
+            func.max(_movements.c.id),
+            func.coalesce(previous, 0) + func.sum(_movements.c.delta),
+            literal(_now()),
+        )
+        .where(_movements.c.id > since, _movements.c.id <= upto)
+        .group_by(_movements.c.product_id)
+    )
+    result = connection.execute(
+        insert(_snapshots).from_select(["product_id", "movement_id", "quantity", "taken_at"], pending)
+    )
+    bump_versions(connection, ["stock_snapshots"])
+    return result.rowcount
+
+
+def quantity_at(session, product_id, at):
+    """
+    Saldo de `product_id` en el instante `at` (epoch): la última instantánea
+    tomada hasta ese momento más los movimientos posteriores ocurridos hasta `at`.
+    """
+    connection = session.connection()
+    snapshot = connection.execute(
+        select(_snapshots.c.id, _snapshots.c.movement_id, _snapshots.c.quantity)
+        .where(_snapshots.c.product_id == product_id, _snapshots.c.taken_at <= at)
+        .order_by(_snapshots.c.movement_id.desc())
+        .limit(1)
+    ).first()
+    snapshot_id, after_id, base = snapshot if snapshot is not None else (None, 0, 0)
+    delta, replayed = connection.execute(
+        select(func.coalesce(func.sum(_movements.c.delta), 0), func.count())
+        .where(
+            _movements.c.product_id == product_id,
+            _movements.c.id > after_id,
+            _movements.c.occurred_at <= at,
+        )
+    ).one()
+    return {
+        "product_id": product_id,
+        "at": at,
+        "quantity": base + delta,
+        "snapshot_id": snapshot_id,
+        "movements_replayed": replayed,
+    }
+
+
+def audit_balances(session, product_ids=None):
+    """
+    Compara stocks.quantity con el saldo del libro mayor (última instantánea
+    más los movimientos sin instantánea) para todos los productos o para
+    `product_ids`. Devuelve {'checked', 'discrepancies': [...]} con los que no
+    coinciden, incluidos productos sin registro de stock y saldo distinto de cero.
+    """
+    connection = session.connection()
+    snapshot = _latest_snapshots()
+    tail_query = (
+        select(_movements.c.product_id, func.sum(_movements.c.delta).label("delta"))
+        .where(_movements.c.id > _watermark(connection))
+        .group_by(_movements.c.product_id)
+    )
+    if product_ids is not None:
+        tail_query = tail_query.where(_movements.c.product_id.in_(list(product_ids)))
+    tail = tail_query.subquery("tail")
+
+    def ledger_of(product_column):
+        return (
+            select(
+                product_column,
+                (func.coalesce(snapshot.c.quantity, 0) + func.coalesce(tail.c.delta, 0)).label("ledger"),
+            )
+            .outerjoin(snapshot, snapshot.c.product_id == product_column)
+            .outerjoin(tail, tail.c.product_id == product_column)
+        )
+
+    # Productos con stock: saldo materializado contra libro mayor
+    with_stock = ledger_of(_stocks.c.product_id).add_columns(_stocks.c.quantity)
+    checked = select(func.count()).select_from(_stocks)
+    # Productos sin registro de stock (borrado): el libro mayor debe quedar en cero
+    ledger_products = (
+        select(_movements.c.product_id)
+        .where(~select(_stocks.c.id).where(_stocks.c.product_id == _movements.c.product_id).exists())
+        .distinct()
+        .subquery("orphans")
+    )
+    without_stock = ledger_of(ledger_products.c.product_id).add_columns(literal(0).label("quantity"))
+    if product_ids is not None:
+        ids = list(product_ids)
+        with_stock = with_stock.where(_stocks.c.product_id.in_(ids))
+        checked = checked.where(_stocks.c.product_id.in_(ids))
+        without_stock = without_stock.where(ledger_products.c.product_id.in_(ids))
+
+    discrepancies = []
+    for statement in (with_stock, without_stock):
+        rows = connection.execute(statement).all()
+        discrepancies.extend(
+            {
+                "product_id": product_id,
+                "quantity": quantity,
+                "ledger_quantity": ledger,
+                "difference": quantity - ledger,
+            }
+            for product_id, ledger, quantity in rows
+            if ledger != quantity
+        )
+    discrepancies.sort(key=lambda row: row["product_id"])
+    return {"checked": connection.execute(checked).scalar(), "discrepancies": discrepancies}
+
+
+def movement_summary(session, since=None, until=None, kinds=None, product_id=None):
+    """
+    Totales de movimientos por tipo y motivo en un período (epoch), p. ej.
+    para conciliar mermas: [{'kind', 'reason', 'movements', 'quantity'}].
+    """
+    statement = (
+        select(
+            _movements.c.kind, _reasons.c.label,
+            func.count().label("movements"), func.sum(_movements.c.delta).label("quantity"),
+        )
+        .select_from(_movements.outerjoin(_reasons, _reasons.c.id == _movements.c.reason_id))
+        .group_by(_movements.c.kind, _reasons.c.label)
+        .order_by(_movements.c.kind, _reasons.c.label)
+    )
+    if since is not None:
+        statement = statement.where(_movements.c.occurred_at >= since)
+    if until is not None:
+        statement = statement.where(_movements.c.occurred_at <= until)
+    if kinds:
+        statement = statement.where(_movements.c.kind.in_([MOVEMENT_KINDS[kind] for kind in kinds]))
+    if product_id is not None:
+        statement = statement.where(_movements.c.product_id == product_id)
+    return [
+        {"kind": MOVEMENT_KIND_NAMES[kind], "reason": label, "movements": count, "quantity": total}
+        for kind, label, count, total in session.connection().execute(statement)
+    ]
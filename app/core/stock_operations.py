@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Operaciones de Stock Basadas en Conjuntos
+Movimientos de stock como UPDATE condicionales (quantity + delta >= 0) en
+lote, sin leer cada fila para sumar o restar en Python: la condición y la
+suma ocurren en la misma sentencia, así que dos operaciones concurrentes no
+pueden pisarse ni dejar stock negativo. El rowcount indica si todas las
+filas cumplieron. Cada movimiento queda en el libro mayor (core/stock_ledger.py)
+en la misma transacción.
+
+Las funciones trabajan sobre la transacción de la sesión y no confirman: el
+llamador hace un único commit (o rollback si se lanza StockOperationError).
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, func, select, update
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.stock import Stock
+from .change_versions import bump_versions
+from .stock_ledger import record_movements
+from . import stock_reservations  # noqa: F401  (reservas de las escrituras ORM de órdenes)
+
+_stocks = Stock.__table__
+
+# quantity cambia solo si no queda negativa (la suma y la verificación son atómicas)
+_APPLY_DELTA_SQL = (
+    update(_stocks)
+    .where(_stocks.c.product_id == bindparam("target_product_id"))
+    .where(_stocks.c.quantity + bindparam("delta") >= 0)
+    .values(quantity=_stocks.c.quantity + bindparam("delta"))
+)
+# Venta de una orden pendiente: el descuento libera a la vez la reserva de la orden
+_APPLY_SALE_SQL = _APPLY_DELTA_SQL.values(reserved_quantity=_stocks.c.reserved_quantity + bindparam("delta"))
+
+
+class StockOperationError(Exception):
+    """Operación de stock rechazada; la transacción debe revertirse"""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class InsufficientStock(StockOperationError):
+    """Algún producto no tiene stock suficiente para el descuento pedido"""
+
+    def __init__(self, shortages):
+        # [(product_id, solicitado, disponible)]
+        self.shortages = shortages
+        details = ", ".join(
+            f"producto {product_id}: solicitado {requested}, disponible {available}"
+            for product_id, requested, available in shortages
+        )
+        super().__init__(f"Stock insuficiente. {details}")
+
+
+def apply_movements(session, deltas, kind, reason=None, reference_id=None, release_reserved=False):
+    """
+    Suma {product_id: delta} al stock con UPDATE condicionales en lote (un
+    executemany) y registra los movimientos de tipo `kind` en el libro mayor.
+    Con release_reserved, los descuentos también liberan reserved_quantity.
+    Lanza InsufficientStock si algún descuento dejaría stock negativo (o
+    StockOperationError si un producto no tiene registro de stock); en ese
+    caso los demás cambios quedan aplicados en la transacción y el llamador
+    debe hacer rollback.
+    """
+    params = [
+        {"target_product_id": product_id, "delta": delta}
+        for product_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not params:
+        return
+    statement = _APPLY_SALE_SQL if release_reserved else _APPLY_DELTA_SQL
+    connection = session.connection()
+    if connection.dialect.supports_sane_multi_rowcount:
+        updated = connection.execute(statement, params).rowcount
+    else:
+        updated = sum(connection.execute(statement, row).rowcount for row in params)
+
+    if updated != len(params):
+        # Diagnóstico (solo en el caso de error): qué productos no alcanzaron
+        available = dict(
+            connection.execute(
+                select(_stocks.c.product_id, _stocks.c.quantity)
+                .where(_stocks.c.product_id.in_([row["target_product_id"] for row in params]))
+            ).all()
+        )
+        missing = [row["target_product_id"] for row in params if row["target_product_id"] not in available]
+        if missing:
+            raise StockOperationError(
+                f"Producto(s) sin registro de stock: {', '.join(str(product_id) for product_id in missing)}"
+            )
+        shortages = [
+            (row["target_product_id"], -row["delta"], available[row["target_product_id"]])
+            for row in params
+            if available[row["target_product_id"]] + row["delta"] < 0
+        ]
+        raise InsufficientStock(shortages)
+
+    # SQL directo: publicar el cambio de versión (ETag / cache de respuestas)
+    bump_versions(connection, ["stocks"])
+    record_movements(connection, deltas, kind, reason, reference_id)
+
+
+def decrement_stock(session, quantities, reference_id=None):
+    """
+    Descuenta {product_id: cantidad} como movimientos de venta de la orden
+    pendiente `reference_id`, liberando su reserva
+    """
+    apply_movements(
+        session, {product_id: -amount for product_id, amount in quantities.items()}, "sale",
+        reference_id=reference_id, release_reserved=True,
+    )
+
+
+def complete_order(session, order_id):
+    """
+    Completa una orden pendiente: marca el estado con un UPDATE condicionado a
+    status = 'pending' (una segunda completación concurrente no descuenta dos
+    veces) y descuenta el stock de todos sus items en lote, liberando su reserva.
+
+    Devuelve {product_id: cantidad descontada}; la orden se lee tras el commit.
+    """
+    now = datetime.now(timezone.utc)
+    completed = (
+        session.query(Order)
+        .filter(Order.id == order_id, Order.status == 'pending')
+        .update({"status": 'completed', "completed_at": now, "updated_at": now}, synchronize_session="evaluate")
+    )
+    if completed != 1:
+        order = session.get(Order, order_id)
+        if order is None:
+            raise StockOperationError("Orden no encontrada")
+        raise StockOperationError(f"La orden ya está {order.status}")
+
+    quantities = dict(
+        session.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id == order_id)
+            .group_by(OrderItem.product_id)
+        ).all()
+    )
+    if not quantities:
+        raise StockOperationError("No se puede completar una orden sin productos")
+
+    decrement_stock(session, quantities, reference_id=order_id)
+    return quantities
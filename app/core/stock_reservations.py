@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Reservas de Stock de Órdenes Pendientes
+stocks.reserved_quantity guarda las unidades comprometidas en órdenes
+pendientes, así que la disponibilidad (quantity - reserved_quantity) es una
+lectura de la fila de stock en lugar de recorrer las órdenes pendientes.
+
+El contador se actualiza con UPDATE relativos (reserved_quantity + delta) en
+la misma transacción que la escritura de la orden: las escrituras ORM de
+Order y OrderItem (alta, edición de items, cambio de estado, baja) se
+registran solas en el flush, y la completación por SQL directo
+(core/stock_operations.py) libera la reserva junto con el descuento.
+En bases anteriores a la columna, ensure_schema() la agrega y la calcula
+desde las órdenes pendientes antes de la primera request;
+rebuild_reservations() la recalcula a pedido (reparación).
+"""
+
+from sqlalchemy import bindparam, event, func, inspect as sa_inspect, select, text, update
+from sqlalchemy.orm import Session
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.stock import Stock
+from .change_versions import bump_versions
+from .schema_upgrades import has_table, schema_upgrade
+
+_stocks = Stock.__table__
+
+_RESERVE_SQL = (
+    update(_stocks)
+    .where(_stocks.c.product_id == bindparam("target_product_id"))
+    .values(reserved_quantity=_stocks.c.reserved_quantity + bindparam("delta"))
+)
+
+
+def reserve_stock(connection, deltas):
+    """Suma {product_id: delta} a reserved_quantity (delta negativo libera) en la transacción en curso"""
+    params = [
+        {"target_product_id": product_id, "delta": delta}
+        for product_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not params:
+        return
+    connection.execute(_RESERVE_SQL, params)
+    bump_versions(connection, ["stocks"])
+
+
+# -- Registro automático de las escrituras ORM de órdenes ---------------------
+
+def _value_before(instance, attribute):
+    history = sa_inspect(instance).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(instance, attribute)
+
+
+def _status_before(session, order):
+    if order is None or order in session.new:
+        return None
+    return _value_before(order, "status")
+
+
+def _status_after(session, order):
+    if order is None or order in session.deleted:
+        return None
+    return order.status
+
+
+def _order_of(session, item):
+    return item.order if item.order is not None else session.get(Order, item.order_id)
+
+
+@event.listens_for(OrderItem, "after_delete")
+def _item_deleted(mapper, connection, target):
+    # Los items quitados de Order.items (cascada delete-orphan) se borran en el flush
+    # sin pasar por session.deleted: se anotan aquí para _reserve_on_flush
+    Session.object_session(target).info.setdefault("reserve_deleted_items", []).append(target)
+
+
+@event.listens_for(Session, "after_flush")
+def _reserve_on_flush(session, flush_context):
+    # Reserva de un item = su cantidad si la orden está pendiente: se resta el aporte
+    # previo al flush y se suma el posterior de cada item afectado
+    deleted = set(session.deleted)
+    deleted.update(session.info.pop("reserve_deleted_items", ()))
+    items = set()
+    for instance in deleted.union(session.new):
+        if isinstance(instance, OrderItem):
+            items.add(instance)
+    for instance in session.dirty:
+        if isinstance(instance, OrderItem) and session.is_modified(instance, include_collections=False):
+            items.add(instance)
+        elif isinstance(instance, Order) and sa_inspect(instance).attrs.status.history.has_changes():
+            items.update(instance.items)
+    if not items:
+        return
+
+    deltas = {}
+    for item in items:
+        order = _order_of(session, item)
+        if item not in session.new and _status_before(session, order) == 'pending':
+            product_id = _value_before(item, "product_id")
+            deltas[product_id] = deltas.get(product_id, 0) - _value_before(item, "quantity")
+        if item not in deleted and _status_after(session, order) == 'pending':
+            deltas[item.product_id] = deltas.get(item.product_id, 0) + item.quantity
+    reserve_stock(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deleted_items(session):
+    session.info.pop("reserve_deleted_items", None)
+
+
+# -- Recalculo desde las órdenes -----------------------------------------------
+
+def ensure_reserved_column(connection):
+    """Agrega stocks.reserved_quantity en bases creadas antes de esta columna"""
+    if not has_table(connection, _stocks.name):
+        return False  # base vacía: db.create_all() crea la tabla con la columna
+    columns = {column["name"] for column in sa_inspect(connection).get_columns(_stocks.name)}
+    if "reserved_quantity" in columns:
+        return False
+    connection.execute(text("ALTER TABLE stocks ADD COLUMN reserved_quantity INTEGER NOT NULL DEFAULT 0"))
+    return True
+
+
+@schema_upgrade
+def _upgrade_reserved_column(connection):
+    # Columna recién agregada: se carga con las órdenes pendientes en la misma transacción
+    if ensure_reserved_column(connection):
+        _rebuild(connection)
+
+
+def _rebuild(connection):
+    pending = (
+        select(func.coalesce(func.sum(OrderItem.quantity), 0))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.status == 'pending', OrderItem.product_id == _stocks.c.product_id)
+        .scalar_subquery()
+    )
+    result = connection.execute(
+        update(_stocks).where(_stocks.c.reserved_quantity != pending).values(reserved_quantity=pending)
+    )
+    if result.rowcount:
+        bump_versions(connection, ["stocks"])
+    return result.rowcount
+
+
+def rebuild_reservations(session):
+    """
+    Recalcula reserved_quantity de todo el stock a partir de los items de
+    las órdenes pendientes. No confirma; devuelve las filas corregidas.
+    """
+    connection = session.connection()
+    ensure_reserved_column(connection)
+    return _rebuild(connection)
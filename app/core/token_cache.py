@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cache de Tokens Decodificados
+LRU acotado de claims ya verificados, indexado por el hash del token crudo y
+válido hasta el `exp` del propio token. La firma HS256 y el parseo JSON se
+hacen una vez por token y por worker, no en cada request.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask_jwt_extended import JWTManager
+
+
+class DecodedTokenCache:
+    """LRU thread-safe de sha256(token) -> (expira_en, claims)"""
+
+    def __init__(self, max_size=2048, max_ttl=3600.0):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.configure(max_size, max_ttl)
+
+    def configure(self, max_size, max_ttl=3600.0):
+        """Ajusta los límites del cache (se llama desde create_app)"""
+        with self._lock:
+            self.max_size = int(max_size)
+            self.max_ttl = float(max_ttl)  # tope para tokens sin `exp`
+            self._entries.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def key_for(encoded_token: str) -> bytes:
+        # Hash del token: no se retienen tokens crudos en memoria como claves
+        return hashlib.sha256(encoded_token.encode()).digest()
+
+    def get(self, key):
+        """Claims verificados del token o None si no están o el token ya expiró"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, claims):
+        """Guarda claims verificados hasta el `exp` del token"""
+        expires_at = claims.get("exp") or time.time() + self.max_ttl
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Instancia única por proceso
+decoded_token_cache = DecodedTokenCache()
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager que reutiliza los claims verificados de tokens ya vistos.
+    Tipo de token, revocación y frescura se siguen verificando en cada request.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Con CSRF (cookies) o tokens vencidos se delega siempre en la verificación completa
+        if not decoded_token_cache.enabled or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = decoded_token_cache.key_for(encoded_token)
+        claims = decoded_token_cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            decoded_token_cache.put(key, claims)
+        # Copia superficial: el llamador puede guardar/modificar el dict en flask.g
+        return dict(claims)
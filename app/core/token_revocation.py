@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Almacén de Revocación de Tokens por jti
+Conjunto en memoria de jti revocados con expulsión por orden de expiración,
+persistido en la tabla revoked_tokens para sobrevivir reinicios y propagarse
+entre workers (sondeo incremental, nunca por request). Opcionalmente un filtro
+de Bloom delante resuelve el caso común "no revocado" sin tocar el conjunto.
+"""
+
+import heapq
+import sqlite3
+import threading
+import time
+from flask import current_app
+from sqlalchemy import text
+from app.database import db
+from .sqlite_pool import direct_connection
+from .schema_upgrades import create_missing_tables, schema_upgrade
+
+_INSERT_REVOKED_SQL = text(
+    """
+    INSERT INTO revoked_tokens (jti, user_id, expires_at, revoked_at)
+    VALUES (:jti, :user_id, :expires_at, :revoked_at)
+    ON CONFLICT (jti) DO NOTHING
+    """
+)
+_PURGE_EXPIRED_SQL = text("DELETE FROM revoked_tokens WHERE expires_at < :now")
+
+
+@schema_upgrade
+def ensure_revoked_tokens_table(connection):
+    """Crea revoked_tokens en bases anteriores a este módulo (logout escribe en ella)"""
+    create_missing_tables(connection, "revoked_tokens")
+
+
+class BloomFilter:
+    """Filtro de Bloom local al proceso (sin falsos negativos)"""
+
+    def __init__(self, size_bits=1 << 20, hashes=4):
+        self.size_bits = int(size_bits)
+        self.hashes = int(hashes)
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, key):
+        # Doble hashing sobre hash() del proceso: suficiente para un filtro no persistido
+        h1 = hash(key)
+        h2 = (h1 >> 32) | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class TokenRevocationStore:
+    """Conjunto thread-safe de jti revocados hasta su expiración"""
+
+    def __init__(self, sync_interval=2.0, bloom_bits=0):
+        self._revoked = {}  # jti -> expira_en (epoch)
+        self._expiry_heap = []  # (expira_en, jti) para expulsar en orden
+        self._lock = threading.Lock()
+        self._last_id = None  # última fila de revoked_tokens aplicada
+        self._next_sync = 0.0
+        self._bloom = None
+        self.configure(sync_interval, bloom_bits)
+
+    def configure(self, sync_interval, bloom_bits=0):
+        """Ajusta el intervalo de sincronización y el filtro de Bloom (0 = sin filtro)"""
+        with self._lock:
+            self.sync_interval = float(sync_interval)
+            self.bloom_bits = int(bloom_bits)
+            self._revoked = {}
+            self._expiry_heap = []
+            self._last_id = None
+            self._next_sync = 0.0
+            self._bloom = BloomFilter(self.bloom_bits) if self.bloom_bits > 0 else None
+
+    def is_revoked(self, jti) -> bool:
+        """True si el jti fue revocado (O(1), sin consultar la base de datos)"""
+        self._sync_if_due()
+        bloom = self._bloom
+        if bloom is not None and jti not in bloom:
+            return False
+        return jti in self._revoked
+
+    def add(self, jti, expires_at):
+        """Marca un jti como revocado en este proceso"""
+        with self._lock:
+            self._add_locked(jti, expires_at)
+
+    def revoke(self, jti, expires_at, user_id=None):
+        """
+        Revoca un token y lo persiste para el resto de los workers.
+        Debe llamarse antes del commit (como invalidate_principal).
+        """
+        now = int(time.time())
+        db.session.execute(
+            _INSERT_REVOKED_SQL,
+            {"jti": jti, "user_id": user_id, "expires_at": int(expires_at), "revoked_at": now},
+        )
+        # Aprovechar la escritura para podar filas que ya no pueden usarse
+        db.session.execute(_PURGE_EXPIRED_SQL, {"now": now})
+        self.add(jti, expires_at)
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._revoked),
+                "last_id": self._last_id,
+                "bloom_bits": self.bloom_bits,
+            }
+
+    def _add_locked(self, jti, expires_at):
+        if jti in self._revoked:
+            return
+        self._revoked[jti] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, jti))
+        if self._bloom is not None:
+            self._bloom.add(jti)
+
+    def _evict_expired_locked(self, now):
+        heap = self._expiry_heap
+        evicted = 0
+        while heap and heap[0][0] < now:
+            _expires_at, jti = heapq.heappop(heap)
+            self._revoked.pop(jti, None)
+            evicted += 1
+        if evicted and self._bloom is not None:
+            # Un Bloom no admite borrados: reconstruirlo con los jti vigentes
+            self._bloom = BloomFilter(self.bloom_bits)
+            for jti in self._revoked:
+                self._bloom.add(jti)
+
+    def _sync_if_due(self):
+        """Aplica revocaciones de otros workers y expulsa las vencidas (una vez por intervalo)"""
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+
+        rows = _read_revocations(self._last_id)
+        with self._lock:
+            if rows is not None:
+                for row_id, jti, expires_at in rows:
+                    self._add_locked(jti, expires_at)
+                    self._last_id = max(self._last_id or 0, row_id)
+                if self._last_id is None:
+                    self._last_id = 0
+            self._evict_expired_locked(time.time())
+
+
+def _read_revocations(since_id):
+    """Lee las revocaciones vigentes posteriores a since_id (None si falla la lectura)"""
+    try:
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+            return conn.execute(
+                """
+                SELECT id, jti, expires_at FROM revoked_tokens
+                WHERE id > ? AND expires_at >= ?
+                ORDER BY id
+                """,
+                (since_id or 0, int(time.time())),
+            ).fetchall()
+
+    except sqlite3.OperationalError:
+        # Tabla aún no creada: solo aplican las revocaciones locales
+        return None
+    except Exception as e:
+        current_app.logger.warning(f"Error sincronizando tokens revocados: {e}")
+        return None
+
+
+# Instancia única por proceso
+token_revocation_store = TokenRevocationStore()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Denylist de Usuarios para Autorización sin Estado
+Lista en memoria de usuarios cuyos claims firmados ya no son confiables
+(desactivados, o con rol/estado cambiado después de emitido el token).
+Se refresca desde la base de datos cada cierto intervalo, nunca por request.
+"""
+
+import sqlite3
+import threading
+import time
+from flask import current_app
+from .sqlite_pool import direct_connection
+
+# Marca para usuarios inactivos: ningún token emitido es confiable
+_ALWAYS = float("inf")
+
+
+class UserDenylist:
+    """Mapa user_id -> instante (epoch) hasta el cual sus tokens no son confiables"""
+
+    def __init__(self, refresh_interval=5.0):
+        self._denied = {}
+        self._lock = threading.Lock()
+        self._next_refresh = 0.0
+        self.refresh_interval = float(refresh_interval)
+
+    def configure(self, refresh_interval):
+        """Ajusta el intervalo de refresco (se llama desde create_app)"""
+        with self._lock:
+            self.refresh_interval = float(refresh_interval)
+            self._denied = {}
+            self._next_refresh = 0.0
+
+    def is_denied(self, user_id, issued_at) -> bool:
+        """True si un token del usuario emitido en `issued_at` no debe confiarse"""
+        self._refresh_if_due()
+        denied_until = self._denied.get(user_id)
+        return denied_until is not None and issued_at <= denied_until
+
+    def deny(self, user_id, until=None):
+        """Agrega un usuario localmente sin esperar al próximo refresco"""
+        with self._lock:
+            self._denied[user_id] = _ALWAYS if until is None else until
+
+    def __len__(self):
+        return len(self._denied)
+
+    def _refresh_if_due(self):
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        self._next_refresh = now + self.refresh_interval
+
+        denied = _load_denylist()
+        if denied is not None:
+            with self._lock:
+                self._denied = denied
+
+
+def _load_denylist():
+    """Lee usuarios inactivos e invalidaciones publicadas (None si falla la lectura)"""
+    try:
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+            try:
+                denied = dict(conn.execute("SELECT user_id, invalidated_at FROM auth_invalidations"))
+            except sqlite3.OperationalError:
+                # Tabla aún no creada: solo se pueden considerar los usuarios inactivos
+                denied = {}
+            for (user_id,) in conn.execute("SELECT id FROM users WHERE is_active = 0"):
+                denied[user_id] = _ALWAYS
+            return denied
+
+    except Exception as e:
+        current_app.logger.warning(f"Error refrescando denylist de usuarios: {e}")
+        return None
+
+
+# Instancia única por proceso
+user_denylist = UserDenylist()
@@ -5,29 +5,13 @@ Decoradores de autorización por roles para flask-smorest
 
 from functools import wraps
 from flask import jsonify, request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-import sqlite3
-from pathlib import Path
+from flask_jwt_extended import verify_jwt_in_request
+from app.core.identity import resolve_principal, get_current_principal
 
 def get_user_role_from_db(user_id):
-    """Obtiene el rol del usuario desde la base de datos"""
-    try:
-        db_path = Path("instance/stock_management.db")
-        if not db_path.exists():
-            return None
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT role FROM users WHERE id = ? AND is_active = 1", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        return result[0] if result else None
-        
-    except Exception as e:
-        print(f"Error obteniendo rol del usuario: {e}")
-        return None
+    """Obtiene el rol del usuario (reutiliza el principal de la request si ya fue cargado)"""
+    principal = resolve_principal(str(user_id))
+    return principal.role if principal else None
 
 def roles_required(*allowed_roles):
     """
@@ -46,12 +30,13 @@ def roles_required(*allowed_roles):
         def inner(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                user_id = get_jwt_identity()
-                user_role = get_user_role_from_db(user_id)
+                principal = get_current_principal()
                 
-                if not user_role:
+                if not principal:
                     return jsonify(message="Usuario no válido o inactivo"), 401
                 
+                user_role = principal.role
+                
                 if user_role not in allowed_roles:
                     return jsonify(
                         message="Permisos insuficientes", 
@@ -59,9 +44,11 @@ def roles_required(*allowed_roles):
                         required_roles=list(allowed_roles)
                     ), 403
                 
-                return fn(*args, **kwargs)
+                request.user_id = principal.id
             except Exception as e:
                 return jsonify(message="Error de autenticación"), 401
+
+            return fn(*args, **kwargs)
         return inner
     return wrapper
 
@@ -94,13 +81,14 @@ def active_user_required(fn):
     def inner(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user_role = get_user_role_from_db(user_id)
+            principal = get_current_principal()
             
-            if not user_role:
+            if not principal:
                 return jsonify(message="Usuario no válido o inactivo"), 401
             
-            return fn(*args, **kwargs)
+            request.user_id = principal.id
         except Exception as e:
             return jsonify(message="Error de autenticación"), 401
+
+        return fn(*args, **kwargs)
     return inner
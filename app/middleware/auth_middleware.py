@@ -6,30 +6,35 @@ Protege todas las rutas que requieren autenticación
 
 from functools import wraps
 from flask import request, jsonify, current_app
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-import sqlite3
-from pathlib import Path
+from flask_jwt_extended import verify_jwt_in_request
 from app.core.permissions import PermissionManager, Permission, Role
+from app.core.identity import get_current_principal
+from app.core.sqlite_pool import direct_connection
+
+# Mapeo de permisos antiguos (strings) a permisos del sistema centralizado
+_LEGACY_PERMISSION_MAPPING = {
+    'admin': Permission.MANAGE_SYSTEM,
+    'manager': Permission.MANAGE_PRODUCTS,
+    'supervisor': Permission.MANAGE_ORDERS,
+    'user': Permission.CREATE_ORDERS,
+    'viewer': Permission.READ_ONLY,
+    'write': Permission.CREATE,
+    'delete': Permission.DELETE
+}
 
 def get_user_by_id_direct(user_id):
     """Obtiene usuario por ID usando SQLite directo"""
     try:
-        db_path = Path("instance/stock_management.db")
-        if not db_path.exists():
-            return None
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, username, email, password_hash, first_name, last_name, 
-                   role, is_active, created_at, updated_at, last_login
-            FROM users 
-            WHERE id = ? AND is_active = 1
-        """, (user_id,))
-        
-        user_data = cursor.fetchone()
-        conn.close()
+        with direct_connection() as conn:
+            if conn is None:
+                return None
+            
+            user_data = conn.execute("""
+                SELECT id, username, email, password_hash, first_name, last_name,
+                       role, is_active, created_at, updated_at, last_login
+                FROM users
+                WHERE id = ? AND is_active = 1
+            """, (user_id,)).fetchone()
         
         if user_data:
             return {
@@ -58,19 +63,18 @@ def require_auth(f):
     def decorated_function(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            current_user = get_user_by_id_direct(current_user_id)
+            current_user = get_current_principal()
             
             if not current_user or not current_user['is_active']:
                 return jsonify({'error': 'Usuario no válido o inactivo'}), 401
             
             # Agregar usuario actual al contexto de la request
             request.current_user = current_user
-            
-            return f(*args, **kwargs)
         except Exception as e:
             current_app.logger.warning(f"Autenticación fallida: {str(e)}")
             return jsonify({'error': 'Token de autenticación requerido'}), 401
+
+        return f(*args, **kwargs)
     
     return decorated_function
 
@@ -81,8 +85,7 @@ def require_permission(permission):
         def decorated_function(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                current_user = get_user_by_id_direct(current_user_id)
+                current_user = get_current_principal()
                 
                 if not current_user or not current_user['is_active']:
                     return jsonify({'error': 'Usuario no válido o inactivo'}), 401
@@ -90,18 +93,7 @@ def require_permission(permission):
                 # Usar el sistema centralizado de permisos
                 user_role = current_user['role']
                 
-                # Mapear permisos antiguos a nuevos
-                permission_mapping = {
-                    'admin': Permission.MANAGE_SYSTEM,
-                    'manager': Permission.MANAGE_PRODUCTS,
-                    'supervisor': Permission.MANAGE_ORDERS,
-                    'user': Permission.CREATE_ORDERS,
-                    'viewer': Permission.READ_ONLY,
-                    'write': Permission.CREATE,
-                    'delete': Permission.DELETE
-                }
-                
-                required_permission = permission_mapping.get(permission, Permission.READ)
+                required_permission = _LEGACY_PERMISSION_MAPPING.get(permission, Permission.READ)
                 
                 if not PermissionManager.has_permission(user_role, required_permission):
                     return jsonify({
@@ -111,10 +103,11 @@ def require_permission(permission):
                     }), 403
                 
                 request.current_user = current_user
-                return f(*args, **kwargs)
             except Exception as e:
                 current_app.logger.warning(f"Verificación de permisos fallida: {str(e)}")
                 return jsonify({'error': 'Autenticación requerida'}), 401
+
+            return f(*args, **kwargs)
         return decorated_function
     return decorator
 
@@ -125,8 +118,7 @@ def require_role(role):
         def decorated_function(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                current_user = get_user_by_id_direct(current_user_id)
+                current_user = get_current_principal()
                 
                 if not current_user or not current_user['is_active']:
                     return jsonify({'error': 'Usuario no válido o inactivo'}), 401
@@ -135,10 +127,11 @@ def require_role(role):
                     return jsonify({'error': 'Rol requerido no autorizado'}), 403
                 
                 request.current_user = current_user
-                return f(*args, **kwargs)
             except Exception as e:
                 current_app.logger.warning(f"Verificación de rol fallida: {str(e)}")
                 return jsonify({'error': 'Autenticación requerida'}), 401
+
+            return f(*args, **kwargs)
         return decorated_function
     return decorator
 
@@ -198,8 +191,7 @@ def require_auth_smart(f):
     def decorated_function(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            current_user = get_user_by_id_direct(current_user_id)
+            current_user = get_current_principal()
             
             if not current_user or not current_user['is_active']:
                 return jsonify({'error': 'Usuario no válido o inactivo'}), 401
@@ -217,10 +209,10 @@ def require_auth_smart(f):
             
             # Agregar usuario actual al contexto de la request
             request.current_user = current_user
-            
-            return f(*args, **kwargs)
         except Exception as e:
             current_app.logger.warning(f"Autenticación inteligente fallida: {str(e)}")
             return jsonify({'error': 'Token de autenticación requerido'}), 401
+
+        return f(*args, **kwargs)
     
     return decorated_function
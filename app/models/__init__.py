@@ -6,6 +6,10 @@ from .order import Order
 from .order_item import OrderItem
 from .purchase_order import PurchaseOrder, PurchaseOrderItem
 from .user import User
+from .auth_invalidation import AuthInvalidation
+from .revoked_token import RevokedToken
+from .table_version import TableVersion
+from .stock_movement import StockMovement, StockMovementReason, StockSnapshot
 
 __all__ = [
     'Category',
@@ -15,7 +19,13 @@ __all__ = [
     'OrderItem',
     'PurchaseOrder',
     'PurchaseOrderItem',
-    'User'
+    'User',
+    'AuthInvalidation',
+    'RevokedToken',
+    'TableVersion',
+    'StockMovement',
+    'StockMovementReason',
+    'StockSnapshot'
 ]
 
 
@@ -0,0 +1,16 @@
+from ..database import db
+
+class AuthInvalidation(db.Model):
+    """Última invalidación de identidad publicada por usuario (rol o estado cambiado)"""
+    __tablename__ = 'auth_invalidations'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, index=True)
+    invalidated_at = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # epoch (segundos)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'version': self.version,
+            'invalidated_at': self.invalidated_at
+        }
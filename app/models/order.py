@@ -9,7 +9,8 @@ class Order(db.Model):
     customer_email = db.Column(db.String(120), nullable=False)
     customer_phone = db.Column(db.String(20), nullable=False)
     total = db.Column(db.Numeric(10, 2), default=0)
-    status = db.Column(db.String(20), default='pending')
+    # active_history: el estado anterior define qué reservas de stock se liberan
+    status = db.column_property(db.Column(db.String(20), default='pending'), active_history=True)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
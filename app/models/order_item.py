@@ -6,7 +6,7 @@ class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
-    quantity = db.Column(db.Integer, nullable=False)
+    quantity = db.column_property(db.Column(db.Integer, nullable=False), active_history=True)
 
     order = db.relationship('Order', back_populates='items')
     product = db.relationship('Product')
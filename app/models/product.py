@@ -3,6 +3,12 @@ from datetime import datetime, timezone
 
 class Product(db.Model):
     __tablename__ = "products"
+    # Índices (clave de orden, id) para la paginación keyset
+    __table_args__ = (
+        db.Index("ix_products_name_id", "name", "id"),
+        db.Index("ix_products_price_id", "price", "id"),
+        db.Index("ix_products_category_id_id", "category_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -0,0 +1,22 @@
+from ..database import db
+
+class RevokedToken(db.Model):
+    """Token JWT revocado (logout) hasta su expiración natural"""
+    __tablename__ = 'revoked_tokens'
+    # AUTOINCREMENT: los ids nunca se reutilizan tras podar filas vencidas
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)  # secuencia para sincronizar workers
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, nullable=True, index=True)
+    expires_at = db.Column(db.Integer, nullable=False, index=True)  # epoch (segundos)
+    revoked_at = db.Column(db.Integer, nullable=False)  # epoch (segundos)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'jti': self.jti,
+            'user_id': self.user_id,
+            'expires_at': self.expires_at,
+            'revoked_at': self.revoked_at
+        }
@@ -1,19 +1,44 @@
+from sqlalchemy import text
 from ..database import db
 
 class Stock(db.Model):
     __tablename__ = "stocks"
+    # Índice (clave de orden, id) para la paginación keyset
+    __table_args__ = (
+        db.Index("ix_stocks_quantity_id", "quantity", "id"),
+        # Join por producto y filtros de búsqueda "con stock" / "stock bajo" (índices parciales)
+        db.Index("ix_stocks_product_id", "product_id"),
+        db.Index(
+            "ix_stocks_in_stock_product_id", "product_id",
+            sqlite_where=text("quantity > 0"), postgresql_where=text("quantity > 0"),
+        ),
+        db.Index(
+            "ix_stocks_low_stock_product_id", "product_id",
+            sqlite_where=text("quantity <= min_stock"), postgresql_where=text("quantity <= min_stock"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
-    quantity = db.Column(db.Integer, nullable=False)
+    # active_history: el valor anterior siempre está disponible para el delta del libro mayor
+    quantity = db.column_property(db.Column(db.Integer, nullable=False), active_history=True)
     min_stock = db.Column(db.Integer, nullable=False)
+    # Unidades comprometidas en órdenes pendientes (mantenido en core/stock_reservations.py)
+    reserved_quantity = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     product = db.relationship("Product", back_populates="stock")
 
+    @property
+    def available_quantity(self):
+        """Stock que se puede comprometer en nuevas órdenes"""
+        return self.quantity - (self.reserved_quantity or 0)
+
     def to_dict(self):
         return {
             'id': self.id,
             'product_id': self.product_id,
             'quantity': self.quantity,
-            'min_stock': self.min_stock
+            'min_stock': self.min_stock,
+            'reserved_quantity': self.reserved_quantity,
+            'available_quantity': self.available_quantity
         }
\ No newline at end of file
@@ -0,0 +1,90 @@
+from ..database import db
+
+# Tipo de movimiento -> código entero (columna kind)
+MOVEMENT_KINDS = {
+    'initial': 1,      # alta de stock / saldo de apertura
+    'adjustment': 2,   # ajuste manual (+/-) con motivo
+    'sale': 3,         # orden de venta completada
+    'purchase': 4,     # recepción de orden de compra
+    'correction': 5,   # cantidad fijada directamente (PUT)
+    'removal': 6,      # registro de stock eliminado
+}
+MOVEMENT_KIND_NAMES = {code: name for name, code in MOVEMENT_KINDS.items()}
+
+
+class StockMovementReason(db.Model):
+    """Motivo de ajuste normalizado: cada texto se guarda una sola vez"""
+    __tablename__ = 'stock_movement_reasons'
+
+    id = db.Column(db.Integer, primary_key=True)
+    label = db.Column(db.String(200), nullable=False, unique=True)
+
+
+class StockMovement(db.Model):
+    """
+    Movimiento de stock (libro mayor append-only): se escribe en la misma
+    transacción que el saldo materializado en stocks.quantity y nunca se
+    modifica ni se borra. product_id no tiene clave foránea para que la
+    historia sobreviva al producto.
+    """
+    __tablename__ = 'stock_movements'
+    __table_args__ = (
+        # Historia de un producto en orden (reconstrucción desde una instantánea)
+        db.Index('ix_stock_movements_product_id_id', 'product_id', 'id'),
+        # Resúmenes por período (conciliación de mermas)
+        db.Index('ix_stock_movements_occurred_at', 'occurred_at'),
+        # AUTOINCREMENT: los ids nunca se reutilizan (límite de las instantáneas)
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.SmallInteger, nullable=False)  # MOVEMENT_KINDS
+    reason_id = db.Column(db.Integer, db.ForeignKey('stock_movement_reasons.id'))
+    reference_id = db.Column(db.Integer)  # orden de venta / de compra según kind
+    occurred_at = db.Column(db.Integer, nullable=False)  # epoch (segundos)
+
+    reason = db.relationship('StockMovementReason', lazy='joined')
+
+    @property
+    def kind_name(self):
+        return MOVEMENT_KIND_NAMES.get(self.kind)
+
+    @property
+    def reason_label(self):
+        return self.reason.label if self.reason else None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'delta': self.delta,
+            'kind': self.kind_name,
+            'reason': self.reason_label,
+            'reference_id': self.reference_id,
+            'occurred_at': self.occurred_at
+        }
+
+
+class StockSnapshot(db.Model):
+    """Saldo de un producto tras el movimiento movement_id (punto de partida para reconstruir)"""
+    __tablename__ = 'stock_snapshots'
+    __table_args__ = (
+        db.Index('ix_stock_snapshots_product_id_movement_id', 'product_id', 'movement_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, nullable=False)
+    movement_id = db.Column(db.Integer, nullable=False)  # último movimiento incluido
+    quantity = db.Column(db.Integer, nullable=False)
+    taken_at = db.Column(db.Integer, nullable=False)  # epoch (segundos)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_id': self.product_id,
+            'movement_id': self.movement_id,
+            'quantity': self.quantity,
+            'taken_at': self.taken_at
+        }
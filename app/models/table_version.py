@@ -0,0 +1,14 @@
+from ..database import db
+
+class TableVersion(db.Model):
+    """Versión de cambios por tabla, incrementada en la misma transacción que cada escritura"""
+    __tablename__ = 'table_versions'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'version': self.version
+        }
@@ -6,7 +6,7 @@ Incluye autenticación, roles y permisos
 
 from datetime import datetime, timedelta
 from ..database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..core.password_hashing import hash_password, verify_password
 import jwt
 import os
 from flask import current_app
@@ -69,7 +69,7 @@ class User(db.Model):
     def __init__(self, username, email, password, first_name, last_name, role='user'):
         self.username = username
         self.email = email
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
         self.first_name = first_name
         self.last_name = last_name
         self.role = role
@@ -79,11 +79,11 @@ class User(db.Model):
     
     def check_password(self, password):
         """Verifica la contraseña"""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def set_password(self, password):
         """Establece una nueva contraseña"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
         self.updated_at = datetime.utcnow()
     
     def has_permission(self, permission):
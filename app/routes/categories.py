@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from ..models.category import Category
 from ..models.product import Product
 from ..database import db
+from ..core.aggregates import group_counts
 from ..decorators.role_decorators import roles_required
 
 categories_bp = Blueprint('categories', __name__)
@@ -12,11 +13,11 @@ def get_categories():
     categories = Category.query.order_by(Category.id.asc()).all()
     categories_with_count = []
     
+    # Productos por categoría en un único GROUP BY (no un COUNT por categoría)
+    product_counts = group_counts(Product.query, Product.category_id)
     for category in categories:
         category_data = category.to_dict()
-        # Contar productos en esta categoría
-        product_count = Product.query.filter_by(category_id=category.id).count()
-        category_data['product_count'] = product_count
+        category_data['product_count'] = product_counts.get(category.id, 0)
         categories_with_count.append(category_data)
     
     return jsonify(categories_with_count)
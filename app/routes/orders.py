@@ -3,6 +3,7 @@ from ..models.order import Order
 from ..models.order_item import OrderItem
 from ..models.stock import Stock
 from ..database import db
+from ..core.loader_options import with_loaders
 from ..validators.business_rules import (
     OrderValidator, 
     TransactionManager, 
@@ -13,12 +14,12 @@ orders_bp = Blueprint('orders', __name__)
 
 @orders_bp.route('/', methods=['GET'])
 def get_orders():
-    orders = Order.query.order_by(Order.id.asc()).all()
+    orders = with_loaders(Order.query, "orders").order_by(Order.id.asc()).all()
     return jsonify([order.to_dict() for order in orders])
 
 @orders_bp.route('/<int:id>', methods=['GET'])
 def get_order(id):
-    order = Order.query.get_or_404(id)
+    order = with_loaders(Order.query, "orders").get_or_404(id)
     return jsonify(order.to_dict())
 
 @orders_bp.route('/', methods=['POST'])
@@ -167,7 +168,7 @@ def add_item_to_order(id):
         
         # Validar disponibilidad de stock
         stock = Stock.query.filter_by(product_id=product_id).first()
-        if not stock or stock.quantity < quantity:
+        if not stock or stock.available_quantity < quantity:
             return jsonify({'error': 'Stock insuficiente'}), 400
         
         # Agregar item
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from ..models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from ..models.stock import Stock
 from ..database import db
+from ..core.loader_options import with_loaders
+from ..core.stock_ledger import describe_movements
 from ..decorators.role_decorators import roles_required
 
 purchases_bp = Blueprint('purchases', __name__)
@@ -9,13 +11,13 @@ purchases_bp = Blueprint('purchases', __name__)
 @purchases_bp.route('/', methods=['GET'])
 @roles_required('admin', 'manager', 'supervisor')
 def get_purchases():
-    purchases = PurchaseOrder.query.order_by(PurchaseOrder.id.asc()).all()
+    purchases = with_loaders(PurchaseOrder.query, "purchases").order_by(PurchaseOrder.id.asc()).all()
     return jsonify([purchase.to_dict() for purchase in purchases])
 
 @purchases_bp.route('/<int:id>', methods=['GET'])
 @roles_required('admin', 'manager', 'supervisor')
 def get_purchase(id):
-    purchase = PurchaseOrder.query.get_or_404(id)
+    purchase = with_loaders(PurchaseOrder.query, "purchases").get_or_404(id)
     return jsonify(purchase.to_dict())
 
 @purchases_bp.route('/', methods=['POST'])
@@ -75,6 +77,7 @@ def complete_purchase_order(id):
         return jsonify({'error':'Order is not pending'}), 400
     
     purchase.status = 'completed'
+    describe_movements(db.session, 'purchase', reference_id=purchase.id)
 
     # Actualizar el stock para todos los items de la orden
     for item in purchase.items:
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from ..models.stock import Stock
 from ..models.product import Product
 from ..database import db
+from ..core.stock_operations import InsufficientStock, apply_movements
 from ..validators.business_rules import (
     StockValidator, 
     TransactionManager, 
@@ -103,16 +104,8 @@ def delete_stock(product_id):
     try:
         stock = Stock.query.filter_by(product_id=product_id).first_or_404()
         
-        # Verificar que no hay órdenes pendientes para este producto
-        from ..models.order_item import OrderItem
-        from ..models.order import Order
-        
-        pending_orders = db.session.query(Order).join(OrderItem).filter(
-            OrderItem.product_id == product_id,
-            Order.status == 'pending'
-        ).all()
-        
-        if pending_orders:
+        # Verificar que no hay órdenes pendientes para este producto (stock reservado)
+        if stock.reserved_quantity > 0:
             return jsonify({
                 'error': f'No se puede eliminar stock del producto {product_id} porque tiene órdenes pendientes'
             }), 400
@@ -161,25 +154,27 @@ def adjust_stock(product_id):
         
         stock = Stock.query.filter_by(product_id=product_id).first_or_404()
         
-        # Calcular nueva cantidad
-        new_quantity = stock.quantity + adjustment
-        
-        # Validar que no resulte en stock negativo
-        if new_quantity < 0:
+        # Suma atómica (sin stock negativo) y movimiento con su motivo en la misma transacción
+        try:
+            apply_movements(db.session, {product_id: adjustment}, 'adjustment', reason=reason)
+            db.session.commit()
+        except InsufficientStock as e:
+            db.session.rollback()
+            _, requested, available = e.shortages[0]
             return jsonify({
-                'error': f'Ajuste resultaría en stock negativo: {stock.quantity} + {adjustment} = {new_quantity}'
+                'error': f'Ajuste resultaría en stock negativo: {available} + {adjustment} = {available - requested}'
             }), 400
         
-        # Usar el gestor de transacciones para el ajuste
-        result = TransactionManager.execute_stock_update(
-            product_id=product_id,
-            new_quantity=new_quantity
-        )
-        
-        # Agregar información del ajuste
-        result['adjustment'] = adjustment
-        result['reason'] = reason
-        result['old_quantity'] = stock.quantity
+        # El commit expira `stock`: se relee con el saldo confirmado
+        result = {
+            'success': True,
+            'message': f'Stock actualizado para producto {product_id}',
+            'old_quantity': stock.quantity - adjustment,
+            'new_quantity': stock.quantity,
+            'stock': stock.to_dict(),
+            'adjustment': adjustment,
+            'reason': reason
+        }
         
         return jsonify(result)
 
@@ -2,7 +2,8 @@ from flask import Blueprint, request, jsonify
 from ..models.user import User
 from ..database import db
 from ..decorators.role_decorators import roles_required
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..core.principal_cache import invalidate_principal
+from ..core.password_hashing import hash_password
 
 users_bp = Blueprint('users', __name__)
 
@@ -42,7 +43,7 @@ def create_user():
     # Crear usuario
     new_user = User(
         username=data['username'],
-        password_hash=generate_password_hash(data['password']),
+        password_hash=hash_password(data['password']),
         first_name=data.get('first_name', ''),
         last_name=data.get('last_name', ''),
         email=data.get('email', ''),
@@ -88,8 +89,11 @@ def update_user(id):
     if 'is_active' in data:
         user.is_active = data['is_active']
     
+    if 'role' in data or 'is_active' in data:
+        invalidate_principal(user.id)
+    
     if 'password' in data and data['password']:
-        user.password_hash = generate_password_hash(data['password'])
+        user.password_hash = hash_password(data['password'])
     
     db.session.commit()
     return jsonify(user.to_dict())
@@ -110,6 +114,7 @@ def delete_user(id):
         if admin_count <= 1:
             return jsonify({'error': 'No se puede eliminar el último administrador'}), 400
     
+    invalidate_principal(user.id)
     db.session.delete(user)
     db.session.commit()
     
@@ -132,6 +137,7 @@ def toggle_user_status(id):
             return jsonify({'error': 'No se puede desactivar el último administrador'}), 400
     
     user.is_active = not user.is_active
+    invalidate_principal(user.id)
     db.session.commit()
     
     return jsonify({
@@ -166,7 +172,7 @@ def update_profile():
         user.email = data['email']
     
     if 'password' in data and data['password']:
-        user.password_hash = generate_password_hash(data['password'])
+        user.password_hash = hash_password(data['password'])
     
     db.session.commit()
     return jsonify(user.to_dict())
@@ -4,6 +4,7 @@ Esquemas de Marshmallow para Categorías
 """
 
 from marshmallow import Schema, fields, validate
+from .pagination import PaginatedListSchema
 
 class CategorySchema(Schema):
     """Esquema completo para Categoría"""
@@ -51,13 +52,12 @@ class CategoryUpdateSchema(Schema):
         
     )
 
-class CategoryListSchema(Schema):
+class CategoryListSchema(PaginatedListSchema):
     """Esquema para respuesta de lista de categorías"""
     categories = fields.Nested(
         CategorySchema, 
         many=True
     )
-    total = fields.Int()
 
 class CategorySearchSchema(Schema):
     """Esquema para búsqueda de categorías"""
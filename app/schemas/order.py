@@ -5,6 +5,7 @@ Esquemas de Marshmallow para Órdenes
 
 from marshmallow import Schema, fields, validate, validates
 from app.validators.order_validators import validate_order_items, validate_order_stock_availability
+from .pagination import PaginatedListSchema
 
 class OrderItemSchema(Schema):
     """Esquema para items de orden"""
@@ -132,13 +133,12 @@ class OrderUpdateSchema(Schema):
     )
     notes = fields.Str()
 
-class OrderListSchema(Schema):
+class OrderListSchema(PaginatedListSchema):
     """Esquema para respuesta de lista de órdenes"""
     orders = fields.Nested(
         OrderSchema, 
         many=True
     )
-    total = fields.Int()
     pending_count = fields.Int()
     completed_count = fields.Int()
     cancelled_count = fields.Int()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Esquemas de Marshmallow para Paginación
+Keyset (cursor opaco sobre la clave de orden + id) y offset por compatibilidad
+"""
+
+from marshmallow import Schema, fields, validate
+from app.core.fast_serializer import FastDumpSchema
+
+class FieldsQuerySchema(Schema):
+    """Selección parcial de campos: ?fields=id,name,product.name"""
+    sparse_fields = fields.Str(
+        data_key='fields'
+    )
+
+class PaginationQuerySchema(FieldsQuerySchema):
+    """Parámetros de paginación en query string"""
+    limit = fields.Int(
+        validate=validate.Range(min=1)
+    )
+    cursor = fields.Str()
+    sort = fields.Str()
+    order = fields.Str(
+        validate=validate.OneOf(['asc', 'desc'])
+    )
+    # Paginación por offset (compatibilidad)
+    page = fields.Int(
+        validate=validate.Range(min=1)
+    )
+    per_page = fields.Int(
+        validate=validate.Range(min=1)
+    )
+
+class PaginatedListSchema(FastDumpSchema):
+    """Metadatos comunes de las respuestas paginadas (dump compilado para listas grandes)"""
+    total = fields.Int()
+    limit = fields.Int(allow_none=True)
+    next_cursor = fields.Str(allow_none=True)
+    has_more = fields.Bool()
+    page = fields.Int()
+    per_page = fields.Int()
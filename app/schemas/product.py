@@ -4,6 +4,7 @@ Esquemas de Marshmallow para Productos
 """
 
 from marshmallow import Schema, fields, validate
+from .pagination import PaginationQuerySchema, PaginatedListSchema
 
 class ProductSchema(Schema):
     """Esquema completo para Producto"""
@@ -110,24 +111,41 @@ class ProductUpdateSchema(Schema):
         
     )
 
-class ProductListSchema(Schema):
+class CategoryFacetSchema(Schema):
+    """Cantidad de productos encontrados por categoría"""
+    id = fields.Int()
+    name = fields.Str()
+    count = fields.Int()
+
+class PriceFacetSchema(Schema):
+    """Cantidad de productos encontrados por rango de precio [min, max)"""
+    min = fields.Float()
+    max = fields.Float(allow_none=True)
+    count = fields.Int()
+
+class StockFacetSchema(Schema):
+    """Cantidad de productos encontrados con y sin stock disponible"""
+    value = fields.Bool()
+    count = fields.Int()
+
+class ProductFacetsSchema(Schema):
+    """Contadores por faceta sobre el resultado completo de la búsqueda"""
+    category = fields.Nested(CategoryFacetSchema, many=True)
+    price = fields.Nested(PriceFacetSchema, many=True)
+    in_stock = fields.Nested(StockFacetSchema, many=True)
+
+class ProductListSchema(PaginatedListSchema):
     """Esquema para respuesta de lista de productos"""
     products = fields.Nested(
         ProductSchema, 
         many=True, 
         
     )
-    total = fields.Int(
-        
-    )
-    page = fields.Int(
-        
-    )
-    per_page = fields.Int(
-        
+    facets = fields.Nested(
+        ProductFacetsSchema
     )
 
-class ProductSearchSchema(Schema):
+class ProductSearchSchema(PaginationQuerySchema):
     """Esquema para búsqueda de productos"""
     name = fields.Str(
         
@@ -153,3 +171,34 @@ class ProductSearchSchema(Schema):
         
         
     )
+    # Solo productos con stock en el mínimo o por debajo
+    low_stock = fields.Bool()
+    # Contadores por categoría, rango de precio y stock (?facets=true)
+    facets = fields.Bool(
+        load_default=False
+    )
+
+class ProductSuggestQuerySchema(Schema):
+    """Parámetros de sugerencias de productos (autocompletado)"""
+    q = fields.Str(
+        required=True,
+        validate=validate.Length(min=1, max=100)
+    )
+    limit = fields.Int(
+        load_default=10,
+        validate=validate.Range(min=1, max=50)
+    )
+
+class ProductSuggestionSchema(Schema):
+    """Producto sugerido con su puntaje de similitud"""
+    id = fields.Int()
+    name = fields.Str()
+    score = fields.Float()
+
+class ProductSuggestionListSchema(Schema):
+    """Respuesta de sugerencias de productos"""
+    q = fields.Str()
+    suggestions = fields.Nested(
+        ProductSuggestionSchema,
+        many=True
+    )
@@ -5,6 +5,7 @@ Esquemas de Marshmallow para Órdenes de Compra
 
 from marshmallow import Schema, fields, validate, validates, ValidationError
 from app.validators.purchase_order_validators import validate_purchase_order_items
+from .pagination import PaginatedListSchema
 
 class PurchaseOrderItemSchema(Schema):
     """Esquema para Item de Orden de Compra"""
@@ -54,10 +55,9 @@ class PurchaseOrderUpdateSchema(Schema):
     status = fields.Str(validate=validate.OneOf(['pending', 'completed', 'cancelled']), 
                        )
 
-class PurchaseOrderListSchema(Schema):
+class PurchaseOrderListSchema(PaginatedListSchema):
     """Esquema para lista de órdenes de compra"""
     purchase_orders = fields.Nested(PurchaseOrderSchema, many=True, 
                                   )
-    total = fields.Int()
     pending_count = fields.Int()
     completed_count = fields.Int()
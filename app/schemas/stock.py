@@ -5,6 +5,8 @@ Esquemas de Marshmallow para Stock
 
 from marshmallow import Schema, fields, validate, validates, ValidationError
 from app.validators.stock_validators import validate_stock_quantity, validate_stock_min_quantity
+from app.models.stock_movement import MOVEMENT_KINDS
+from .pagination import PaginatedListSchema
 
 class StockSchema(Schema):
     """Esquema completo para Stock"""
@@ -27,6 +29,13 @@ class StockSchema(Schema):
         validate=validate.Range(min=0), 
         
         
+    )
+    # Comprometido en órdenes pendientes y disponible (quantity - reserved_quantity)
+    reserved_quantity = fields.Int(
+        dump_only=True
+    )
+    available_quantity = fields.Int(
+        dump_only=True
     )
     created_at = fields.DateTime(
         dump_only=True, 
@@ -104,15 +113,12 @@ class StockUpdateSchema(Schema):
             return validate_stock_min_quantity(value)
         return value
 
-class StockListSchema(Schema):
+class StockListSchema(PaginatedListSchema):
     """Esquema para respuesta de lista de stock"""
     stock_items = fields.Nested(
         StockSchema, 
         many=True, 
         
-    )
-    total = fields.Int(
-        
     )
     low_stock_count = fields.Int(
         
@@ -172,3 +178,64 @@ class StockAdjustmentSchema(Schema):
         
         
     )
+
+class StockMovementSchema(Schema):
+    """Movimiento del libro mayor de stock"""
+    id = fields.Int(dump_only=True)
+    product_id = fields.Int(dump_only=True)
+    delta = fields.Int(dump_only=True)
+    kind = fields.Str(attribute='kind_name', dump_only=True)
+    reason = fields.Str(attribute='reason_label', dump_only=True, allow_none=True)
+    reference_id = fields.Int(dump_only=True, allow_none=True)
+    occurred_at = fields.Int(dump_only=True)  # epoch (segundos)
+
+class StockMovementListSchema(PaginatedListSchema):
+    """Historia de movimientos de un producto (paginada por cursor)"""
+    movements = fields.Nested(StockMovementSchema, many=True)
+
+class StockBalanceQuerySchema(Schema):
+    """Instante para reconstruir el saldo (por defecto, ahora)"""
+    at = fields.DateTime()
+
+class StockBalanceSchema(Schema):
+    """Saldo reconstruido desde la última instantánea y los movimientos posteriores"""
+    product_id = fields.Int()
+    at = fields.Int()
+    quantity = fields.Int()
+    snapshot_id = fields.Int(allow_none=True)
+    movements_replayed = fields.Int()
+
+class StockAuditQuerySchema(Schema):
+    """Auditoría de todo el stock o de un producto"""
+    product_id = fields.Int()
+
+class StockDiscrepancySchema(Schema):
+    product_id = fields.Int()
+    quantity = fields.Int()
+    ledger_quantity = fields.Int()
+    difference = fields.Int()
+
+class StockAuditSchema(Schema):
+    """Saldos materializados que no coinciden con el libro mayor"""
+    checked = fields.Int()
+    discrepancies = fields.Nested(StockDiscrepancySchema, many=True)
+
+class StockMovementSummaryQuerySchema(Schema):
+    """Período y filtros del resumen de movimientos"""
+    since = fields.DateTime()
+    until = fields.DateTime()
+    kind = fields.Str(validate=validate.OneOf(list(MOVEMENT_KINDS)))
+    product_id = fields.Int()
+
+class StockMovementTotalSchema(Schema):
+    kind = fields.Str()
+    reason = fields.Str(allow_none=True)
+    movements = fields.Int()
+    quantity = fields.Int()
+
+class StockMovementSummarySchema(Schema):
+    """Totales por tipo y motivo (p. ej. conciliación de mermas)"""
+    totals = fields.Nested(StockMovementTotalSchema, many=True)
+
+class StockSnapshotResultSchema(Schema):
+    snapshots = fields.Int()
@@ -4,6 +4,7 @@ Esquemas de Marshmallow para Usuarios
 """
 
 from marshmallow import Schema, fields, validate
+from .pagination import PaginatedListSchema
 
 class UserSchema(Schema):
     """Esquema completo para Usuario"""
@@ -152,6 +153,10 @@ class UserLoginSchema(Schema):
         
     )
 
+class UserLogoutSchema(Schema):
+    """Esquema para cierre de sesión (el refresh token es opcional)"""
+    refresh_token = fields.Str(required=False)
+
 class UserPasswordChangeSchema(Schema):
     """Esquema para cambio de contraseña"""
     current_password = fields.Str(
@@ -171,15 +176,12 @@ class UserPasswordChangeSchema(Schema):
         
     )
 
-class UserListSchema(Schema):
+class UserListSchema(PaginatedListSchema):
     """Esquema para respuesta de lista de usuarios"""
     users = fields.Nested(
         UserSchema, 
         many=True, 
         
-    )
-    total = fields.Int(
-        
     )
     active_count = fields.Int(
         
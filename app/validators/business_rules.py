@@ -10,6 +10,7 @@ from ..models.stock import Stock
 from ..models.order import Order
 from ..models.order_item import OrderItem
 from ..models.product import Product
+from ..core.stock_operations import StockOperationError, complete_order
 
 
 class BusinessRuleViolation(Exception):
@@ -60,7 +61,7 @@ class StockValidator:
         Verifica disponibilidad de stock para un producto
         
         Returns:
-            Tuple[bool, int]: (disponible, stock_actual)
+            Tuple[bool, int]: (disponible, stock_disponible)
         """
         stock = Stock.query.filter_by(product_id=product_id).first()
         if not stock:
@@ -69,8 +70,9 @@ class StockValidator:
                 "product_id", product_id
             )
         
-        available = stock.quantity >= requested_quantity
-        return available, stock.quantity
+        # Disponible = stock no reservado por órdenes pendientes
+        available = stock.available_quantity >= requested_quantity
+        return available, stock.available_quantity
 
 
 class OrderValidator:
@@ -185,45 +187,23 @@ class TransactionManager:
         Returns:
             Dict[str, Any]: Resultado de la operación
         """
-        # Iniciar transacción
-        db.session.begin_nested()
-        
         try:
-            # Validar que se puede completar la orden
-            order, stock_updates = OrderValidator.validate_order_completion(order_id)
-            
-            # Aplicar descuentos de stock
-            for stock, quantity_to_deduct in stock_updates:
-                new_quantity = stock.quantity - quantity_to_deduct
-                
-                # Validar que no resulte en stock negativo
-                if new_quantity < 0:
-                    raise BusinessRuleViolation(
-                        f"Operación resultaría en stock negativo para producto {stock.product_id}"
-                    )
-                
-                stock.quantity = new_quantity
-            
-            # Marcar orden como completada
-            order.status = 'completed'
-            
-            # Commit de la transacción anidada
-            db.session.commit()
-            
-            # Commit de la transacción principal
+            # Estado y descuentos como UPDATE condicionales (sin leer cada stock)
+            deducted = complete_order(db.session, order_id)
             db.session.commit()
+            order = db.session.get(Order, order_id)
             
             return {
                 'success': True,
                 'message': f'Orden {order_id} completada exitosamente',
                 'order': order.to_dict(),
-                'stock_updated': len(stock_updates)
+                'stock_updated': len(deducted)
             }
             
-        except Exception as e:
-            # Rollback de la transacción anidada
+        except StockOperationError as e:
             db.session.rollback()
-            # Rollback de la transacción principal
+            raise BusinessRuleViolation(e.message)
+        except Exception as e:
             db.session.rollback()
             
             # Re-lanzar la excepción
@@ -41,40 +41,25 @@ def validate_order_stock_availability(items, order_id=None):
     """Validar disponibilidad de stock para todos los items de la orden"""
     stock_issues = []
     
+    # Reservas actuales de la orden editada por producto (ya cuentan como comprometidas)
+    reserved_by_order = {}
+    if order_id:
+        current_order = Order.query.get(order_id)
+        if current_order and current_order.status == 'pending':
+            for order_item in current_order.items:
+                reserved_by_order[order_item.product_id] = (
+                    reserved_by_order.get(order_item.product_id, 0) + order_item.quantity
+                )
+    
     for item in items:
         product_id = item['product_id']
         quantity = item['quantity']
         
         try:
-            # Verificar stock disponible
-            stock = validate_product_stock_availability(product_id, quantity)
-            
-            # Si es una actualización, considerar stock ya reservado por esta orden
-            if order_id:
-                current_order = Order.query.get(order_id)
-                if current_order:
-                    # Calcular stock ya reservado por esta orden (excluyendo el item actual)
-                    reserved_by_order = sum(
-                        oi.quantity for oi in current_order.items 
-                        if oi.product_id == product_id and oi.id != item.get('id')
-                    )
-                    available_stock = stock.quantity + reserved_by_order
-                    
-                    if available_stock < quantity:
-                        stock_issues.append(
-                            f"Producto {product_id}: stock insuficiente. "
-                            f"Disponible: {available_stock}, Solicitado: {quantity}"
-                        )
-            else:
-                # Nueva orden: verificar stock disponible
-                if stock.quantity < quantity:
-                    stock_issues.append(
-                        f"Producto {product_id}: stock insuficiente. "
-                        f"Disponible: {stock.quantity}, Solicitado: {quantity}"
-                    )
-                    
+            # Stock no reservado por otras órdenes pendientes
+            validate_product_stock_availability(product_id, quantity, reserved_by_order.get(product_id, 0))
         except ValidationError as e:
-            stock_issues.append(str(e))
+            stock_issues.append(f"Producto {product_id}: {str(e)}")
     
     if stock_issues:
         raise ValidationError("Problemas de stock: " + "; ".join(stock_issues))
@@ -93,10 +78,10 @@ def validate_order_completion(order_id):
     if not order.items or len(order.items) == 0:
         raise ValidationError("No se puede completar una orden sin productos")
     
-    # Verificar stock disponible para completar
+    # Verificar stock disponible para completar (la orden ya tiene reservados sus items)
     for item in order.items:
         try:
-            validate_product_stock_availability(item.product_id, item.quantity)
+            validate_product_stock_availability(item.product_id, item.quantity, item.quantity)
         except ValidationError as e:
             raise ValidationError(f"No se puede completar la orden: {str(e)}")
     
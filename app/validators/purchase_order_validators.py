@@ -8,6 +8,7 @@ from app.database import db
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from app.models.stock import Stock
 from app.models.product import Product
+from app.core.stock_operations import apply_movements
 
 def validate_purchase_order_items(items):
     """Validar items de orden de compra"""
@@ -62,23 +63,27 @@ def update_stock_from_purchase_order(purchase_order_id):
         raise ValidationError("Orden de compra no encontrada")
     
     try:
-        # Iniciar transacción
+        # Cantidad recibida por producto
+        quantities = {}
         for item in purchase_order.items:
-            # Buscar stock existente
-            stock = Stock.query.filter_by(product_id=item.product_id).first()
-            
-            if stock:
-                # Actualizar stock existente
-                stock.quantity += item.quantity
-                stock.updated_at = db.func.now()
-            else:
-                # Crear nuevo stock
-                new_stock = Stock(
-                    product_id=item.product_id,
-                    quantity=item.quantity,
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        
+        # Crear el registro de stock (en cero) de los productos que aún no lo tienen
+        existing = {
+            product_id for (product_id,) in
+            db.session.query(Stock.product_id).filter(Stock.product_id.in_(list(quantities)))
+        }
+        for product_id in quantities:
+            if product_id not in existing:
+                db.session.add(Stock(
+                    product_id=product_id,
+                    quantity=0,
                     min_stock=0  # Valor por defecto
-                )
-                db.session.add(new_stock)
+                ))
+        db.session.flush()
+        
+        # Suma atómica y movimientos de compra en la misma transacción
+        apply_movements(db.session, quantities, 'purchase', reference_id=purchase_order.id)
         
         # Marcar orden como completada
         purchase_order.status = 'completed'
@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 """
-Validadores para Stock con validaciones de no-negativo
+Validadores para Stock con validaciones de no-negativo y de stock reservado
 """
 
 from marshmallow import ValidationError
-from app.database import db
 from app.models.stock import Stock
 from app.models.product import Product
 
@@ -30,41 +29,29 @@ def validate_stock_update(stock_id, new_quantity):
     if not stock:
         raise ValidationError("Stock no encontrado")
     
-    # Verificar si la reducción afectaría órdenes pendientes
-    if new_quantity < stock.quantity:
-        # Buscar órdenes pendientes que usen este producto
-        from app.models.order import Order
-        from app.models.order_item import OrderItem
-        
-        pending_orders = db.session.query(Order).join(OrderItem).filter(
-            OrderItem.product_id == stock.product_id,
-            Order.status == 'pending'
-        ).all()
-        
-        # Calcular stock comprometido en órdenes pendientes
-        committed_stock = sum(
-            item.quantity for order in pending_orders 
-            for item in order.items if item.product_id == stock.product_id
+    # La reducción no puede dejar menos stock que el comprometido en órdenes pendientes
+    if new_quantity < stock.quantity and new_quantity < stock.reserved_quantity:
+        raise ValidationError(
+            f"No se puede reducir el stock a {new_quantity}. "
+            f"Hay {stock.reserved_quantity} unidades comprometidas en órdenes pendientes"
         )
-        
-        if new_quantity < committed_stock:
-            raise ValidationError(
-                f"No se puede reducir el stock a {new_quantity}. "
-                f"Hay {committed_stock} unidades comprometidas en órdenes pendientes"
-            )
     
     return new_quantity
 
-def validate_product_stock_availability(product_id, requested_quantity):
-    """Validar disponibilidad de stock para un producto"""
+def validate_product_stock_availability(product_id, requested_quantity, reserved_by_order=0):
+    """
+    Validar disponibilidad de stock para un producto (stock no reservado por
+    órdenes pendientes, más lo que ya reserva la orden que se está editando)
+    """
     stock = Stock.query.filter_by(product_id=product_id).first()
     
     if not stock:
         raise ValidationError(f"No hay stock disponible para el producto {product_id}")
     
-    if stock.quantity < requested_quantity:
+    available = stock.available_quantity + reserved_by_order
+    if available < requested_quantity:
         raise ValidationError(
-            f"Stock insuficiente. Disponible: {stock.quantity}, "
+            f"Stock insuficiente. Disponible: {available}, "
             f"Solicitado: {requested_quantity}"
         )
     
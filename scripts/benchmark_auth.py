@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del Stack de Autenticación y Autorización
+Mide, de forma aislada, el costo por request de cada combinación de decoradores
+usada en app/api/*.py (más require_auth_smart) sobre una base SQLite generada
+con 10k usuarios: latencia p50/p99, conexiones SQLite abiertas y sentencias
+ejecutadas por request.
+
+Uso: python scripts/benchmark_auth.py [--users 10000] [--requests 2000] [--no-cache]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ROLES = ["admin", "manager", "supervisor", "user", "viewer"]
+
+
+class SQLiteCounters:
+    """
+    Cuenta conexiones sqlite3 abiertas y sentencias ejecutadas, tanto las
+    directas (sqlite3.connect) como las de SQLAlchemy (el dialecto pysqlite
+    conecta con sqlite3.dbapi2.connect). Se instala antes de crear la app.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.statements = 0
+        self._connect = sqlite3.dbapi2.connect
+
+    def install(self):
+        counters = self
+
+        def counting_connect(*args, **kwargs):
+            conn = counters._connect(*args, **kwargs)
+            counters.connections += 1
+            conn.set_trace_callback(counters._on_statement)
+            return conn
+
+        sqlite3.connect = counting_connect
+        sqlite3.dbapi2.connect = counting_connect
+
+    def _on_statement(self, _statement):
+        self.statements += 1
+
+    def snapshot(self):
+        return self.connections, self.statements
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark del stack de autenticación")
+    parser.add_argument("--users", type=int, default=10000, help="usuarios generados")
+    parser.add_argument("--requests", type=int, default=2000, help="requests medidas por escenario")
+    parser.add_argument("--warmup", type=int, default=200, help="requests previas no medidas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="ruta del archivo SQLite (por defecto uno temporal)")
+    parser.add_argument("--no-cache", action="store_true", help="deshabilitar caches de principales y tokens")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """La configuración se lee de os.environ al importar app.config"""
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench_auth_"), "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DEBUG"] = "False"
+    if args.no_cache:
+        os.environ["PRINCIPAL_CACHE_SIZE"] = "0"
+        os.environ["DECODED_TOKEN_CACHE_SIZE"] = "0"
+    return db_path
+
+
+def seed_users(db, total):
+    """Inserta `total` usuarios activos con roles rotativos (un único hash reutilizado)"""
+    from sqlalchemy import text
+    from werkzeug.security import generate_password_hash
+
+    password_hash = generate_password_hash("bench123")
+    now = "2024-01-01 00:00:00"
+    rows = [
+        {
+            "username": f"bench{i:05d}",
+            "email": f"bench{i:05d}@bench.local",
+            "password_hash": password_hash,
+            "first_name": "Bench",
+            "last_name": f"{i:05d}",
+            "role": ROLES[i % len(ROLES)],
+            "created_at": now,
+        }
+        for i in range(total)
+    ]
+    db.session.execute(
+        text(
+            """
+            INSERT INTO users (username, email, password_hash, first_name, last_name,
+                               role, is_active, created_at, updated_at)
+            VALUES (:username, :email, :password_hash, :first_name, :last_name,
+                    :role, 1, :created_at, :created_at)
+            """
+        ),
+        rows,
+    )
+    db.session.commit()
+
+
+def register_scenarios(app):
+    """Un endpoint trivial por combinación de decoradores de app/api/*.py"""
+    from flask import Blueprint, jsonify
+    from flask_jwt_extended import jwt_required
+    from app.decorators.role_decorators import (
+        roles_required,
+        admin_required,
+        manager_or_admin_required,
+        user_or_above_required,
+    )
+    from app.middleware.auth_middleware import require_auth, require_permission, require_auth_smart
+
+    def ok():
+        return jsonify(ok=True)
+
+    scenarios = [
+        ("jwt_required", [jwt_required()]),
+        ("jwt_required + user_or_above_required", [jwt_required(), user_or_above_required]),
+        ("jwt_required + manager_or_admin_required", [jwt_required(), manager_or_admin_required]),
+        ("jwt_required + admin_required", [jwt_required(), admin_required]),
+        ("jwt_required + require_permission('manage_users')", [jwt_required(), require_permission("manage_users")]),
+        ("roles_required('admin')", [roles_required("admin")]),
+        ("roles_required(admin..user)", [roles_required("admin", "manager", "supervisor", "user")]),
+        ("require_auth", [require_auth]),
+        ("require_auth + require_permission('write')", [require_auth, require_permission("write")]),
+        ("require_auth + require_permission('delete')", [require_auth, require_permission("delete")]),
+        ("require_auth_smart (/api/products/)", [require_auth_smart]),
+    ]
+
+    bench_bp = Blueprint("bench_auth", __name__)
+    urls = []
+    for index, (name, decorators) in enumerate(scenarios):
+        view = ok
+        for decorator in reversed(decorators):
+            view = decorator(view)
+        # Bajo /api/products/ para que require_auth_smart aplique su regla de prefijo
+        url = f"/api/products/_bench/{index}"
+        bench_bp.add_url_rule(url, endpoint=f"scenario_{index}", view_func=view)
+        urls.append((name, url))
+    app.register_blueprint(bench_bp)
+    return urls
+
+
+def mint_tokens(app, db, count, rng):
+    """Tokens de acceso como los emite Login.post para usuarios admin (pasan todos los checks)"""
+    from sqlalchemy import text
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        admins = db.session.execute(
+            text("SELECT id, username FROM users WHERE role = 'admin'")
+        ).fetchall()
+        sample = rng.sample(admins, min(count, len(admins)))
+        return [
+            create_access_token(
+                identity=str(user_id),
+                additional_claims={"roles": ["admin"], "username": username},
+            )
+            for user_id, username in sample
+        ]
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(client, url, tokens, counters, args, rng):
+    for _ in range(args.warmup):
+        client.get(url, headers={"Authorization": f"Bearer {rng.choice(tokens)}"})
+
+    latencies = []
+    statuses = {}
+    connections_before, statements_before = counters.snapshot()
+    for _ in range(args.requests):
+        headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    connections_after, statements_after = counters.snapshot()
+
+    latencies.sort()
+    return {
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "connections": (connections_after - connections_before) / args.requests,
+        "statements": (statements_after - statements_before) / args.requests,
+        "statuses": statuses,
+    }
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    db_path = configure_environment(args)
+
+    counters = SQLiteCounters()
+    counters.install()
+
+    from app import create_app
+    from app.database import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        seed_users(db, args.users)
+    urls = register_scenarios(app)
+    tokens = mint_tokens(app, db, args.requests, rng)
+    client = app.test_client()
+
+    print("🔐 BENCHMARK DEL STACK DE AUTENTICACIÓN")
+    print("=" * 50)
+    print(f"Base de datos: {db_path}")
+    print(f"Usuarios: {args.users} | tokens distintos: {len(tokens)} | requests por escenario: {args.requests}")
+    print(f"Caches: {'deshabilitados' if args.no_cache else 'habilitados'}\n")
+
+    header = f"{'Escenario':<52}{'p50 µs':>9}{'p99 µs':>9}{'conn/req':>10}{'sql/req':>9}  status"
+    print(header)
+    print("-" * (len(header) + 6))
+    for name, url in urls:
+        result = run_scenario(client, url, tokens, counters, args, rng)
+        statuses = ",".join(f"{code}x{n}" for code, n in sorted(result["statuses"].items()))
+        print(
+            f"{name:<52}{result['p50_us']:>9.0f}{result['p99_us']:>9.0f}"
+            f"{result['connections']:>10.2f}{result['statements']:>9.2f}  {statuses}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Serialización de Listados Grandes
+Compara el dump actual de marshmallow (campo por campo y objeto por objeto)
+con el serializador compilado de app/core/fast_serializer.py sobre una base
+SQLite generada con 50k productos: objetos ORM y filas Row de Core. Verifica
+que las tres salidas sean idénticas antes de medir.
+
+Uso: python scripts/benchmark_serialization.py [--products 50000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de listados")
+    parser.add_argument("--products", type=int, default=50000, help="productos generados")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5, help="repeticiones por escenario")
+    parser.add_argument("--db", help="ruta del archivo SQLite (por defecto uno temporal)")
+    return parser.parse_args()
+
+
+def seed_catalog(db, products, categories):
+    """Inserta categorías y productos en lote (sin pasar por la sesión ORM)"""
+    from sqlalchemy import insert
+    from app.models import Category, Product
+
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(Category), [{"name": f"Categoría {i}"} for i in range(categories)])
+    db.session.execute(
+        insert(Product),
+        [
+            {
+                "name": f"Producto {i:06d}",
+                "description": f"Descripción del producto {i}",
+                "price": round(1 + (i % 9973) * 0.37, 2),
+                "category_id": 1 + i % categories,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(products)
+        ],
+    )
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    """Mediana de `repeat` ejecuciones (GC pausado durante cada una para medir solo el dump)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = fn()
+            samples.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return statistics.median(samples), result
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench_serialization_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DEBUG"] = "False"
+
+    from marshmallow import Schema
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+    from app import create_app
+    from app.database import db
+    from app.models import Category, Product
+    from app.schemas.product import ProductListSchema, ProductSchema
+    from app.core.fast_serializer import serialize_rows
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if not db.session.query(Product.id).first():
+            seed_catalog(db, args.products, args.categories)
+
+        products = Product.query.options(joinedload(Product.category)).order_by(Product.id).all()
+        rows = db.session.execute(
+            select(
+                Product.id, Product.name, Product.description, Product.price, Product.category_id,
+                Product.created_at, Product.updated_at, Category.name.label("category_name"),
+            )
+            .join(Category, Product.category_id == Category.id)
+            .order_by(Product.id)
+        ).all()
+        meta = {"total": len(products), "limit": len(products), "next_cursor": None, "has_more": False}
+
+        list_schema = ProductListSchema()
+        item_schema = ProductSchema()
+
+        def marshmallow_dump():
+            # Ruta anterior: Schema.dump sin el serializador compilado
+            return Schema.dump(list_schema, {"products": products, **meta})
+
+        def compiled_orm_dump():
+            return list_schema.dump({"products": products, **meta})
+
+        def compiled_row_dump():
+            return {"products": serialize_rows(item_schema, rows), **meta}
+
+        print("📦 BENCHMARK DE SERIALIZACIÓN DE LISTADOS")
+        print("=" * 50)
+        print(f"Base de datos: {db_path}")
+        print(f"Productos: {len(products)} | repeticiones: {args.repeat}\n")
+
+        baseline = marshmallow_dump()
+        if compiled_orm_dump() != baseline or compiled_row_dump() != baseline:
+            print("❌ La salida del serializador compilado difiere de marshmallow")
+            sys.exit(1)
+        print("✅ Salidas idénticas (marshmallow, compilado ORM, compilado Row)\n")
+
+        scenarios = [
+            ("marshmallow Schema.dump (actual)", marshmallow_dump),
+            ("compilado sobre objetos ORM", compiled_orm_dump),
+            ("compilado sobre Row de Core", compiled_row_dump),
+        ]
+        header = f"{'Escenario':<36}{'dump ms':>10}{'+JSON ms':>10}{'µs/fila':>9}{'speedup':>9}"
+        print(header)
+        print("-" * len(header))
+        reference = None
+        for name, fn in scenarios:
+            dump_seconds, data = timed(fn, args.repeat)
+            json_seconds, _ = timed(lambda: app.json.dumps(data), args.repeat)
+            reference = reference or dump_seconds
+            print(
+                f"{name:<36}{dump_seconds * 1000:>10.1f}{(dump_seconds + json_seconds) * 1000:>10.1f}"
+                f"{dump_seconds * 1e6 / len(products):>9.2f}{reference / dump_seconds:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Verificación de Consultas por Endpoint (N+1)
+Cuenta las sentencias SQL que emite cada endpoint de listado/detalle y verifica
+que la cantidad se mantenga constante al multiplicar las filas de la base.
+
+Uso: python scripts/check_query_counts.py [--small 5] [--large 40]
+Sale con código 1 si algún endpoint emite más consultas con más filas.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ITEMS_PER_ORDER = 3
+
+# Endpoints verificados (los legacy de app/routes se montan bajo /legacy)
+ENDPOINTS = [
+    "/api/orders/?limit=500",
+    "/api/orders/1",
+    "/api/purchases/?limit=500",
+    "/api/purchases/1",
+    "/api/stock/?limit=500",
+    "/api/products/?limit=500",
+    "/api/products/search?name=P&limit=500",
+    "/legacy/orders/",
+    "/legacy/orders/1",
+    "/legacy/purchases/",
+    "/legacy/categories/",
+]
+
+
+@contextmanager
+def count_statements(engine):
+    """Cuenta las sentencias que SQLAlchemy envía a `engine` dentro del bloque"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def statements_for(app, client, url, headers):
+    """Cantidad de sentencias de una request (tras una request previa que calienta caches)"""
+    from app.database import db
+
+    client.get(url, headers=headers)
+    with app.app_context():
+        engine = db.engine
+    with count_statements(engine) as statements:
+        response = client.get(url, headers=headers)
+    if response.status_code != 200:
+        raise AssertionError(f"{url} respondió {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return len(statements)
+
+
+def assert_constant_statements(app, client, headers, urls, grow):
+    """
+    Mide cada endpoint, llama a `grow()` para agregar filas y vuelve a medir.
+    Devuelve [(url, antes, después)] y lanza AssertionError si alguno creció.
+    """
+    before = {url: statements_for(app, client, url, headers) for url in urls}
+    grow()
+    results = [(url, before[url], statements_for(app, client, url, headers)) for url in urls]
+    grown = [(url, b, a) for url, b, a in results if a > b]
+    if grown:
+        details = ", ".join(f"{url}: {b} -> {a}" for url, b, a in grown)
+        raise AssertionError(f"Consultas que crecen con las filas (N+1): {details}")
+    return results
+
+
+def seed(db, count, start=0):
+    """Agrega `count` productos con stock, órdenes y órdenes de compra con items"""
+    from app.models import Category, Product, Stock, Order, OrderItem, PurchaseOrder, PurchaseOrderItem
+
+    category = Category.query.first()
+    if category is None:
+        category = Category(name="Bench")
+        db.session.add(category)
+        db.session.flush()
+
+    for i in range(start, start + count):
+        product = Product(name=f"P{i:04d}", description="bench", price=10 + i, category_id=category.id)
+        db.session.add(product)
+        db.session.flush()
+        db.session.add(Stock(product_id=product.id, quantity=i % 7, min_stock=3))
+
+        order = Order(customer_name=f"Cliente {i}", customer_email=f"c{i}@bench.local", customer_phone="1")
+        purchase = PurchaseOrder(status="pending")
+        db.session.add_all([order, purchase])
+        db.session.flush()
+        for _ in range(ITEMS_PER_ORDER):
+            db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=1))
+            db.session.add(PurchaseOrderItem(purchase_order_id=purchase.id, product_id=product.id, quantity=1))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica que las consultas por endpoint no crezcan con las filas")
+    parser.add_argument("--small", type=int, default=5)
+    parser.add_argument("--large", type=int, default=40)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="query_counts_"), "check.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DEBUG"] = "False"
+    # Medir las consultas reales, no los aciertos del cache de respuestas
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.database import db
+    from app.models import User
+    from app.routes.orders import orders_bp
+    from app.routes.purchases import purchases_bp
+    from app.routes.categories import categories_bp
+
+    app = create_app()
+    app.register_blueprint(orders_bp, url_prefix="/legacy/orders", name="legacy_orders")
+    app.register_blueprint(purchases_bp, url_prefix="/legacy/purchases", name="legacy_purchases")
+    app.register_blueprint(categories_bp, url_prefix="/legacy/categories", name="legacy_categories")
+
+    with app.app_context():
+        db.create_all()
+        admin = User("admin", "admin@bench.local", "admin123", "Admin", "Bench", "admin")
+        db.session.add(admin)
+        db.session.commit()
+        seed(db, args.small)
+        token = create_access_token(
+            identity=str(admin.id), additional_claims={"roles": ["admin"], "username": "admin"}
+        )
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+
+    def grow():
+        with app.app_context():
+            seed(db, args.large - args.small, start=args.small)
+
+    print("🔎 VERIFICACIÓN DE CONSULTAS POR ENDPOINT")
+    print("=" * 50)
+    print(f"Filas por tabla: {args.small} -> {args.large} ({ITEMS_PER_ORDER} items por orden)\n")
+    try:
+        results = assert_constant_statements(app, client, headers, ENDPOINTS, grow)
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for url, before, after in results:
+        print(f"✅ {url:<45} {before:>3} -> {after:>3} sentencias")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Verificación de Planes de Consulta de la Búsqueda de Productos
+Genera una base SQLite con 1M de productos y su stock, ejecuta
+/api/products/search con los filtros de stock (con stock, stock bajo) y
+combinaciones con categoría, precio, orden y texto, captura las sentencias
+que emite cada request y revisa su EXPLAIN QUERY PLAN: ninguna debe recorrer
+completa la tabla products ni stocks (SCAN sin índice). Un SCAN en el orden
+pedido bajo un LIMIT (sin ordenamiento temporal) se detiene al completar la
+página y no cuenta como recorrido completo.
+
+Uso: python scripts/check_search_plans.py [--products 1000000] [--db ruta.db] [--verbose]
+Sale con código 1 si algún plan hace un recorrido completo.
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SEARCHES = [
+    "/api/products/search?in_stock=true&limit=50",
+    "/api/products/search?low_stock=true&limit=50",
+    "/api/products/search?in_stock=true&category_id=7&limit=50",
+    "/api/products/search?low_stock=true&sort=price&limit=50",
+    "/api/products/search?in_stock=true&min_price=100&max_price=120&limit=50",
+    "/api/products/search?in_stock=true&name=producto%20000123&limit=50",
+]
+
+# Recorrido completo: "SCAN <tabla>" sin índice (los SCAN ... USING [COVERING] INDEX recorren un índice)
+_FULL_SCAN = re.compile(r"\bSCAN (products|stocks)\b(?! USING)")
+
+_CHUNK = 50000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Planes de consulta de la búsqueda de productos")
+    parser.add_argument("--products", type=int, default=1000000, help="productos generados")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--db", help="ruta del archivo SQLite (se reutiliza si ya tiene datos)")
+    parser.add_argument("--verbose", action="store_true", help="mostrar el plan de cada sentencia")
+    return parser.parse_args()
+
+
+def seed_catalog(db, products, categories):
+    """Productos y stock en lote: ~85% con stock, ~5% en el mínimo o por debajo"""
+    from sqlalchemy import insert
+    from app.models import Category, Product, Stock
+
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(Category), [{"name": f"Categoría {i}"} for i in range(categories)])
+    for start in range(0, products, _CHUNK):
+        ids = range(start + 1, min(start + _CHUNK, products) + 1)
+        db.session.execute(
+            insert(Product),
+            [
+                {
+                    "id": i,
+                    "name": f"Producto {i:07d}",
+                    "description": f"Descripción del producto {i}",
+                    "price": round(1 + (i % 9973) * 0.37, 2),
+                    "category_id": 1 + i % categories,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in ids
+            ],
+        )
+        db.session.execute(
+            insert(Stock),
+            [
+                {
+                    "product_id": i,
+                    "quantity": 0 if i % 7 == 0 else (2 if i % 20 == 0 else 50 + i % 100),
+                    "min_stock": 5,
+                }
+                for i in ids
+            ],
+        )
+    db.session.commit()
+
+
+def _stops_at_limit(statement, plan):
+    # Recorrido en el orden del ORDER BY: con LIMIT termina tras `limit` filas que pasan el filtro
+    return bool(plan) and " LIMIT " in statement and not any("TEMP B-TREE" in detail for detail in plan)
+
+
+def explain(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="search_plans_"), "plans.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DEBUG"] = "False"
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from app import create_app
+    from app.database import db
+    from app.models import Product, User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if not db.session.query(Product.id).first():
+            print(f"Generando {args.products} productos en {db_path} ...")
+            started = time.perf_counter()
+            seed_catalog(db, args.products, args.categories)
+            print(f"  listo en {time.perf_counter() - started:.0f}s")
+        admin = User.query.filter_by(username="plans").first()
+        if admin is None:
+            admin = User("plans", "plans@example.com", "plans123", "Plan", "Check", "admin")
+            db.session.add(admin)
+            db.session.commit()
+        token = create_access_token(
+            identity=str(admin.id), additional_claims={"roles": ["admin"], "username": "plans"}
+        )
+        engine = db.engine
+
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print("🔍 PLANES DE CONSULTA DE /api/products/search")
+    print("=" * 50)
+    failures = []
+    for url in SEARCHES:
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            started = time.perf_counter()
+            response = client.get(url, headers=headers)
+            elapsed = time.perf_counter() - started
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        if response.status_code != 200:
+            print(f"❌ {url} respondió {response.status_code}")
+            failures.append(url)
+            continue
+
+        scans, plans = [], []
+        with engine.connect() as connection:
+            for statement, parameters in captured:
+                plan = explain(connection, statement, parameters)
+                plans.append((statement, plan))
+                if _stops_at_limit(statement, plan):
+                    continue
+                scans.extend((statement, detail) for detail in plan if _FULL_SCAN.search(detail))
+        mark = "❌" if scans else "✅"
+        print(f"{mark} {url:<72} {elapsed * 1000:>7.1f} ms  total={response.get_json()['total']}")
+        if args.verbose:
+            for statement, plan in plans:
+                print(f"     {' '.join(statement.split())[:160]}")
+                for detail in plan:
+                    print(f"       {detail}")
+        for statement, detail in scans:
+            print(f"     {detail}  <-  {' '.join(statement.split())[:160]}")
+        if scans:
+            failures.append(url)
+
+    if failures:
+        print(f"\n❌ {len(failures)} búsqueda(s) con recorrido completo de tabla")
+        sys.exit(1)
+    print("\n✅ Todas las búsquedas usan índices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Verificación de Reservas de Stock
+Recorre las escrituras ORM de órdenes (alta, edición y baja de items, items
+quitados de Order.items, cambios de estado, completación y baja de la orden)
+y compara stocks.reserved_quantity tras cada paso con el recálculo desde las
+órdenes pendientes.
+
+Uso: python scripts/check_stock_reservations.py
+Sale con código 1 si algún paso deja el contador desalineado.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def reserved(db):
+    """{product_id: reserved_quantity} leído de la tabla stocks"""
+    from app.models import Stock
+
+    db.session.expire_all()
+    return {stock.product_id: stock.reserved_quantity for stock in Stock.query.order_by(Stock.product_id)}
+
+
+def expected(db):
+    """{product_id: unidades en órdenes pendientes} calculado desde las órdenes"""
+    from sqlalchemy import func
+    from app.models import Stock, Order, OrderItem
+
+    pending = dict(
+        db.session.query(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .join(Order, Order.id == OrderItem.order_id)
+        .filter(Order.status == 'pending')
+        .group_by(OrderItem.product_id)
+        .all()
+    )
+    return {product_id: pending.get(product_id, 0) for (product_id,) in db.session.query(Stock.product_id)}
+
+
+def run_steps(db):
+    """Ejecuta cada escritura y devuelve [(paso, reservado, esperado)]"""
+    from app.models import Category, Product, Stock, Order, OrderItem
+    from app.core.stock_operations import complete_order
+
+    category = Category(name="Reservas")
+    db.session.add(category)
+    db.session.flush()
+    products = []
+    for i in range(3):
+        product = Product(name=f"R{i}", description="reservas", price=1, category_id=category.id)
+        db.session.add(product)
+        db.session.flush()
+        db.session.add(Stock(product_id=product.id, quantity=50, min_stock=1))
+        products.append(product.id)
+    db.session.commit()
+    first, second, third = products
+
+    def new_order(*items, status='pending'):
+        order = Order(customer_name="Cliente", customer_email="c@reservas.local", customer_phone="1", status=status)
+        order.items = [OrderItem(product_id=product_id, quantity=quantity) for product_id, quantity in items]
+        db.session.add(order)
+        db.session.commit()
+        return order
+
+    results = []
+
+    def step(name):
+        results.append((name, reserved(db), expected(db)))
+
+    order = new_order((first, 5), (first, 2), (second, 3))
+    step("alta de orden pendiente con items")
+    new_order((third, 4), status='cancelled')
+    step("alta de orden cancelada")
+
+    order.items[0].quantity = 6
+    db.session.commit()
+    step("edición de cantidad")
+
+    db.session.add(OrderItem(order_id=order.id, product_id=third, quantity=1))
+    db.session.commit()
+    step("item agregado por order_id")
+
+    item = next(item for item in order.items if item.quantity == 2)
+    order.items.remove(item)
+    db.session.commit()
+    step("item quitado de Order.items (delete-orphan)")
+
+    db.session.delete(OrderItem.query.filter_by(order_id=order.id, product_id=third).one())
+    db.session.commit()
+    step("item borrado con session.delete")
+
+    order.items = [OrderItem(product_id=second, quantity=2), OrderItem(product_id=third, quantity=3)]
+    db.session.commit()
+    step("reemplazo de Order.items")
+
+    order.status = 'cancelled'
+    db.session.commit()
+    step("orden cancelada")
+
+    order.status = 'pending'
+    db.session.commit()
+    step("orden reabierta")
+
+    other = new_order((first, 1), (second, 1))
+    other.items.clear()
+    other.status = 'cancelled'
+    db.session.commit()
+    step("items vaciados y estado cambiado en el mismo flush")
+
+    complete_order(db.session, order.id)
+    db.session.commit()
+    step("orden completada")
+
+    last = new_order((first, 2))
+    db.session.delete(last)
+    db.session.commit()
+    step("orden pendiente borrada")
+    return results
+
+
+def main():
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'reservations.db')}"
+    os.environ.setdefault("DEBUG", "False")
+
+    from app import create_app
+    from app.database import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        results = run_steps(db)
+
+    print("🔎 VERIFICACIÓN DE RESERVAS DE STOCK")
+    print("=" * 50)
+    failed = False
+    for name, actual, wanted in results:
+        if actual == wanted:
+            print(f"✅ {name}")
+        else:
+            failed = True
+            print(f"❌ {name}: reservado {actual}, esperado {wanted}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ Uso:
     python manage.py user --help               # Ver ayuda de usuarios
     python manage.py user create-admin         # Crear usuario administrador
     python manage.py user create-sample        # Crear usuarios de muestra
+    python manage.py stock snapshot            # Instantáneas del libro mayor (para cron)
+    python manage.py stock audit               # Conciliar saldos con el libro mayor
+    python manage.py stock reservations        # Recalcular stock reservado por órdenes pendientes
 """
 
 import os
@@ -278,9 +281,10 @@ def upgrade(ctx):
         click.echo("⬆️  Aplicando migraciones...")
         
         try:
-            # Aquí se ejecutaría flask db upgrade
-            click.echo("⚠️  Función de upgrade requiere Flask-Migrate configurado")
-            click.echo("   Ejecuta manualmente: flask db upgrade")
+            # Tablas y columnas agregadas por app/core (la app también lo hace en la primera request)
+            from app.core.schema_upgrades import ensure_schema
+            ensure_schema()
+            click.echo("✅ Esquema actualizado")
             
         except Exception as e:
             click.echo(f"❌ Error al aplicar migraciones: {e}")
@@ -408,6 +412,76 @@ def create_sample(ctx):
             sys.exit(1)
 
 
+@cli.group()
+@click.pass_context
+def stock(ctx):
+    """Libro mayor de movimientos de stock"""
+    if not ctx.obj.get('app'):
+        click.echo("❌ Error: Flask app no disponible")
+        sys.exit(1)
+    pass
+
+
+@stock.command()
+@click.pass_context
+def snapshot(ctx):
+    """Tomar instantáneas de los productos con movimientos nuevos"""
+    from app.core.stock_ledger import take_snapshots
+    app = ctx.obj['app']
+    database = ctx.obj['db']
+    
+    with app.app_context():
+        try:
+            created = take_snapshots(database.session)
+            database.session.commit()
+            click.echo(f"📸 Instantáneas creadas: {created}")
+        except Exception as e:
+            database.session.rollback()
+            click.echo(f"❌ Error al tomar instantáneas: {e}")
+            sys.exit(1)
+
+
+@stock.command()
+@click.option('--product-id', type=int, help='Auditar solo este producto')
+@click.pass_context
+def audit(ctx, product_id):
+    """Comparar saldos materializados con el libro mayor"""
+    from app.core.stock_ledger import audit_balances
+    app = ctx.obj['app']
+    database = ctx.obj['db']
+    
+    with app.app_context():
+        result = audit_balances(database.session, [product_id] if product_id is not None else None)
+        click.echo(f"🔎 Registros de stock revisados: {result['checked']}")
+        for row in result['discrepancies']:
+            click.echo(
+                f"  ⚠️  Producto {row['product_id']}: stock {row['quantity']}, "
+                f"libro mayor {row['ledger_quantity']} (diferencia {row['difference']})"
+            )
+        if result['discrepancies']:
+            sys.exit(1)
+        click.echo("✅ Todos los saldos coinciden con el libro mayor")
+
+
+@stock.command()
+@click.pass_context
+def reservations(ctx):
+    """Recalcular el stock reservado desde las órdenes pendientes (agrega la columna si falta)"""
+    from app.core.stock_reservations import rebuild_reservations
+    app = ctx.obj['app']
+    database = ctx.obj['db']
+    
+    with app.app_context():
+        try:
+            corrected = rebuild_reservations(database.session)
+            database.session.commit()
+            click.echo(f"✅ Reservas recalculadas: {corrected} registro(s) de stock corregido(s)")
+        except Exception as e:
+            database.session.rollback()
+            click.echo(f"❌ Error al recalcular reservas: {e}")
+            sys.exit(1)
+
+
 @cli.command()
 @click.pass_context
 def status(ctx):
@@ -194,7 +194,7 @@ async function updateDashboard() {
             purchasesRes.json()
         ]);
         
-        document.getElementById('totalProducts').textContent = products.products?.length || 0;
+        document.getElementById('totalProducts').textContent = products.total ?? products.products?.length ?? 0;
         document.getElementById('lowStockCount').textContent = stock.low_stock_count || 0;
         document.getElementById('pendingOrders').textContent = orders.pending_count || 0;
         document.getElementById('pendingPurchases').textContent = purchases.pending_count || 0;